@@ -0,0 +1,158 @@
+"""
+Micro-benchmark of the processor's per-opcode dispatch cost.
+
+"Before" is the match statement the processor used to resolve every fetched opcode: each case compares the
+opcode against an InstructionSet member in turn, so opcodes near the bottom pay for every comparison above them.
+"After" is the processor's dense handler table: a bounds check, a single list index and an unpack of the entry.
+Both are timed through a function call of the same shape, so the comparison is of the dispatch alone.  Opcodes
+added since the match statement was replaced never had a case, so they are timed against the table only.
+
+Run from the src directory:
+    python -m Benchmarks.benchmark_dispatch
+"""
+import timeit
+from typing import Callable
+
+from Constants.class_instruction_set import InstructionSet, OPERAND_COUNTS
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Processors.class_processor import Processor
+
+DISPATCHES_PER_OPCODE = 200000
+
+
+def match_dispatch(instruction: int) -> InstructionSet | None:
+    """
+    Resolves an opcode the way the processor did before the handler table: one case at a time, in the order the
+    cases appeared in perform_instruction_processing.
+    """
+    match instruction:
+        case InstructionSet.NOP:
+            return InstructionSet.NOP
+        case InstructionSet.LR:
+            return InstructionSet.LR
+        case InstructionSet.LRM:
+            return InstructionSet.LRM
+        case InstructionSet.LRR:
+            return InstructionSet.LRR
+        case InstructionSet.MRM:
+            return InstructionSet.MRM
+        case InstructionSet.ADD:
+            return InstructionSet.ADD
+        case InstructionSet.SUB:
+            return InstructionSet.SUB
+        case InstructionSet.MUL:
+            return InstructionSet.MUL
+        case InstructionSet.DIV:
+            return InstructionSet.DIV
+        case InstructionSet.HALT:
+            return InstructionSet.HALT
+        case InstructionSet.DEBUG:
+            return InstructionSet.DEBUG
+        case InstructionSet.JMP:
+            return InstructionSet.JMP
+        case InstructionSet.RST:
+            return InstructionSet.RST
+        case InstructionSet.CMP:
+            return InstructionSet.CMP
+        case InstructionSet.JE:
+            return InstructionSet.JE
+        case InstructionSet.JNE:
+            return InstructionSet.JNE
+        case InstructionSet.JL:
+            return InstructionSet.JL
+        case InstructionSet.JG:
+            return InstructionSet.JG
+        case InstructionSet.PUSH:
+            return InstructionSet.PUSH
+        case InstructionSet.POP:
+            return InstructionSet.POP
+        case InstructionSet.CALL:
+            return InstructionSet.CALL
+        case InstructionSet.RTN:
+            return InstructionSet.RTN
+        case InstructionSet.NOT:
+            return InstructionSet.NOT
+        case InstructionSet.OR:
+            return InstructionSet.OR
+        case InstructionSet.AND:
+            return InstructionSet.AND
+        case InstructionSet.XOR:
+            return InstructionSet.XOR
+        case InstructionSet.SIV:
+            return InstructionSet.SIV
+        case InstructionSet.INC:
+            return InstructionSet.INC
+        case InstructionSet.DEC:
+            return InstructionSet.DEC
+        case InstructionSet.SLEEP:
+            return InstructionSet.SLEEP
+        case InstructionSet.WAKE:
+            return InstructionSet.WAKE
+        case InstructionSet.PEEK:
+            return InstructionSet.PEEK
+        case InstructionSet.INT:
+            return InstructionSet.INT
+        case InstructionSet.ASSERT_EMPTY_USER_STACK:
+            return InstructionSet.ASSERT_EMPTY_USER_STACK
+        case _:
+            return None
+
+
+def make_table_dispatch(handlers: list) -> Callable[[int], Callable[..., None] | None]:
+    """
+    Builds a function that resolves an opcode the way the processor does now, through its handler table.
+    """
+    def table_dispatch(instruction: int) -> Callable[..., None] | None:
+        instruction_handler = None
+        if 0 <= instruction < len(handlers):
+            instruction_handler = handlers[instruction]
+        if instruction_handler is None:
+            return None
+        handler, operand_count = instruction_handler
+        return handler
+
+    return table_dispatch
+
+
+def nanoseconds_per_dispatch(statement: str, namespace: dict) -> float:
+    """
+    Times a dispatch statement and returns the best cost of a single dispatch, in nanoseconds.
+    """
+    timings = timeit.repeat(statement, globals=namespace, number=DISPATCHES_PER_OPCODE, repeat=5)
+    return min(timings) / DISPATCHES_PER_OPCODE * 1e9
+
+
+def main() -> None:
+    control_bus = ControlBus()
+    processor = Processor(starting_address=0, size=0, address_bus=AddressBus(), data_bus=DataBus(control_bus),
+                          control_bus=control_bus, interrupt_bus=InterruptBus())
+    table_dispatch = make_table_dispatch(processor.instruction_handlers)
+    matched = [instruction for instruction in OPERAND_COUNTS if match_dispatch(int(instruction)) is not None]
+    table_only = [instruction for instruction in OPERAND_COUNTS if instruction not in matched]
+
+    print(f"{'Opcode':<26}{'match (ns)':>12}{'table (ns)':>12}{'speed-up':>10}")
+    total_before = 0.0
+    total_after = 0.0
+    for instruction in matched:
+        namespace = {"match_dispatch": match_dispatch, "table_dispatch": table_dispatch, "opcode": int(instruction)}
+        before = nanoseconds_per_dispatch("match_dispatch(opcode)", namespace)
+        after = nanoseconds_per_dispatch("table_dispatch(opcode)", namespace)
+        total_before += before
+        total_after += after
+        print(f"{instruction.name:<26}{before:>12.1f}{after:>12.1f}{before / after:>9.1f}x")
+    count = len(matched)
+    print(f"{'Average':<26}{total_before / count:>12.1f}{total_after / count:>12.1f}"
+          f"{total_before / total_after:>9.1f}x")
+    if table_only:
+        print()
+        print(f"{'Opcode (table only)':<26}{'table (ns)':>24}")
+        for instruction in table_only:
+            namespace = {"table_dispatch": table_dispatch, "opcode": int(instruction)}
+            print(f"{instruction.name:<26}{nanoseconds_per_dispatch('table_dispatch(opcode)', namespace):>24.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Benchmark of the memory taken by RAM, and the cost of loading and accessing it, with each storage type.
+
+"list" holds the words in a list of Python integers: 8 bytes of pointer per word, plus a 28-byte integer object
+for every word whose value is outside the small integers Python shares, so memory filled with real data costs
+about 36 bytes per word.  "array" packs the words into signed 64-bit integers, 8 bytes per word whatever they hold.
+The footprint is measured when the RAM is first built, when every word is zero, and after every word has been
+loaded with a distinct value.
+
+Run from the src directory:
+    python -m Benchmarks.benchmark_ram_footprint
+"""
+import sys
+import timeit
+
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Memory.class_ram import RAM, STORAGE_TYPES
+
+SIZES = (1 << 20, 16 << 20)
+ACCESSES = 200000
+FIRST_VALUE = 1000  # above the small integers Python shares, so each loaded word is its own object in a list
+
+
+def build_ram(size: int, storage: str) -> RAM:
+    """
+    Builds a RAM device that isn't attached to a running machine.
+    """
+    control_bus = ControlBus()
+    return RAM(starting_address=0, size=size, address_bus=AddressBus(), data_bus=DataBus(control_bus),
+               control_bus=control_bus, interrupt_bus=InterruptBus(), storage=storage)
+
+
+def footprint(ram: RAM) -> int:
+    """
+    Returns the bytes held by a RAM device's memory: the container, and for a list the integer objects that no
+    other word can share.
+    """
+    memory = ram.memory
+    total = sys.getsizeof(memory)
+    if ram.storage == "list":
+        total += sum(sys.getsizeof(value) for value in memory if not -5 <= value <= 256)
+    return total
+
+
+def nanoseconds_per_access(statement: str, namespace: dict) -> float:
+    """
+    Times an access statement and returns the best cost of a single access, in nanoseconds.
+    """
+    timings = timeit.repeat(statement, globals=namespace, number=ACCESSES, repeat=5)
+    return min(timings) / ACCESSES * 1e9
+
+
+def main() -> None:
+    print(f"{'Words':>10}{'Storage':>9}{'empty (MB)':>12}{'loaded (MB)':>13}{'load (s)':>10}"
+          f"{'read (ns)':>11}{'write (ns)':>12}")
+    for size in SIZES:
+        for storage in STORAGE_TYPES:
+            ram = build_ram(size, storage)
+            empty = footprint(ram)
+            data = list(range(FIRST_VALUE, FIRST_VALUE + size))
+            load_time = min(timeit.repeat(lambda: ram.load_data(data), number=1, repeat=3))
+            del data
+            loaded = footprint(ram)
+            namespace = {"ram": ram, "address": size // 2}
+            read = nanoseconds_per_access("ram.read(address)", namespace)
+            write = nanoseconds_per_access("ram.write(address, 12345)", namespace)
+            print(f"{size:>10}{storage:>9}{empty / 1e6:>12.1f}{loaded / 1e6:>13.1f}{load_time:>10.3f}"
+                  f"{read:>11.1f}{write:>12.1f}")
+            del ram
+
+
+if __name__ == '__main__':
+    main()
@@ -14,6 +14,7 @@ class RubbishCompiler:
         :param starting_address: The address to compile to.
         """
         self.labels = {}
+        self.routines: set[str] = set()  # labels that are called or used as interrupt vectors
         self.starting_address: int = starting_address
 
     def compile(self, source_pathname: str) -> List[int]:
@@ -140,11 +141,30 @@ class RubbishCompiler:
         :param cross_reference_labels: Whether to cross-reference labels or not.
         """
         code.append(instruction)
+        self.record_routine(instruction, parameters)
         for parameter_index in range(1, len(parameters)):
             self.cross_reference_label(parameters, parameter_index, cross_reference_labels)
             self.cross_reference_register(parameters, parameter_index)
             code.append(int(parameters[parameter_index]))
 
+    def record_routine(self, instruction: int, parameters: List[str]):
+        """
+        This method records the label that a CALL or SIV instruction refers to as the entry point of a routine.
+        The profiler uses the routines to attribute time to the code that a label starts.
+        :param instruction: The instruction being compiled.
+        :param parameters: The parameters for the instruction, before labels are cross-referenced.
+        """
+        if instruction == InstructionSet.CALL:
+            address_parameter = 1
+        elif instruction == InstructionSet.SIV:
+            address_parameter = 2
+        else:
+            return
+        if address_parameter < len(parameters):
+            parameter = str(parameters[address_parameter])
+            if not self.is_numeric(parameter) and not parameter.startswith("@"):
+                self.routines.add(parameter[1:] if parameter.startswith(":") else parameter)
+
     def get_address_from_label(self, label: str) -> str:
         """
         This method returns the address for the given label.
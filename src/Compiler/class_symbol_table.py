@@ -0,0 +1,77 @@
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Tuple
+
+
+class SymbolTable:
+    """
+    The SymbolTable class maps machine addresses back to the labels of the Rubbish programs loaded into memory.
+    Each address is attributed to the routine whose entry label is the closest one at or below it.  Labels that
+    are only jumped to (loop heads, branch targets, data) are not treated as routines when the compiler knows
+    which labels are called, so that time spent in a loop is attributed to the routine that contains it.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for the SymbolTable class.
+        """
+        self.__labels: Dict[str, int] = {}
+        self.__routineAddresses: List[int] = []
+        self.__routineNames: List[str] = []
+
+    @property
+    def labels(self) -> Dict[str, int]:
+        """
+        This property returns every label known to the symbol table.
+        :return: The addresses of the labels, keyed by label name.
+        """
+        return self.__labels
+
+    @property
+    def routines(self) -> List[Tuple[int, str]]:
+        """
+        This property returns the routine entry points known to the symbol table.
+        :return: The address and name of each routine, lowest address first.
+        """
+        return list(zip(self.__routineAddresses, self.__routineNames))
+
+    def add_program(self, name: str, starting_address: int, labels: Dict[str, int],
+                    routines: Iterable[str] | None = None) -> None:
+        """
+        This method adds the labels of a compiled program to the symbol table.
+        The program's starting address is recorded as a routine named after the program, so that code before
+        its first routine is still attributed.
+        :param name: The name of the program.
+        :param starting_address: The address the program was compiled to.
+        :param labels: The program's labels, as built by the compiler.
+        :param routines: The labels that are routine entry points.  If None, every label is a routine.
+        """
+        self.__labels.update(labels)
+        routine_names = labels.keys() if routines is None else [label for label in routines if label in labels]
+        self.add_routine(name, starting_address)
+        for routine_name in routine_names:
+            self.add_routine(routine_name, labels[routine_name])
+
+    def add_routine(self, name: str, address: int) -> None:
+        """
+        This method adds a routine entry point to the symbol table.  A later routine at the same address
+        replaces an earlier one.
+        :param name: The name of the routine.
+        :param address: The entry address of the routine.
+        """
+        index = bisect_right(self.__routineAddresses, address)
+        if index > 0 and self.__routineAddresses[index - 1] == address:
+            self.__routineNames[index - 1] = name
+        else:
+            self.__routineAddresses.insert(index, address)
+            self.__routineNames.insert(index, name)
+
+    def find_routine(self, address: int) -> str:
+        """
+        This method returns the name of the routine that contains an address.
+        :param address: The address to look up.
+        :return: The routine name, or the address in hexadecimal if it is below every known routine.
+        """
+        index = bisect_right(self.__routineAddresses, address) - 1
+        if index >= 0:
+            return self.__routineNames[index]
+        return f"0x{address:x}"
@@ -0,0 +1,17 @@
+class DMAModes:
+    """
+    The DMAModes class represents the values of the DMA controller's mode register.
+    Writing copy or fill to the mode register starts a transfer; the register reads idle once it is complete.
+    """
+    idle: int = 0
+    """
+    No transfer is in progress.
+    """
+    copy: int = 1
+    """
+    Copies length words from the source address to the destination address.
+    """
+    fill: int = 2
+    """
+    Fills length words at the destination address with the value in the source register.
+    """
@@ -0,0 +1,29 @@
+class ExitCodes:
+    """
+    The ExitCodes class represents the process exit codes returned by a headless run of the machine.
+    """
+    halted: int = 0
+    """
+    The program halted normally.
+    """
+    stack_assertion: int = 2
+    """
+    An ASSERT_EMPTY_USER_STACK instruction found the user stack was not empty and no interrupt vector handled it.
+    """
+    instruction_budget_exceeded: int = 3
+    """
+    The program was stopped after executing the maximum number of instructions.
+    """
+    timeout: int = 4
+    """
+    The program was stopped after running for the maximum amount of time.
+    """
+    breakpoint: int = 5
+    """
+    The program was stopped at a breakpoint or watchpoint.
+    """
+    error: int = 6
+    """
+    The processor stopped because of an error, such as an unknown instruction.  This is not 1, which the emulator
+    exits with when the command line is wrong, so that a fault in the program can be told apart from a bad command.
+    """
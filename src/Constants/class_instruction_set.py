@@ -40,5 +40,130 @@ class InstructionSet(IntFlag):
     WAKE = 29  # Wake instruction
     DEC = 30 # Decrement instruction
     INT = 31 # Raise interrupt instruction
+    TAS = 32  # Atomic test-and-set instruction
+    CAS = 33  # Atomic compare-and-swap instruction
     PEEK = 34  # Peek at top of stack instruction
     ASSERT_EMPTY_USER_STACK = 35 # will raise exception if the stack is not empty
+    DI = 36  # Disable interrupt instruction
+    EI = 37  # Enable interrupt instruction
+    BMOV = 38  # Block move instruction
+    BFILL = 39  # Block fill instruction
+    BCMP = 40  # Block compare instruction
+    OUTS = 41  # Output zero-terminated string instruction
+
+
+OPERAND_COUNTS: dict[InstructionSet, int] = {
+    InstructionSet.NOP: 0,
+    InstructionSet.LR: 2,
+    InstructionSet.LRM: 2,
+    InstructionSet.LRR: 2,
+    InstructionSet.MRM: 2,
+    InstructionSet.ADD: 0,
+    InstructionSet.SUB: 0,
+    InstructionSet.MUL: 0,
+    InstructionSet.DIV: 0,
+    InstructionSet.HALT: 0,
+    InstructionSet.DEBUG: 0,
+    InstructionSet.JMP: 1,
+    InstructionSet.RST: 0,
+    InstructionSet.CMP: 0,
+    InstructionSet.JE: 1,
+    InstructionSet.JNE: 1,
+    InstructionSet.JL: 1,
+    InstructionSet.JG: 1,
+    InstructionSet.PUSH: 1,
+    InstructionSet.POP: 1,
+    InstructionSet.CALL: 1,
+    InstructionSet.RTN: 0,
+    InstructionSet.NOT: 0,
+    InstructionSet.OR: 0,
+    InstructionSet.AND: 0,
+    InstructionSet.XOR: 0,
+    InstructionSet.SIV: 2,
+    InstructionSet.INC: 1,
+    InstructionSet.SLEEP: 0,
+    InstructionSet.WAKE: 0,
+    InstructionSet.DEC: 1,
+    InstructionSet.INT: 1,
+    InstructionSet.TAS: 2,
+    InstructionSet.CAS: 1,
+    InstructionSet.PEEK: 1,
+    InstructionSet.ASSERT_EMPTY_USER_STACK: 0,
+    InstructionSet.DI: 1,
+    InstructionSet.EI: 1,
+    InstructionSet.BMOV: 3,
+    InstructionSet.BFILL: 3,
+    InstructionSet.BCMP: 3,
+    InstructionSet.OUTS: 2,
+}
+"""
+The number of operands that follow each instruction's opcode in memory.
+"""
+
+REGISTER_OPERANDS: dict[InstructionSet, tuple[int, ...]] = {
+    InstructionSet.LR: (0,),
+    InstructionSet.LRM: (0,),
+    InstructionSet.LRR: (0, 1),
+    InstructionSet.MRM: (0,),
+    InstructionSet.TAS: (0,),
+    InstructionSet.PUSH: (0,),
+    InstructionSet.POP: (0,),
+    InstructionSet.INC: (0,),
+    InstructionSet.DEC: (0,),
+    InstructionSet.PEEK: (0,),
+    InstructionSet.BMOV: (0, 1, 2),
+    InstructionSet.BFILL: (0, 1, 2),
+    InstructionSet.BCMP: (0, 1, 2),
+    InstructionSet.OUTS: (0,),
+}
+"""
+The positions of the operands that are register numbers.
+"""
+
+ADDRESS_OPERANDS: dict[InstructionSet, tuple[int, ...]] = {
+    InstructionSet.LRM: (1,),
+    InstructionSet.MRM: (1,),
+    InstructionSet.TAS: (1,),
+    InstructionSet.CAS: (0,),
+    InstructionSet.JMP: (0,),
+    InstructionSet.JE: (0,),
+    InstructionSet.JNE: (0,),
+    InstructionSet.JL: (0,),
+    InstructionSet.JG: (0,),
+    InstructionSet.CALL: (0,),
+    InstructionSet.SIV: (1,),
+    InstructionSet.OUTS: (1,),
+}
+"""
+The positions of the address operands.  An address written as @register is stored as the negated register number.
+"""
+
+IMPLICIT_REGISTERS: dict[InstructionSet, tuple[int, ...]] = {
+    InstructionSet.ADD: (1, 2, 3),
+    InstructionSet.SUB: (1, 2, 3),
+    InstructionSet.MUL: (1, 2, 3),
+    InstructionSet.DIV: (1, 2, 3, 4),
+    InstructionSet.CMP: (1, 2),
+    InstructionSet.NOT: (1, 3),
+    InstructionSet.OR: (1, 2, 3),
+    InstructionSet.AND: (1, 2, 3),
+    InstructionSet.XOR: (1, 2, 3),
+    InstructionSet.CAS: (1, 2),
+}
+"""
+The registers that instructions use without naming them in an operand.
+"""
+
+
+def get_registers_used(opcode: int, operands: tuple[int, ...]) -> tuple[int, ...]:
+    """
+    Returns the registers an instruction reads or writes: those named by its operands, those it uses implicitly,
+    and those holding @register addresses.
+    :param opcode: The opcode of the instruction.
+    :param operands: The raw operands of the instruction.
+    :return: The register numbers, each once.
+    """
+    registers = [operands[position] for position in REGISTER_OPERANDS.get(opcode, ())]
+    registers.extend(IMPLICIT_REGISTERS.get(opcode, ()))
+    registers.extend(-operands[position] for position in ADDRESS_OPERANDS.get(opcode, ()) if operands[position] < 0)
+    return tuple(dict.fromkeys(registers))
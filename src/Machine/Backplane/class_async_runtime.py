@@ -0,0 +1,102 @@
+import asyncio
+import contextlib
+import threading
+from typing import List
+
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Devices.Bases.class_base_device import BaseDevice
+
+
+class AsyncRuntime:
+    """
+    The AsyncRuntime class runs peripheral devices as asyncio tasks on a single event loop thread, instead of
+    giving each device its own thread.
+    Each device's service_async coroutine awaits bus activity, a timer deadline or an input event, so an idle
+    device costs nothing however many are attached.  The control bus notifies the runtime whenever it is
+    signalled, from whichever thread signals it.  Processors are not run here; they keep their own threads.
+    """
+
+    def __init__(self, devices: List[BaseDevice], control_bus: ControlBus) -> None:
+        """
+        Constructor for the AsyncRuntime class.
+        :param devices: The devices to run on the event loop.
+        :param control_bus: The control bus of the backplane.
+        """
+        self.__devices = devices
+        self.__controlBus = control_bus
+        self.__loop: asyncio.AbstractEventLoop | None = None
+        self.__loopThreadId: int | None = None
+        self.__busActivity: asyncio.Event | None = None
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        """
+        This property returns the event loop the devices run on.
+        :return: The event loop.
+        """
+        return self.__loop
+
+    def start(self) -> None:
+        """
+        This method starts the event loop thread and waits until it is ready to be signalled.
+        """
+        ready = threading.Event()
+        self.__thread = threading.Thread(target=self.run, args=(ready,), name="AsyncRuntime::event_loop")
+        self.__thread.start()
+        ready.wait()
+
+    def run(self, ready: threading.Event) -> None:
+        """
+        The body of the event loop thread.  Runs every device's service_async coroutine until they all finish.
+        :param ready: Set once the loop is running and the control bus has been told to notify it.
+        """
+        async def run_devices() -> None:
+            self.__loop = asyncio.get_running_loop()
+            self.__loopThreadId = threading.get_ident()
+            self.__busActivity = asyncio.Event()
+            self.__controlBus.set_activity_listener(self.notify_bus_activity)
+            ready.set()
+            try:
+                await asyncio.gather(*(device.service_async(self) for device in self.__devices))
+            finally:
+                # a device that raised mustn't leave the bus notifying a loop that is about to close
+                self.__controlBus.set_activity_listener(None)
+
+        asyncio.run(run_devices())
+
+    def notify_bus_activity(self) -> None:
+        """
+        This method wakes every device waiting for bus activity.  It may be called from any thread, and does
+        nothing once the event loop has closed.
+        """
+        if threading.get_ident() == self.__loopThreadId:
+            self.wake_waiting_devices()
+        elif not self.__loop.is_closed():
+            self.__loop.call_soon_threadsafe(self.wake_waiting_devices)
+
+    def wake_waiting_devices(self) -> None:
+        """
+        This method sets the current bus activity event and replaces it, so that later waits need a new signal.
+        It runs on the event loop thread.
+        """
+        self.__busActivity.set()
+        self.__busActivity = asyncio.Event()
+
+    def bus_activity(self) -> asyncio.Event:
+        """
+        This method returns the event that the next bus signal will set.  A device takes it while the bus is
+        locked, before it releases the lock and waits, so a signal in between is not missed.
+        :return: The bus activity event.
+        """
+        return self.__busActivity
+
+    @staticmethod
+    async def wait(activity: asyncio.Event, timeout: float | None) -> None:
+        """
+        This method waits for a bus activity event, or until the timeout expires.
+        :param activity: The event returned by bus_activity.
+        :param timeout: The maximum number of seconds to wait, or None to wait until the bus is signalled.
+        """
+        with contextlib.suppress(asyncio.TimeoutError):
+            await asyncio.wait_for(activity.wait(), timeout)
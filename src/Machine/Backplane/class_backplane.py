@@ -2,11 +2,29 @@ import time
 from typing import List
 
 from Constants.class_interrupts import Interrupts
+from Compiler.class_symbol_table import SymbolTable
+from Machine.Backplane.class_async_runtime import AsyncRuntime
+from Machine.Backplane.class_bus_adapter import BusAdapter
+from Machine.Backplane.class_cooperative_scheduler import CooperativeScheduler, DEFAULT_TIME_SLICE
+from Machine.Backplane.class_machine_snapshot import MachineSnapshot
+from Machine.Backplane.class_machine_statistics import MachineStatistics
+from Machine.Backplane.class_bus_arbiter import BusArbiter
+from Machine.Backplane.class_memory_map import MemoryMap
+from Machine.Backplane.class_time_travel import TimeTravel
 from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
 from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_processor import BaseProcessor
+from Machine.Devices.IO.class_console import Console
+from Machine.Devices.Processors.class_processor import Processor
+from Machine.Devices.Utility.real_time_clock import RTC
+from Machine.Devices.Utility.class_dma_controller import DMAController
+from Machine.Diagnostics.class_debug_server import DebugServer
+from Machine.Diagnostics.class_debugger import Debugger
+from Machine.Diagnostics.class_execution_tracer import ExecutionTracer
+from Machine.Diagnostics.class_guest_profiler import GuestProfiler
 
 
 class BackPlane:
@@ -49,6 +67,78 @@ class BackPlane:
         """
         return self.__interruptBus
 
+    @property
+    def devices(self) -> List[BaseDevice]:
+        """
+        The devices attached to the backplane.
+
+        """
+        return self.__devices
+
+    @property
+    def timed_out(self) -> bool:
+        """
+        Whether the last run was stopped because it exceeded its timeout.
+
+        """
+        return self.__timedOut
+
+    @property
+    def memory_map(self) -> MemoryMap:
+        """
+        The address decoder of the backplane.
+
+        """
+        return self.__memoryMap
+
+    @property
+    def statistics(self) -> MachineStatistics:
+        """
+        The performance counters of the machine.
+
+        """
+        return self.__statistics
+
+    @property
+    def symbol_table(self) -> SymbolTable:
+        """
+        The labels of the programs compiled into the machine's memory.
+
+        """
+        return self.__symbolTable
+
+    @property
+    def profilers(self) -> List[GuestProfiler]:
+        """
+        The guest profilers of the last run, one per processor, if profiling was enabled.
+
+        """
+        return self.__profilers
+
+    @property
+    def tracers(self) -> List[ExecutionTracer]:
+        """
+        The execution tracers of the last run, one per processor, if tracing was enabled.
+
+        """
+        return self.__tracers
+
+    @property
+    def debugger(self) -> Debugger:
+        """
+        The breakpoints and watchpoints of the machine, and the hits recorded when it ran.
+
+        """
+        return self.__debugger
+
+    @property
+    def time_travel(self) -> TimeTravel | None:
+        """
+        The checkpoints and input log of the last run, if time travel was enabled.
+
+        """
+        return self.__timeTravel
+
     def __init__(self) -> None:
         """
         Constructs all the necessary attributes for the backplane.
@@ -58,6 +148,37 @@ class BackPlane:
         self.__dataBus = DataBus(self.__controlBus)
         self.__interruptBus = InterruptBus()
         self.__devices: List[BaseDevice] = []
+        self.__timedOut: bool = False
+        self.__memoryMap = MemoryMap(BusAdapter(self.__addressBus, self.__dataBus, self.__controlBus))
+        self.__statistics = MachineStatistics(self.__devices, self.__memoryMap, self.__controlBus)
+        self.__statisticsInterval: float | None = None
+        self.__symbolTable = SymbolTable()
+        self.__debugger = Debugger(self.__symbolTable)
+        self.__debugServerAddress: str | None = None
+        self.__debugServer: DebugServer | None = None
+        self.__profilers: List[GuestProfiler] = []
+        self.__profileSampleInterval: float | None = None
+        self.__profilePathname: str | None = None
+        self.__tracers: List[ExecutionTracer] = []
+        self.__traceRecords: int | None = None
+        self.__tracePathname: str | None = None
+        self.__checkpointInterval: int | None = None
+        self.__maxCheckpoints: int | None = None
+        self.__timeTravel: TimeTravel | None = None
+        self.__timeSlice: int | None = None
+        self.__useAsyncRuntime: bool = False
+        self.__started: float = 0.0
+        self.__timeout: float | None = None
+        self.__nextReport: float | None = None
+
+    def enable_statistics(self, interval: float) -> None:
+        """
+        Turns on statistics reporting.  The statistics are printed every interval seconds and when the machine halts.
+
+        Parameters:
+            interval (float): The number of seconds between reports.
+        """
+        self.__statisticsInterval = interval
 
     def add_device(self, device: BaseDevice):
         """
@@ -67,24 +188,320 @@ class BackPlane:
             device (BaseDevice): The device to be added to the backplane.
         """
         self.__devices.append(device)
+        if isinstance(device, (BaseProcessor, DMAController)):
+            device.memory_map = self.__memoryMap
+
+    def build_memory_map(self) -> None:
+        """
+        Builds the address decoder from the devices attached to the backplane.
+        This must be called after all devices have been added and before the backplane is run.
+
+        """
+        self.__memoryMap.build(self.__devices)
+
+    def enable_profiling(self, sample_interval: float, pathname: str | None = None) -> None:
+        """
+        Turns on the guest profiler.  Each processor is sampled while the machine runs, and a flat profile is printed
+        when the machine halts.
+
+        Parameters:
+            sample_interval (float): The number of seconds between samples.
+            pathname (str): The pathname of the collapsed stack file to write when the machine halts, or None.
+        """
+        self.__profileSampleInterval = sample_interval
+        self.__profilePathname = pathname
+
+    def enable_tracing(self, records: int, pathname: str) -> None:
+        """
+        Turns on the execution tracer.  Each processor records the instructions it executes in a ring buffer, which
+        is written to the trace file if the processor faults and again when the machine halts.
+
+        Parameters:
+            records (int): The number of records each processor's ring buffer holds.
+            pathname (str): The pathname of the trace file.
+        """
+        self.__traceRecords = records
+        self.__tracePathname = pathname
+
+    def enable_debug_server(self, address: str) -> None:
+        """
+        Turns on the debug server, which lets a debugger attach to the running machine to halt, resume and step
+        it, read and write its registers and memory, and set breakpoints.
+
+        Parameters:
+            address (str): A port number to listen on localhost, or the pathname of a Unix domain socket.
+        """
+        self.__debugServerAddress = address
+
+    def enable_time_travel(self, checkpoint_interval: int, max_checkpoints: int) -> None:
+        """
+        Turns on time travel, which needs the cooperative scheduler.  A checkpoint is taken every
+        checkpoint_interval steps and keystrokes and clock readings are logged, so that once the machine has
+        stopped it can be stepped back, or run back to an address, by restoring a checkpoint and replaying.  The
+        processors run on the interpreter, so that every instruction is a step.
+
+        Parameters:
+            checkpoint_interval (int): The number of steps between checkpoints.
+            max_checkpoints (int): The number of checkpoints kept; older ones are discarded.
+        """
+        self.__checkpointInterval = checkpoint_interval
+        self.__maxCheckpoints = max_checkpoints
+
+    def step_back(self, steps: int = 1) -> int:
+        """
+        Takes the stopped machine back a number of steps.  Time travel must have been enabled.
+
+        Parameters:
+            steps (int): The number of steps to go back.
+
+        Returns:
+            int: The step the machine is at.
+        """
+        self.__debugger.suspended = True
+        try:
+            return self.__timeTravel.step_back(steps)
+        finally:
+            self.__debugger.suspended = False
+
+    def run_back_to(self, address: int) -> int | None:
+        """
+        Takes the stopped machine back to the last step at which the first processor's instruction pointer held
+        an address.  Time travel must have been enabled.
+
+        Parameters:
+            address (int): The address to run back to.
+
+        Returns:
+            int: The step the machine is at, or None if the address wasn't reached since the oldest checkpoint.
+        """
+        self.__debugger.suspended = True
+        try:
+            return self.__timeTravel.run_back_to(address)
+        finally:
+            self.__debugger.suspended = False
+
+    def save_snapshot(self, pathname: str) -> None:
+        """
+        Saves the state of the machine to a snapshot file.  The machine must not be running.
+
+        Parameters:
+            pathname (str): The pathname of the snapshot file.
+        """
+        MachineSnapshot.save(self.__devices, self.__interruptBus, pathname)
+
+    def load_snapshot(self, pathname: str) -> None:
+        """
+        Restores the state of the machine from a snapshot file.  This must be called after the machine is built
+        and before it is run.
+
+        Parameters:
+            pathname (str): The pathname of the snapshot file.
+        """
+        MachineSnapshot.load(self.__devices, self.__interruptBus, pathname)
+
+    def use_cooperative_scheduler(self, time_slice: int = DEFAULT_TIME_SLICE) -> None:
+        """
+        Runs the machine on a single thread with the cooperative scheduler, instead of giving each device its own
+        thread.  Runs become reproducible and the bus lock is no longer taken.
+
+        Parameters:
+            time_slice (int): The number of processor steps between rounds of device servicing.
+        """
+        self.__timeSlice = time_slice
 
-    def run(self) -> None:
+    def use_async_runtime(self) -> None:
+        """
+        Runs every device except the processors as a task on a single asyncio event loop, instead of giving each
+        device its own thread.  The processors keep their own threads.
+
+        """
+        self.__useAsyncRuntime = True
+
+    def run(self, timeout: float | None = None) -> None:
         """
         Runs the backplane.
-        The backplane calls the start method of each device attached to it to start the machine.
+        The backplane calls the start method of each device attached to it to start the machine, runs every
+        device itself if the cooperative scheduler is in use, or runs the peripherals on the asyncio runtime.
 
+        Parameters:
+            timeout (float): The number of seconds after which the machine is halted, or None to run until halted.
         """
+        if self.__checkpointInterval is not None and self.__timeSlice is None:
+            raise ValueError("Time travel needs the cooperative scheduler.")
+        self.__timedOut = False
         self.control_bus.power_on = True
-        for device in self.__devices:
-            device.start()
-        while self.control_bus.power_on:
-            self.control_bus.lock_bus()
-            if self.interrupt_bus.test_interrupt(Interrupts.halt):
-                print("HALT interrupt detected.")
-                self.control_bus.power_on = False
-            self.control_bus.unlock_bus()
-            time.sleep(.1)
+        self.__started = time.monotonic()
+        self.__timeout = timeout
+        self.__nextReport = None
+        if self.__statisticsInterval is not None:
+            self.__statistics.start()
+            self.__nextReport = self.__started + self.__statisticsInterval
+        self.connect_processors()
+        self.attach_tracers()
+        self.__debugger.attach([device for device in self.__devices if isinstance(device, Processor)],
+                               self.__memoryMap)
+        self.start_debug_server()
+        if self.__timeSlice is not None:
+            scheduler = CooperativeScheduler(self.__devices, self.__controlBus, self.__interruptBus,
+                                             self.monitor, self.__timeSlice)
+            self.attach_time_travel(scheduler)
+            self.start_profilers()
+            scheduler.run()
+        else:
+            threaded_devices = self.__devices
+            if self.__useAsyncRuntime:
+                threaded_devices = [device for device in self.__devices if isinstance(device, Processor)]
+                AsyncRuntime([device for device in self.__devices if device not in threaded_devices],
+                             self.__controlBus).start()
+            for device in threaded_devices:
+                device.start()
+            self.start_profilers()
+            while self.control_bus.power_on:
+                self.control_bus.lock_bus()
+                self.monitor()
+                self.control_bus.unlock_bus()
+                time.sleep(.1)
         self.wait_for_devices_to_finish()
+        if self.__debugServer is not None:
+            self.__debugServer.stop()
+        self.stop_profilers()
+        self.write_traces()
+        if self.__statisticsInterval is not None:
+            print(MachineStatistics.format_snapshot(self.__statistics.snapshot()))
+
+    def connect_processors(self) -> None:
+        """
+        Connects the processors of a multi-processor machine to each other.  Each processor is told about its peers,
+        so that it can invalidate their cached copies of the addresses it writes to, and, unless the cooperative
+        scheduler runs them one at a time, the processors share a bus arbiter that grants the buses fairly and makes
+        the atomic instructions atomic.  DMA controllers are told about every processor, so that they can
+        invalidate the processors' cached copies of the memory they write to.
+
+        """
+        processors = [device for device in self.__devices if isinstance(device, Processor)]
+        arbiter = None
+        if len(processors) > 1 and self.__timeSlice is None:
+            arbiter = BusArbiter()
+        self.__memoryMap.arbiter = arbiter
+        for processor in processors:
+            processor.peers = [peer for peer in processors if peer is not processor] if len(processors) > 1 else []
+            processor.arbiter = arbiter
+        for device in self.__devices:
+            if isinstance(device, DMAController):
+                device.processors = processors
+
+    def monitor(self) -> None:
+        """
+        Turns power off once the halt interrupt is raised, raises it when the timeout expires, and prints the
+        periodic statistics report.  The bus must be locked.
+
+        """
+        if not self.control_bus.power_on:
+            return
+        if self.interrupt_bus.test_interrupt(Interrupts.halt):
+            print("HALT interrupt detected.")
+            self.control_bus.power_on = False
+            self.control_bus.signal_bus()
+        elif self.__timeout is not None and time.monotonic() - self.__started >= self.__timeout:
+            print("Timeout reached.  Halting.")
+            self.__timedOut = True
+            self.interrupt_bus.set_interrupt(Interrupts.halt)
+            self.control_bus.signal_bus()
+        if self.__nextReport is not None and time.monotonic() >= self.__nextReport:
+            print(MachineStatistics.format_snapshot(self.__statistics.snapshot()))
+            self.__nextReport += self.__statisticsInterval
+
+    def attach_tracers(self) -> None:
+        """
+        Attaches an execution tracer to each processor if tracing is enabled.  This is done before any device
+        starts, so that the tracers see every instruction.
+
+        """
+        self.__tracers = []
+        if self.__traceRecords is not None:
+            for device in self.__devices:
+                if isinstance(device, Processor):
+                    tracer = ExecutionTracer(device, self.__traceRecords, self.__tracePathname, self.__symbolTable)
+                    device.attach_tracer(tracer)
+                    self.__tracers.append(tracer)
+
+    def attach_time_travel(self, scheduler: CooperativeScheduler) -> None:
+        """
+        Sets up time travel on the cooperative scheduler if it is enabled: the processors are switched to the
+        interpreter, and the console and real-time clock read their inputs through the input log.
+
+        Parameters:
+            scheduler (CooperativeScheduler): The scheduler that will run the machine.
+        """
+        self.__timeTravel = None
+        if self.__checkpointInterval is not None:
+            self.__timeTravel = TimeTravel(scheduler, self.__devices, self.__controlBus, self.__interruptBus,
+                                           self.__checkpointInterval, self.__maxCheckpoints)
+            scheduler.time_travel = self.__timeTravel
+            for device in self.__devices:
+                if isinstance(device, Processor):
+                    device.select_engine("interp")
+                elif isinstance(device, (Console, RTC)):
+                    device.input_log = self.__timeTravel.input_log
+
+    def start_debug_server(self) -> None:
+        """
+        Starts the debug server if it is enabled.  This is done before any device starts, so that a debugger can
+        attach before the program gets far.
+
+        """
+        self.__debugServer = None
+        if self.__debugServerAddress is not None:
+            self.__debugServer = DebugServer(self.__debugServerAddress, self.__debugger,
+                                             [device for device in self.__devices if isinstance(device, Processor)],
+                                             self.__memoryMap, self.__symbolTable, self.__controlBus,
+                                             self.__interruptBus)
+            self.__debugServer.start()
+
+    def close(self) -> None:
+        """
+        Closes every device once the machine won't be run or inspected again, releasing anything they hold outside
+        the machine, such as mapped image files.
+
+        """
+        for device in self.__devices:
+            device.close()
+
+    def write_traces(self) -> None:
+        """
+        Writes the traces of every processor to the trace file once the machine has halted.
+
+        """
+        if self.__tracers:
+            ExecutionTracer.write_trace_file(self.__tracers, self.__symbolTable, self.__tracePathname)
+            print(f"Execution trace written to {self.__tracePathname}.")
+
+    def start_profilers(self) -> None:
+        """
+        Starts a guest profiler for each processor if profiling is enabled.
+
+        """
+        self.__profilers = []
+        if self.__profileSampleInterval is not None:
+            for device in self.__devices:
+                if isinstance(device, Processor):
+                    profiler = GuestProfiler(device, self.__symbolTable, self.__profileSampleInterval)
+                    profiler.start()
+                    self.__profilers.append(profiler)
+
+    def stop_profilers(self) -> None:
+        """
+        Stops the guest profilers, prints their flat profiles and writes their collapsed stacks.
+        When there is more than one processor, each stack is rooted at the processor's device ID.
+
+        """
+        for profiler in self.__profilers:
+            profiler.stop()
+            print(profiler.format_flat_profile())
+        if self.__profilers and self.__profilePathname is not None:
+            with open(self.__profilePathname, 'w') as file:
+                for profiler in self.__profilers:
+                    profiler.write_collapsed_stacks(file, profiler.processor.device_id if len(self.__profilers) > 1 else "")
 
     def wait_for_devices_to_finish(self) -> None:
         """
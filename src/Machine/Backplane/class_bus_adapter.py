@@ -0,0 +1,94 @@
+from Machine.Backplane.class_bus_arbiter import BusArbiter
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+
+
+class BusAdapter:
+    """
+    The BusAdapter class lets threaded devices take part in direct memory-mapped access.
+    Reads and writes are performed as a full handshake over the address, data, and control buses, which is
+    serviced by the device's own thread.
+    """
+
+    def __init__(self, address_bus: AddressBus, data_bus: DataBus, control_bus: ControlBus) -> None:
+        """
+        Constructor for the BusAdapter class.
+        :param address_bus: The address bus of the backplane.
+        :param data_bus: The data bus of the backplane.
+        :param control_bus: The control bus of the backplane.
+        """
+        self.__addressBus = address_bus
+        self.__dataBus = data_bus
+        self.__controlBus = control_bus
+        self.__arbiter: BusArbiter | None = None
+
+    @property
+    def arbiter(self) -> BusArbiter | None:
+        """
+        This property returns the arbiter that serialises transactions from several processors.
+        :return: The arbiter, or None if only one processor uses the buses.
+        """
+        return self.__arbiter
+
+    @arbiter.setter
+    def arbiter(self, value: BusArbiter | None):
+        """
+        This property sets the arbiter that serialises transactions from several processors.
+        :param value: The arbiter, or None if only one processor uses the buses.
+        """
+        self.__arbiter = value
+
+    def read(self, address: int) -> int:
+        """
+        Reads a value by placing a read request on the bus and waiting for the owning device to respond.
+        :param address: The address to read from.
+        :return: The value placed on the data bus by the device.
+        """
+        if self.__arbiter is not None:
+            with self.__arbiter:
+                return self.perform_read(address)
+        return self.perform_read(address)
+
+    def perform_read(self, address: int) -> int:
+        """
+        Performs the read handshake.  When there are several processors, the caller holds the bus grant.
+        :param address: The address to read from.
+        :return: The value placed on the data bus by the device.
+        """
+        self.__controlBus.lock_bus()
+        self.__addressBus.address = address
+        self.__controlBus.read_request = True
+        self.__controlBus.signal_bus()
+        self.__controlBus.wait_for_response()
+        value: int = self.__dataBus.data
+        self.__controlBus.response = False
+        self.__controlBus.unlock_bus()
+        return value
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a value by placing a write request on the bus and waiting for the owning device to respond.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        if self.__arbiter is not None:
+            with self.__arbiter:
+                self.perform_write(address, value)
+        else:
+            self.perform_write(address, value)
+
+    def perform_write(self, address: int, value: int) -> None:
+        """
+        Performs the write handshake.  When there are several processors, the caller holds the bus grant.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        self.__controlBus.lock_bus()
+        self.__addressBus.address = address
+        self.__dataBus.data = value
+        self.__controlBus.write_request = True
+        self.__controlBus.signal_bus()
+        self.__controlBus.wait_for_response()
+        self.__controlBus.response = False
+        self.__controlBus.unlock_bus()
@@ -0,0 +1,68 @@
+from threading import Condition, Lock, get_ident
+
+
+class BusArbiter:
+    """
+    The BusArbiter class grants bus cycles to processors fairly when several processors share a backplane.
+    Requests are granted strictly in the order they were made (a ticket lock), so no processor can be starved by
+    another that keeps re-requesting the bus.  A processor holds the grant for a whole bus transaction or atomic
+    read-modify-write, and releases it when the transaction is complete.  The grant is re-entrant, so a
+    processor holding it may start a bus transaction of its own.
+    The arbiter is used as a context manager:
+
+        with arbiter:
+            ...
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for the BusArbiter class.
+        """
+        self.__grant = Condition(Lock())
+        self.__nextTicket: int = 0
+        self.__nowServing: int = 0
+        self.__grants: int = 0
+        self.__owner: int | None = None
+        self.__depth: int = 0
+
+    @property
+    def grants(self) -> int:
+        """
+        This property returns the number of bus cycles granted so far.
+        :return: The number of grants.
+        """
+        return self.__grants
+
+    def acquire(self) -> None:
+        """
+        This method waits until every earlier request has been served, then grants the bus to the caller.
+        """
+        if self.__owner == get_ident():
+            self.__depth += 1
+            return
+        with self.__grant:
+            ticket = self.__nextTicket
+            self.__nextTicket += 1
+            self.__grant.wait_for(lambda: self.__nowServing == ticket)
+            self.__grants += 1
+        self.__owner = get_ident()
+        self.__depth = 1
+
+    def release(self) -> None:
+        """
+        This method releases the bus and grants it to the next waiting request.
+        """
+        self.__depth -= 1
+        if self.__depth > 0:
+            return
+        self.__owner = None
+        with self.__grant:
+            self.__nowServing += 1
+            self.__grant.notify_all()
+
+    def __enter__(self) -> "BusArbiter":
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.release()
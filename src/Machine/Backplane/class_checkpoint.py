@@ -0,0 +1,34 @@
+from typing import Dict, List, NamedTuple, Tuple
+
+
+class Checkpoint(NamedTuple):
+    """
+    The state of a machine at one step, taken by the time travel facility.
+    Only the pages of RAM that changed since the checkpoint before are held; the rest of memory is rebuilt from
+    the older checkpoints.
+    """
+    step: int
+    """
+    The number of steps the cooperative scheduler had taken.
+    """
+    interrupts: List[int]
+    """
+    The interrupts pending on the interrupt bus, except the halt interrupt.
+    """
+    device_states: List[bytes | None]
+    """
+    The state written by each device's save_state method, in the order the devices were attached, or None for
+    RAM.
+    """
+    pages: List[Dict[int, List[int]]]
+    """
+    For each RAM device, the pages that changed since the checkpoint before, keyed by their offset in the device.
+    """
+    processor_counters: List[Tuple[int, int]]
+    """
+    The instructions retired and interrupts serviced by each processor.
+    """
+    input_position: int
+    """
+    The number of samples taken from the input log.
+    """
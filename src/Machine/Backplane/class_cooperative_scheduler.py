@@ -0,0 +1,125 @@
+import time
+from typing import Callable, List
+
+from Constants.class_interrupts import Interrupts
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Processors.class_processor import Processor
+
+DEFAULT_TIME_SLICE = 64
+"""
+The number of processor steps between rounds of device servicing in the cooperative scheduler.
+"""
+
+IDLE_SLEEP_SECONDS = 0.001
+"""
+How long the cooperative scheduler sleeps between rounds while every processor is asleep.
+"""
+
+
+class CooperativeScheduler:
+    """
+    The CooperativeScheduler class runs a whole machine on a single thread.
+    Each round steps every processor for a fixed time slice, then services every other device once, in the
+    order the devices were attached.  Because nothing depends on the operating system's thread scheduling, runs
+    are reproducible, and the bus lock is never taken.  A processor that places a request on the buses for a
+    threaded-style device gets its response by pumping the devices until one answers.
+
+    Devices that need real-time behaviour keep their own helper threads (the console's display window and the
+    sound card's playback), and exchange data with their device through queues.
+
+    The scheduler counts the steps it has taken, and rounds always end on a multiple of the time slice, so a run
+    that is stopped part way through a round and resumed services the devices at the same steps.  This is what
+    lets the time travel facility replay the machine from a checkpoint.
+    """
+
+    def __init__(self, devices: List[BaseDevice], control_bus: ControlBus, interrupt_bus: InterruptBus,
+                 monitor: Callable[[], None], time_slice: int = DEFAULT_TIME_SLICE) -> None:
+        """
+        Constructor for the CooperativeScheduler class.
+        :param devices: The devices attached to the backplane.
+        :param control_bus: The control bus of the backplane.
+        :param interrupt_bus: The interrupt bus of the backplane.
+        :param monitor: Called after every round to detect halt and timeouts; it turns power off to stop the run.
+        :param time_slice: The number of steps each processor takes per round.
+        """
+        self.__processors: List[Processor] = [device for device in devices if isinstance(device, Processor)]
+        self.__devices: List[BaseDevice] = [device for device in devices if not isinstance(device, Processor)]
+        self.__controlBus = control_bus
+        self.__interruptBus = interrupt_bus
+        self.__monitor = monitor
+        self.__timeSlice = time_slice
+        self.__replaying: bool = False
+        self.steps: int = 0  # the number of steps each processor has taken
+        self.time_travel = None  # set by the backplane when time travel is enabled
+
+    def run(self) -> None:
+        """
+        Runs the machine until power is turned off, then stops every device.
+        """
+        for device in self.__processors + self.__devices:
+            device.start_cooperative()
+        self.__controlBus.enable_cooperative_mode(self.pump)
+        processors = self.__processors
+        interrupt_bus = self.__interruptBus
+        halt_interrupt = 1 << Interrupts.halt
+        time_slice = self.__timeSlice
+        time_travel = self.time_travel
+        if time_travel is not None:
+            time_travel.take_checkpoint()
+        while self.__controlBus.power_on:
+            steps = self.steps
+            position = 0
+            for position in range(time_slice - steps % time_slice):
+                for processor in processors:
+                    processor.step()
+                if interrupt_bus.pending & halt_interrupt:
+                    break
+            self.steps = steps + position + 1
+            self.pump()
+            if time_travel is not None and self.steps >= time_travel.next_checkpoint and self.__controlBus.power_on:
+                time_travel.take_checkpoint()
+            if all(processor.sleeping for processor in processors):
+                time.sleep(IDLE_SLEEP_SECONDS)
+        if time_travel is not None:
+            # the step during which the machine stopped may not have finished, for example if it was waiting for a
+            # keystroke when it timed out, so it can't be replayed; the final state is kept as a checkpoint instead
+            time_travel.take_checkpoint()
+        for device in self.__processors + self.__devices:
+            device.finish_cooperative()
+
+    def run_to(self, step: int) -> None:
+        """
+        Replays the machine up to a step it has already reached, after the time travel facility has restored an
+        earlier checkpoint.  Power is turned on while replaying so that bus requests are answered, and the monitor
+        isn't run, so the replay is neither halted nor timed out.
+        :param step: The step to stop at.
+        """
+        processors = self.__processors
+        time_slice = self.__timeSlice
+        power_on = self.__controlBus.power_on
+        self.__controlBus.power_on = True
+        self.__replaying = True
+        try:
+            while self.steps < step:
+                steps = self.steps
+                count = min(time_slice - steps % time_slice, step - steps)
+                for _ in range(count):
+                    for processor in processors:
+                        processor.step()
+                self.steps = steps + count
+                if self.steps % time_slice == 0:
+                    self.pump()
+        finally:
+            self.__replaying = False
+            self.__controlBus.power_on = power_on
+
+    def pump(self) -> None:
+        """
+        Services every device other than the processors once, then lets the monitor check for halt.
+        """
+        for device in self.__devices:
+            device.service()
+        if not self.__replaying:
+            self.__monitor()
@@ -0,0 +1,87 @@
+from typing import Callable, Dict, List, Tuple
+
+
+class InputLog:
+    """
+    The InputLog class records the values a machine reads from sources outside it, such as keystrokes and the host
+    clock, so that replaying the machine from a checkpoint sees exactly the same inputs at exactly the same points.
+
+    Devices read each such source through sample, once per service.  Samples are numbered in the order they are
+    taken.  Under the cooperative scheduler the machine is deterministic, so the n-th sample of a replay is the
+    n-th sample of the original run: samples up to the furthest one taken are answered from the log without
+    reading the source, and later samples read the source and are logged.  Only samples that returned values are
+    stored.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for the InputLog class.
+        """
+        self.__entries: Dict[int, Tuple[str, List[int]]] = {}
+        self.__position: int = 0  # the number of the next sample
+        self.__recorded: int = 0  # the number of samples taken from the sources
+
+    @property
+    def position(self) -> int:
+        """
+        This property returns the number of the next sample.
+        :return: The number of samples taken so far on the current timeline.
+        """
+        return self.__position
+
+    @position.setter
+    def position(self, value: int):
+        """
+        This property moves the log to an earlier sample, when the machine is restored to a checkpoint.
+        :param value: The number of the next sample.
+        """
+        self.__position = value
+
+    @property
+    def recorded(self) -> int:
+        """
+        This property returns the number of samples taken from the sources, including those since replayed.
+        :return: The number of samples recorded.
+        """
+        return self.__recorded
+
+    @property
+    def entries(self) -> int:
+        """
+        This property returns the number of samples held in the log.
+        :return: The number of samples that returned values and have not been discarded.
+        """
+        return len(self.__entries)
+
+    def sample(self, source: str, read: Callable[[], List[int]]) -> List[int]:
+        """
+        This method takes the next sample of a source: the logged values if the sample has been taken before,
+        otherwise the values read from the source, which are logged.
+        :param source: The device ID of the device taking the sample.
+        :param read: Reads the source, returning the values available now, or an empty list.
+        :return: The values of the sample.
+        """
+        position = self.__position
+        self.__position = position + 1
+        if position < self.__recorded:
+            entry = self.__entries.get(position)
+            if entry is None:
+                return []
+            if entry[0] != source:
+                raise RuntimeError(f"Replay diverged at input sample {position}: it was taken by {entry[0]}, "
+                                   f"not {source}.")
+            return entry[1]
+        values = read()
+        if values:
+            self.__entries[position] = (source, values)
+        self.__recorded = position + 1
+        return values
+
+    def discard_before(self, position: int) -> None:
+        """
+        This method discards the samples that can no longer be replayed, because they were taken before the
+        oldest checkpoint.
+        :param position: The number of the first sample to keep.
+        """
+        for discarded in [sample for sample in self.__entries if sample < position]:
+            del self.__entries[discarded]
@@ -0,0 +1,103 @@
+import struct
+from typing import List
+
+from Constants.class_interrupts import Interrupts
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+
+SNAPSHOT_MAGIC = b"RBSNAP"
+SNAPSHOT_VERSION = 3
+
+_HEADER = struct.Struct("<6sHH")
+
+
+class MachineSnapshot:
+    """
+    The MachineSnapshot class saves and restores the state of a whole machine in a compact binary form.
+
+    A snapshot is a small header (magic, version and device count) followed by the interrupts pending on the
+    interrupt bus and one record per device, in the order the devices were attached: the device's class name,
+    starting address and size, and the state written by its save_state method.  Memory is stored as packed
+    64-bit arrays, so saving or restoring a machine costs little more than copying its memory.
+
+    A snapshot can only be restored into a machine built with the same devices, in the same order, at the same
+    addresses.  The halt interrupt is never saved, so a machine snapshotted after it halted resumes running.
+    """
+
+    @staticmethod
+    def capture(devices: List[BaseDevice], interrupt_bus: InterruptBus) -> bytes:
+        """
+        Captures the state of a machine that is not running.
+
+        Parameters:
+            devices (list): The devices attached to the backplane.
+            interrupt_bus (InterruptBus): The interrupt bus of the backplane.
+
+        Returns:
+            bytes: The snapshot.
+        """
+        writer = StateWriter()
+        writer.write_ints([interrupt for interrupt in interrupt_bus.active_interrupts if interrupt != Interrupts.halt])
+        for device in devices:
+            device_writer = StateWriter()
+            device.save_state(device_writer)
+            writer.write_string(type(device).__name__)
+            writer.write_int(device.starting_address)
+            writer.write_int(device.size)
+            writer.write_bytes(device_writer.get_bytes())
+        return _HEADER.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, len(devices)) + writer.get_bytes()
+
+    @staticmethod
+    def restore(devices: List[BaseDevice], interrupt_bus: InterruptBus, snapshot: bytes) -> None:
+        """
+        Restores the state of a machine that has been built but not yet run.
+
+        Parameters:
+            devices (list): The devices attached to the backplane.
+            interrupt_bus (InterruptBus): The interrupt bus of the backplane.
+            snapshot (bytes): A snapshot returned by capture.
+
+        Raises:
+            ValueError: If the data is not a snapshot, or the machine's devices don't match the snapshot's.
+        """
+        if len(snapshot) < _HEADER.size:
+            raise ValueError("Snapshot is truncated.")
+        magic, version, device_count = _HEADER.unpack_from(snapshot)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError("Data is not a machine snapshot.")
+        if version != SNAPSHOT_VERSION:
+            raise ValueError(f"Snapshot version {version} is not supported.")
+        if device_count != len(devices):
+            raise ValueError(f"Snapshot has {device_count} devices but the machine has {len(devices)}.")
+        reader = StateReader(snapshot[_HEADER.size:])
+        interrupts = reader.read_ints()
+        for device in devices:
+            device_type = reader.read_string()
+            starting_address = reader.read_int()
+            size = reader.read_int()
+            if (device_type, starting_address, size) != (type(device).__name__, device.starting_address, device.size):
+                raise ValueError(f"Snapshot device {device_type} at address {starting_address} (size {size}) "
+                                 f"does not match {device.device_id} at address {device.starting_address} "
+                                 f"(size {device.size}).")
+            device_reader = StateReader(reader.read_bytes())
+            device.restore_state(device_reader)
+            if not device_reader.at_end:
+                raise ValueError(f"Snapshot state for {device.device_id} was not fully read.")
+        interrupt_bus.active_interrupts = interrupts
+
+    @staticmethod
+    def save(devices: List[BaseDevice], interrupt_bus: InterruptBus, pathname: str) -> None:
+        """
+        Captures the state of a machine that is not running and writes it to a file.
+        """
+        with open(pathname, 'wb') as file:
+            file.write(MachineSnapshot.capture(devices, interrupt_bus))
+
+    @staticmethod
+    def load(devices: List[BaseDevice], interrupt_bus: InterruptBus, pathname: str) -> None:
+        """
+        Reads a snapshot from a file and restores it into a machine that has not yet run.
+        """
+        with open(pathname, 'rb') as file:
+            MachineSnapshot.restore(devices, interrupt_bus, file.read())
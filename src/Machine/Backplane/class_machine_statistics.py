@@ -0,0 +1,117 @@
+import time
+from typing import List
+
+from Machine.Backplane.class_memory_map import MemoryMap
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Processors.class_processor import Processor
+
+DEFAULT_STATISTICS_INTERVAL = 5.0
+"""
+The number of seconds between periodic statistics reports when no interval is given.
+"""
+
+
+class MachineStatistics:
+    """
+    The MachineStatistics class gathers performance counters from the devices attached to a backplane.
+    The counters themselves live with the thread that updates them (the processor's instruction and data cache
+    counters, the memory map's per-device access counts, and the control bus's per-thread lock wait times), so
+    nothing is shared or locked while the machine runs.  They are only added up when a snapshot is taken.
+    """
+
+    def __init__(self, devices: List[BaseDevice], memory_map: MemoryMap, control_bus: ControlBus) -> None:
+        """
+        Constructor for the MachineStatistics class.
+        :param devices: The devices attached to the backplane.
+        :param memory_map: The backplane's address decoder, which counts the accesses routed to each device.
+        :param control_bus: The backplane's control bus, which measures lock wait times once enabled.
+        """
+        self.__devices = devices
+        self.__memoryMap = memory_map
+        self.__controlBus = control_bus
+        self.__startTime: float = time.monotonic()
+        self.__lastTime: float = self.__startTime
+        self.__lastInstructions: int = 0
+
+    def start(self) -> None:
+        """
+        Resets the reporting clock and turns on lock wait measurement.  Called when the machine starts running.
+        """
+        self.__controlBus.enable_lock_wait_measurement()
+        self.__startTime = time.monotonic()
+        self.__lastTime = self.__startTime
+        self.__lastInstructions = self.get_instructions_retired()
+
+    def get_instructions_retired(self) -> int:
+        """
+        Returns the total number of instructions retired by every processor on the backplane.
+        """
+        return sum(processor.instructions_retired for processor in self.get_processors())
+
+    def get_processors(self) -> List[Processor]:
+        """
+        Returns the processors attached to the backplane.
+        """
+        return [device for device in self.__devices if isinstance(device, Processor)]
+
+    def snapshot(self) -> dict:
+        """
+        Adds up the counters and returns them as a dictionary.
+        The instruction rate is given both since the machine started and since the previous snapshot.
+        :return: The machine statistics.
+        """
+        now = time.monotonic()
+        instructions = self.get_instructions_retired()
+        elapsed = now - self.__startTime
+        interval = now - self.__lastTime
+        interval_instructions = instructions - self.__lastInstructions
+        self.__lastTime = now
+        self.__lastInstructions = instructions
+
+        processors = {}
+        for processor in self.get_processors():
+            cache = processor.data_cache
+            lookups = cache.hits + cache.misses
+            processors[processor.device_id] = {
+                "instructions": processor.instructions_retired,
+                "interrupts_serviced": processor.interrupts_serviced,
+                "cache_hits": cache.hits,
+                "cache_misses": cache.misses,
+                "cache_evictions": cache.evictions,
+                "cache_hit_rate": cache.hits / lookups if lookups else 0.0,
+            }
+        bus_accesses = {device_id: {"reads": reads, "writes": writes}
+                        for device_id, (reads, writes) in self.__memoryMap.get_access_counts().items()}
+        return {
+            "elapsed": elapsed,
+            "instructions": instructions,
+            "instructions_per_second": instructions / elapsed if elapsed > 0 else 0.0,
+            "interval_instructions_per_second": interval_instructions / interval if interval > 0 else 0.0,
+            "processors": processors,
+            "bus_accesses": bus_accesses,
+            "lock_wait_seconds": self.__controlBus.lock_wait_times,
+        }
+
+    @staticmethod
+    def format_snapshot(snapshot: dict) -> str:
+        """
+        Formats a statistics snapshot as human-readable text.
+        :param snapshot: A snapshot returned by the snapshot method.
+        :return: The formatted statistics.
+        """
+        lines = [f"Statistics after {snapshot['elapsed']:.1f} seconds:",
+                 f"   Instructions: {snapshot['instructions']} "
+                 f"({snapshot['instructions_per_second']:,.0f}/s overall, "
+                 f"{snapshot['interval_instructions_per_second']:,.0f}/s recently)"]
+        for device_id, counters in snapshot["processors"].items():
+            lines.append(f"   {device_id}: {counters['instructions']} instructions, "
+                         f"{counters['interrupts_serviced']} interrupts serviced, "
+                         f"cache {counters['cache_hits']} hits / {counters['cache_misses']} misses "
+                         f"({counters['cache_hit_rate']:.1%}), {counters['cache_evictions']} evictions")
+        for device_id, counters in snapshot["bus_accesses"].items():
+            if counters["reads"] or counters["writes"]:
+                lines.append(f"   {device_id}: {counters['reads']} reads, {counters['writes']} writes")
+        for thread_name, seconds in sorted(snapshot["lock_wait_seconds"].items()):
+            lines.append(f"   {thread_name}: {seconds * 1000:.1f} ms waiting for the bus lock")
+        return "\n".join(lines)
@@ -0,0 +1,348 @@
+from bisect import bisect_right
+from typing import Callable, List
+
+from Machine.Backplane.class_bus_adapter import BusAdapter
+from Machine.Backplane.class_bus_arbiter import BusArbiter
+from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Diagnostics.class_watchpoint import Watchpoint
+
+
+class MemoryMap:
+    """
+    The MemoryMap class is the backplane's address decoder.
+    It holds a sorted table of address ranges and routes each read or write straight to the device that owns
+    the address.  Devices that support direct access are called synchronously; all other devices, and any
+    address that no device claims, are reached through the bus adapter.
+
+    Watched address ranges are given entries of their own, whose reader or writer reports each access to the
+    watch handler, so the rest of memory is decoded exactly as if nothing were watched.
+    """
+
+    def __init__(self, bus_adapter: BusAdapter) -> None:
+        """
+        Constructor for the MemoryMap class.
+        :param bus_adapter: The adapter used to reach threaded devices over the buses.
+        """
+        self.__busAdapter = bus_adapter
+        self.__mappedDevices: List[BaseDevice] = []
+        self.__watchpoints: List[Watchpoint] = []
+        self.__watchHandler: Callable[[int, int, bool], None] | None = None
+        self.__starts: List[int] = []
+        self.__ends: List[int] = []
+        self.__devices: List[BaseDevice] = []
+        self.__readers: List[Callable[[int], int]] = []
+        self.__writers: List[Callable[[int, int], None]] = []
+        self.__cacheable: List[bool] = []
+        self.__direct: List[bool] = []  # True if blocks can be read from and written to the device directly
+        self.__readCounts: List[int] = []
+        self.__writeCounts: List[int] = []
+        self.__unmappedReads: int = 0
+        self.__unmappedWrites: int = 0
+
+    @property
+    def arbiter(self) -> BusArbiter | None:
+        """
+        This property returns the arbiter that grants the buses to one processor at a time.
+        Processors also hold it for atomic read-modify-write instructions.
+        :return: The arbiter, or None if only one processor runs at a time.
+        """
+        return self.__busAdapter.arbiter
+
+    @arbiter.setter
+    def arbiter(self, value: BusArbiter | None):
+        """
+        This property sets the arbiter that grants the buses to one processor at a time.
+        :param value: The arbiter, or None if only one processor runs at a time.
+        """
+        self.__busAdapter.arbiter = value
+
+    @property
+    def watchpoints(self) -> List[Watchpoint]:
+        """
+        This property returns the address ranges being watched.
+        :return: The watchpoints.
+        """
+        return self.__watchpoints
+
+    def build(self, devices: List[BaseDevice]) -> None:
+        """
+        Builds the address decoding table from the devices attached to the backplane.
+        Devices with no address space (such as the processor) are not mapped.
+        If address ranges overlap, the device with the lowest starting address owns the overlapping addresses.
+        :param devices: The devices attached to the backplane.
+        :raises ValueError: If a device supports direct access but doesn't implement read and write.
+        """
+        self.__mappedDevices = sorted((device for device in devices if device.size > 0),
+                                      key=lambda device: device.starting_address)
+        for device in self.__mappedDevices:
+            if device.supports_direct_access and not (callable(getattr(device, "read", None))
+                                                      and callable(getattr(device, "write", None))):
+                raise ValueError(f"{device.device_id} supports direct access but doesn't implement read and write.")
+        self.__readCounts = []
+        self.__writeCounts = []
+        self.__unmappedReads = 0
+        self.__unmappedWrites = 0
+        self.build_table()
+
+    def set_watchpoints(self, watchpoints: List[Watchpoint], handler: Callable[[int, int, bool], None] | None) -> None:
+        """
+        Sets the address ranges to watch and rebuilds the decoding table.  This must be done while the machine is
+        stopped, or from the thread that runs it under the cooperative scheduler.  Processors may hold watched
+        addresses in their data caches, which must be cleared.
+        :param watchpoints: The watchpoints.
+        :param handler: Called after each watched access with the address, the value read or written, and True
+            for a write.
+        """
+        self.__watchpoints = list(watchpoints)
+        self.__watchHandler = handler
+        self.build_table()
+
+    def build_table(self) -> None:
+        """
+        Builds the decoding table from the mapped devices, splitting each device's range wherever a watchpoint
+        starts or ends.  Access counts are carried over to the rebuilt table.
+        """
+        previous_counts = {}
+        for device, reads, writes in zip(self.__devices, self.__readCounts, self.__writeCounts):
+            previous_reads, previous_writes = previous_counts.get(device, (0, 0))
+            previous_counts[device] = (previous_reads + reads, previous_writes + writes)
+        self.__starts = []
+        self.__ends = []
+        self.__devices = []
+        self.__readers = []
+        self.__writers = []
+        self.__cacheable = []
+        self.__direct = []
+        self.__readCounts = []
+        self.__writeCounts = []
+        for device in self.__mappedDevices:
+            start = device.starting_address
+            end = start + device.size
+            if self.__ends and start < self.__ends[-1]:
+                start = self.__ends[-1]
+                if start >= end:
+                    continue
+            reads, writes = previous_counts.get(device, (0, 0))
+            boundaries = sorted({start, end} | {address for watchpoint in self.__watchpoints
+                                                for address in (watchpoint.start, watchpoint.end)
+                                                if start < address < end})
+            for range_start, range_end in zip(boundaries, boundaries[1:]):
+                watched = [watchpoint for watchpoint in self.__watchpoints
+                           if watchpoint.start < range_end and range_start < watchpoint.end]
+                self.add_entry(device, range_start, range_end, any(watchpoint.reads for watchpoint in watched),
+                               any(watchpoint.writes for watchpoint in watched), reads, writes)
+                reads, writes = 0, 0
+
+    def add_entry(self, device: BaseDevice, start: int, end: int, watch_reads: bool, watch_writes: bool,
+                  reads: int, writes: int) -> None:
+        """
+        Adds an address range owned by a device to the decoding table.
+        :param device: The device that owns the range.
+        :param start: The first address of the range.
+        :param end: The address just past the last address of the range.
+        :param watch_reads: True if reads from the range are reported to the watch handler.
+        :param watch_writes: True if writes to the range are reported to the watch handler.
+        :param reads: The number of reads already counted against the range.
+        :param writes: The number of writes already counted against the range.
+        """
+        if device.supports_direct_access:
+            reader, writer = device.read, device.write
+        else:
+            reader, writer = self.__busAdapter.read, self.__busAdapter.write
+        watch_handler = self.__watchHandler
+        if watch_reads:
+            unwatched_reader = reader
+
+            def reader(address: int) -> int:
+                value = unwatched_reader(address)
+                watch_handler(address, value, False)
+                return value
+        if watch_writes:
+            unwatched_writer = writer
+
+            def writer(address: int, value: int) -> None:
+                unwatched_writer(address, value)
+                watch_handler(address, value, True)
+        self.__starts.append(start)
+        self.__ends.append(end)
+        self.__devices.append(device)
+        self.__readers.append(reader)
+        self.__writers.append(writer)
+        # a cached copy would be read without reaching the watch handler
+        self.__cacheable.append(device.cacheable and not watch_reads)
+        self.__direct.append(device.supports_direct_access and not watch_reads and not watch_writes)
+        self.__readCounts.append(reads)
+        self.__writeCounts.append(writes)
+
+    def find_device(self, address: int) -> BaseDevice | None:
+        """
+        Finds the device that owns an address.
+        :param address: The address to look up.
+        :return: The device that owns the address, or None if no device claims it.
+        """
+        index = bisect_right(self.__starts, address) - 1
+        if index >= 0 and address < self.__ends[index]:
+            return self.__devices[index]
+        return None
+
+    def is_cacheable(self, address: int) -> bool:
+        """
+        Checks whether the value at an address may be held in a processor's data cache.
+        Addresses that no device claims are never cacheable.
+        :param address: The address to check.
+        :return: True if the owning device is cacheable and the address isn't watched for reads, False otherwise.
+        """
+        index = bisect_right(self.__starts, address) - 1
+        if index >= 0 and address < self.__ends[index]:
+            return self.__cacheable[index]
+        return False
+
+    def read(self, address: int) -> int:
+        """
+        Reads a value from the device that owns the address.
+        :param address: The address to read from.
+        :return: The value at the address.
+        """
+        index = bisect_right(self.__starts, address) - 1
+        if index >= 0 and address < self.__ends[index]:
+            self.__readCounts[index] += 1
+            return self.__readers[index](address)
+        self.__unmappedReads += 1
+        return self.__busAdapter.read(address)
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a value to the device that owns the address.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        index = bisect_right(self.__starts, address) - 1
+        if index >= 0 and address < self.__ends[index]:
+            self.__writeCounts[index] += 1
+            self.__writers[index](address, value)
+        else:
+            self.__unmappedWrites += 1
+            self.__busAdapter.write(address, value)
+
+    def read_block(self, address: int, length: int) -> List[int]:
+        """
+        Reads consecutive values, which may span several devices.  Each device that supports direct access is
+        read a block at a time; other devices, watched addresses, and addresses that no device claims, are read a
+        word at a time.
+        :param address: The address of the first value.
+        :param length: The number of values to read.
+        :return: The values.
+        """
+        values: List[int] = []
+        end_address = address + length
+        while address < end_address:
+            index = bisect_right(self.__starts, address) - 1
+            if index >= 0 and address < self.__ends[index]:
+                block_end = min(end_address, self.__ends[index])
+                if self.__direct[index]:
+                    values += self.__devices[index].read_block(address, block_end - address)
+                else:
+                    reader = self.__readers[index]
+                    values += [reader(word_address) for word_address in range(address, block_end)]
+                self.__readCounts[index] += block_end - address
+            else:
+                block_end = min(end_address, self.__starts[index + 1]) if index + 1 < len(self.__starts) \
+                    else end_address
+                values += [self.__busAdapter.read(word_address) for word_address in range(address, block_end)]
+                self.__unmappedReads += block_end - address
+            address = block_end
+        return values
+
+    def write_block(self, address: int, values: List[int]) -> None:
+        """
+        Writes consecutive values, which may span several devices.  Each device that supports direct access is
+        written a block at a time; other devices, watched addresses, and addresses that no device claims, are
+        written a word at a time.
+        :param address: The address of the first value.
+        :param values: The values to write.
+        """
+        end_address = address + len(values)
+        position = 0
+        while address < end_address:
+            index = bisect_right(self.__starts, address) - 1
+            if index >= 0 and address < self.__ends[index]:
+                block_end = min(end_address, self.__ends[index])
+                block = values[position:position + block_end - address]
+                if self.__direct[index]:
+                    self.__devices[index].write_block(address, block)
+                else:
+                    writer = self.__writers[index]
+                    for word_address, value in enumerate(block, address):
+                        writer(word_address, value)
+                self.__writeCounts[index] += block_end - address
+            else:
+                block_end = min(end_address, self.__starts[index + 1]) if index + 1 < len(self.__starts) \
+                    else end_address
+                for word_address, value in enumerate(values[position:position + block_end - address], address):
+                    self.__busAdapter.write(word_address, value)
+                self.__unmappedWrites += block_end - address
+            position += block_end - address
+            address = block_end
+
+    def peek_block(self, address: int, length: int) -> List[int | None]:
+        """
+        Reads consecutive values straight from the memory of the devices that support direct access, a block per
+        device, for a debugger.  Nothing goes over the buses, the access counts are left alone, and watchpoints
+        aren't triggered.  Addresses of other devices, and addresses that no device claims, read as None.
+        :param address: The address of the first value.
+        :param length: The number of values to read.
+        :return: The values.
+        """
+        values: List[int | None] = []
+        end_address = address + length
+        while address < end_address:
+            index = bisect_right(self.__starts, address) - 1
+            if index >= 0 and address < self.__ends[index]:
+                block_end = min(end_address, self.__ends[index])
+                device = self.__devices[index]
+                if device.supports_direct_access:
+                    values += device.read_block(address, block_end - address)
+                else:
+                    values += [None] * (block_end - address)
+            else:
+                block_end = min(end_address, self.__starts[index + 1]) if index + 1 < len(self.__starts) \
+                    else end_address
+                values += [None] * (block_end - address)
+            address = block_end
+        return values
+
+    def poke_block(self, address: int, values: List[int]) -> None:
+        """
+        Writes consecutive values straight into the memory of the devices that support direct access, for a
+        debugger.  Nothing goes over the buses, the access counts are left alone, and watchpoints aren't
+        triggered.  The caller must discard any copies the processors hold.
+        :param address: The address of the first value.
+        :param values: The values to write.
+        """
+        end_address = address + len(values)
+        blocks = []
+        while address < end_address:
+            index = bisect_right(self.__starts, address) - 1
+            if index < 0 or address >= self.__ends[index] or not self.__devices[index].supports_direct_access:
+                raise ValueError(f"Address {address} is not in memory that can be written directly.")
+            block_end = min(end_address, self.__ends[index])
+            blocks.append((self.__devices[index], address, block_end))
+            address = block_end
+        # nothing is written unless every address can be
+        position = 0
+        for device, block_start, block_end in blocks:
+            device.write_block(block_start, values[position:position + block_end - block_start])
+            position += block_end - block_start
+
+    def get_access_counts(self) -> dict[str, tuple[int, int]]:
+        """
+        Returns the number of reads and writes routed to each device since the map was built.
+        Accesses to addresses that no device claims are reported under the key "unmapped".
+        :return: A dictionary of (reads, writes) keyed by device ID.
+        """
+        access_counts = {}
+        for device, reads, writes in zip(self.__devices, self.__readCounts, self.__writeCounts):
+            previous_reads, previous_writes = access_counts.get(device.device_id, (0, 0))
+            access_counts[device.device_id] = (previous_reads + reads, previous_writes + writes)
+        access_counts["unmapped"] = (self.__unmappedReads, self.__unmappedWrites)
+        return access_counts
@@ -0,0 +1,298 @@
+import struct
+from bisect import bisect_right
+from typing import Dict, List
+
+from Constants.class_interrupts import Interrupts
+from Machine.Backplane.class_checkpoint import Checkpoint
+from Machine.Backplane.class_cooperative_scheduler import CooperativeScheduler
+from Machine.Backplane.class_input_log import InputLog
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+from Machine.Devices.Memory.class_ram import RAM
+from Machine.Devices.Processors.class_processor import Processor
+
+DEFAULT_CHECKPOINT_INTERVAL = 10000
+"""
+The default number of steps between checkpoints.
+"""
+
+DEFAULT_MAX_CHECKPOINTS = 64
+"""
+The default number of checkpoints kept before the oldest is discarded.
+"""
+
+PAGE_SIZE = 256
+"""
+The number of words in a page of RAM.  A checkpoint holds only the pages that changed since the checkpoint before.
+"""
+
+
+class TimeTravel:
+    """
+    The TimeTravel class lets a machine run by the cooperative scheduler be taken back to an earlier step.
+
+    Every checkpoint_interval steps a checkpoint is taken: the state of every device, the pending interrupts, and
+    the pages of RAM that changed since the checkpoint before, found by comparing memory with a copy taken at that
+    checkpoint.  Keystrokes and clock readings go through the input log.  Because the cooperative scheduler is
+    deterministic, the machine reaches any earlier step by restoring the nearest checkpoint at or before it and
+    replaying from there with the logged inputs.
+
+    Storage is bounded: at most max_checkpoints are kept, and when another is taken the oldest is folded into the
+    base image of memory and discarded, along with the inputs logged before it.  Apart from the changed pages held
+    by the checkpoints, two copies of memory are kept: the base image and the copy at the newest checkpoint.
+    """
+
+    def __init__(self, scheduler: CooperativeScheduler, devices: List[BaseDevice], control_bus: ControlBus,
+                 interrupt_bus: InterruptBus, checkpoint_interval: int = DEFAULT_CHECKPOINT_INTERVAL,
+                 max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS) -> None:
+        """
+        Constructor for the TimeTravel class.
+        :param scheduler: The cooperative scheduler that runs the machine.
+        :param devices: The devices attached to the backplane.
+        :param control_bus: The control bus of the backplane.
+        :param interrupt_bus: The interrupt bus of the backplane.
+        :param checkpoint_interval: The number of steps between checkpoints.
+        :param max_checkpoints: The number of checkpoints kept.
+        """
+        if checkpoint_interval < 1:
+            raise ValueError("The checkpoint interval must be at least one step.")
+        if max_checkpoints < 1:
+            raise ValueError("At least one checkpoint must be kept.")
+        self.__scheduler = scheduler
+        self.__devices = devices
+        # memory that can't change needs no copies
+        self.__rams: List[RAM] = [device for device in devices if isinstance(device, RAM) and device.writable]
+        self.__processors: List[Processor] = [device for device in devices if isinstance(device, Processor)]
+        self.__controlBus = control_bus
+        self.__interruptBus = interrupt_bus
+        self.__checkpointInterval = checkpoint_interval
+        self.__maxCheckpoints = max_checkpoints
+        self.__inputLog = InputLog()
+        self.__checkpoints: List[Checkpoint] = []
+        self.__baseImages: List[List[int]] = []  # the memory of each RAM at the oldest checkpoint
+        self.__latestImages: List[List[int]] = []  # the memory of each RAM at the newest checkpoint
+        self.__furthestStep: int = 0
+        self.__unavailable: str | None = None  # why time travel stopped, if a checkpoint couldn't be taken
+        self.next_checkpoint: int = 0  # the step at which the scheduler takes the next checkpoint
+
+    @property
+    def input_log(self) -> InputLog:
+        """
+        This property returns the log of the inputs read by the console and the real-time clock.
+        :return: The input log.
+        """
+        return self.__inputLog
+
+    @property
+    def unavailable(self) -> str | None:
+        """
+        This property returns why time travel is unavailable, if a checkpoint couldn't be taken.
+        :return: The reason, or None if time travel is available.
+        """
+        return self.__unavailable
+
+    @property
+    def checkpoints(self) -> List[Checkpoint]:
+        """
+        This property returns the checkpoints held, oldest first.
+        :return: The checkpoints.
+        """
+        return self.__checkpoints
+
+    @property
+    def step(self) -> int:
+        """
+        This property returns the step the machine is at.
+        :return: The number of steps the cooperative scheduler has taken.
+        """
+        return self.__scheduler.steps
+
+    @property
+    def furthest_step(self) -> int:
+        """
+        This property returns the furthest step the machine has reached, which it can be replayed up to.
+        :return: The furthest step.
+        """
+        return max(self.__furthestStep, self.__scheduler.steps)
+
+    @property
+    def stored_words(self) -> int:
+        """
+        This property returns the number of memory words held for time travel.
+        :return: The words in the two copies of memory and in the changed pages of every checkpoint.
+        """
+        return (sum(len(image) for image in self.__baseImages + self.__latestImages)
+                + sum(len(page) for checkpoint in self.__checkpoints for pages in checkpoint.pages
+                      for page in pages.values()))
+
+    def take_checkpoint(self) -> None:
+        """
+        Takes a checkpoint at the current step, discarding the oldest checkpoint if too many are held.  The
+        scheduler calls this between rounds, when no bus request is in progress.  If a device's state can't be
+        saved, the checkpoints are discarded and time travel is unavailable for the rest of the run; the machine
+        carries on.
+        """
+        if self.__unavailable is not None:
+            return
+        device_states = []
+        for device in self.__devices:
+            if device in self.__rams:
+                device_states.append(None)
+            else:
+                writer = StateWriter()
+                try:
+                    device.save_state(writer)
+                except (ValueError, OverflowError, struct.error) as error:
+                    self.__unavailable = (f"Time travel unavailable: the state of {device.device_id} can't be "
+                                          f"saved ({error}).")
+                    self.__checkpoints.clear()
+                    self.__baseImages = []
+                    self.__latestImages = []
+                    return
+                device_states.append(writer.get_bytes())
+        if not self.__checkpoints:
+            self.__baseImages = [ram.copy_memory() for ram in self.__rams]
+            self.__latestImages = [ram.copy_memory() for ram in self.__rams]
+            pages = [{} for _ in self.__rams]
+        else:
+            pages = [self.find_changed_pages(ram, latest_image)
+                     for ram, latest_image in zip(self.__rams, self.__latestImages)]
+        step = self.__scheduler.steps
+        self.__checkpoints.append(Checkpoint(
+            step=step,
+            interrupts=[interrupt for interrupt in self.__interruptBus.active_interrupts
+                        if interrupt != Interrupts.halt],
+            device_states=device_states,
+            pages=pages,
+            processor_counters=[(processor.instructions_retired, processor.interrupts_serviced)
+                                for processor in self.__processors],
+            input_position=self.__inputLog.position))
+        if len(self.__checkpoints) > self.__maxCheckpoints:
+            self.discard_oldest_checkpoint()
+        self.next_checkpoint = step + self.__checkpointInterval
+
+    @staticmethod
+    def find_changed_pages(ram: RAM, latest_image: List[int]) -> Dict[int, List[int]]:
+        """
+        Finds the pages of a RAM device's memory that differ from the copy taken at the newest checkpoint, and
+        brings the copy up to date.
+        :param ram: The RAM device.
+        :param latest_image: The copy of the memory taken at the newest checkpoint.
+        :return: The changed pages, keyed by their offset.
+        """
+        changed_pages = {}
+        memory = ram.memory
+        if memory != latest_image:
+            for offset in range(0, len(memory), PAGE_SIZE):
+                page = ram.copy_memory(offset, offset + PAGE_SIZE)
+                if page != latest_image[offset:offset + PAGE_SIZE]:
+                    changed_pages[offset] = page
+                    latest_image[offset:offset + PAGE_SIZE] = page
+        return changed_pages
+
+    def discard_oldest_checkpoint(self) -> None:
+        """
+        Discards the oldest checkpoint.  The pages of the next checkpoint are folded into the base images, which
+        then hold memory as it was at that checkpoint.
+        """
+        del self.__checkpoints[0]
+        oldest = self.__checkpoints[0]
+        for base_image, pages in zip(self.__baseImages, oldest.pages):
+            for offset, page in pages.items():
+                base_image[offset:offset + len(page)] = page
+            pages.clear()
+        self.__inputLog.discard_before(oldest.input_position)
+
+    def restore_checkpoint(self, index: int) -> None:
+        """
+        Restores the machine to a checkpoint.
+        :param index: The index of the checkpoint, oldest first.
+        """
+        self.__furthestStep = self.furthest_step
+        checkpoint = self.__checkpoints[index]
+        for ram_index, ram in enumerate(self.__rams):
+            memory = ram.memory
+            memory[:] = self.__baseImages[ram_index]
+            for later_checkpoint in self.__checkpoints[1:index + 1]:
+                for offset, page in later_checkpoint.pages[ram_index].items():
+                    memory[offset:offset + len(page)] = page
+        for device, state in zip(self.__devices, checkpoint.device_states):
+            if state is not None:
+                device.restore_state(StateReader(state))
+        for processor, (instructions_retired, interrupts_serviced) in zip(self.__processors,
+                                                                         checkpoint.processor_counters):
+            processor.instructions_retired = instructions_retired
+            processor.interrupts_serviced = interrupts_serviced
+            processor.fault = None
+            processor.budget_exhausted = False
+            processor.pending_invalidations.clear()
+        self.__interruptBus.active_interrupts = checkpoint.interrupts
+        # checkpoints are taken between rounds, when no bus request is in progress, so a request abandoned when the
+        # machine stopped must not be left to answer a replayed one
+        self.__controlBus.read_request = False
+        self.__controlBus.write_request = False
+        self.__controlBus.response = False
+        self.__inputLog.position = checkpoint.input_position
+        self.__scheduler.steps = checkpoint.step
+
+    def go_to(self, step: int) -> None:
+        """
+        Takes the machine to a step between the oldest checkpoint and the furthest step reached, by restoring the
+        nearest checkpoint at or before it and replaying.  A later step on the same stretch is reached by replaying
+        from where the machine is.
+        :param step: The step to go to.
+        """
+        if self.__unavailable is not None:
+            raise ValueError(self.__unavailable)
+        if not self.__checkpoints or step < self.__checkpoints[0].step:
+            oldest = self.__checkpoints[0].step if self.__checkpoints else self.__scheduler.steps
+            raise ValueError(f"Step {step} is before the oldest checkpoint, at step {oldest}.")
+        if step > self.furthest_step:
+            raise ValueError(f"Step {step} has not been reached; the furthest step is {self.furthest_step}.")
+        index = bisect_right([checkpoint.step for checkpoint in self.__checkpoints], step) - 1
+        if not self.__checkpoints[index].step <= self.__scheduler.steps <= step:
+            self.restore_checkpoint(index)
+        self.__scheduler.run_to(step)
+
+    def step_back(self, steps: int = 1) -> int:
+        """
+        Takes the machine back a number of steps.
+        :param steps: The number of steps to go back.
+        :return: The step the machine is at.
+        """
+        step = self.__scheduler.steps - steps
+        self.go_to(step)
+        return step
+
+    def run_back_to(self, address: int, processor: Processor | None = None) -> int | None:
+        """
+        Takes the machine back to the last step before the current one at which a processor's instruction pointer
+        held an address.  The checkpoints are searched newest first, replaying the stretch after each one.
+        :param address: The address to run back to.
+        :param processor: The processor whose instruction pointer is watched, or None for the first processor.
+        :return: The step the machine is at, or None if the address wasn't reached since the oldest checkpoint, in
+        which case the machine is left where it was.
+        """
+        processor = processor or self.__processors[0]
+        current_step = self.__scheduler.steps
+        for index in range(len(self.__checkpoints) - 1, -1, -1):
+            start = self.__checkpoints[index].step
+            if start >= current_step:
+                continue
+            end = current_step
+            if index + 1 < len(self.__checkpoints):
+                end = min(end, self.__checkpoints[index + 1].step)
+            self.restore_checkpoint(index)
+            found_step = None
+            for step in range(start, end):
+                if step > start:
+                    self.__scheduler.run_to(step)
+                if processor.instruction_pointer == address:
+                    found_step = step
+            if found_step is not None:
+                self.go_to(found_step)
+                return found_step
+        self.go_to(current_step)
+        return None
@@ -4,6 +4,8 @@ class AddressBus:
     It provides methods to get and set the address on the bus.
     """
 
+    __slots__ = ('__AddressBus',)
+
     def __init__(self) -> None:
         """
         Constructor for the AddressBus class.
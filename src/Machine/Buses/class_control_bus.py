@@ -1,5 +1,6 @@
 import time
-from threading import Lock
+from threading import Condition, Lock, current_thread
+from typing import Callable
 
 
 class ControlBus:
@@ -8,29 +9,122 @@ class ControlBus:
     It provides methods to get and set the read request, write request, and response on the bus.
     """
 
+    __slots__ = ('power_on', '__ReadRequest', '__WriteRequest', '__Response', '__busLock', '__busSignal',
+                 '__busGeneration', '__lockWaitTimes', '__cooperativePump', '__activityListener')
+
     def __init__(self) -> None:
         """
         Constructor for the ControlBus class.
         Initializes the read request, write request, and response on the bus to False.
         """
-        self.__PowerOn = None
+        self.power_on: bool | None = None  # read by every device on every pass, so it is not a property
         self.__ReadRequest = False
         self.__WriteRequest = False
         self.__Response = False
         self.__busLock = Lock()
+        self.__busSignal = Condition(self.__busLock)
+        self.__busGeneration: int = 0
+        self.__lockWaitTimes: dict[str, float] | None = None
+        self.__cooperativePump: Callable[[], None] | None = None
+        self.__activityListener: Callable[[], None] | None = None
 
     def lock_bus(self) -> None:
         """
         This method locks the bus. This is used to prevent multiple devices from accessing the bus at the same time.
+        If lock wait measurement is enabled and the lock is contended, the time spent waiting for it is added to
+        the calling thread's total.  An uncontended lock is taken without reading the clock.
+        In cooperative mode every device runs on one thread, so the lock is not taken at all.
+        """
+        if self.__cooperativePump is not None:
+            return
+        if not self.__busLock.acquire(False):
+            if self.__lockWaitTimes is None:
+                self.__busLock.acquire()
+                return
+            started = time.perf_counter()
+            self.__busLock.acquire()
+            thread_name = current_thread().name
+            self.__lockWaitTimes[thread_name] = (self.__lockWaitTimes.get(thread_name, 0.0) +
+                                                 time.perf_counter() - started)
+
+    def enable_lock_wait_measurement(self) -> None:
+        """
+        This method starts measuring the time each thread spends waiting in lock_bus.
+        Measurement is off by default because it adds two clock reads to every contended lock.
+        """
+        if self.__lockWaitTimes is None:
+            self.__lockWaitTimes = {}
+
+    @property
+    def lock_wait_times(self) -> dict[str, float]:
+        """
+        This method returns the number of seconds each thread has spent waiting in lock_bus, keyed by thread name.
+        :return: The wait times, or an empty dictionary if measurement is not enabled.
         """
-        self.__busLock.acquire()
+        return dict(self.__lockWaitTimes or {})
 
     def unlock_bus(self) -> None:
         """
         This method unlocks the bus.
         """
-        self.__busLock.release()
-        time.sleep(0)
+        if self.__cooperativePump is None:
+            self.__busLock.release()
+
+    def enable_cooperative_mode(self, pump: Callable[[], None]) -> None:
+        """
+        This method switches the bus to cooperative mode, where a single thread steps the processor and services
+        every device in turn.  Locking becomes a no-op, and instead of blocking, a wait for a response runs the
+        pump (which services the devices and checks for halt) until the response arrives or power is turned off.
+        :param pump: Services every device once.
+        """
+        self.__cooperativePump = pump
+
+    def signal_bus(self) -> None:
+        """
+        This method wakes every device waiting on the bus so that it can inspect the new state of the bus.
+        It must be called while the bus is locked, after a request or response has been placed on the bus.
+        """
+        self.__busGeneration += 1
+        if self.__cooperativePump is None:
+            self.__busSignal.notify_all()
+        if self.__activityListener is not None:
+            self.__activityListener()
+
+    def set_activity_listener(self, listener: Callable[[], None] | None) -> None:
+        """
+        This method registers a callback that is called whenever the bus is signalled, in addition to waking the
+        threads waiting on the bus.  It lets devices that run on an event loop wait for the bus.
+        :param listener: The callback, or None to remove it.
+        """
+        self.__activityListener = listener
+
+    def wait_for_bus_activity(self, timeout: float | None = None) -> bool:
+        """
+        This method waits until the bus is signalled by another device, or until power is turned off.
+        It must be called while the bus is locked.  The lock is released while waiting and re-acquired before
+        returning, so a device can inspect the bus, wait, and inspect it again without missing a request.
+        In cooperative mode there is nothing to wait for, so it returns immediately.
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+        :return: True if the bus was signalled (or power is off), False if the wait timed out.
+        """
+        if self.__cooperativePump is not None:
+            return True
+        generation = self.__busGeneration
+        return self.__busSignal.wait_for(lambda: self.__busGeneration != generation or not self.power_on, timeout)
+
+    def wait_for_response(self, timeout: float | None = None) -> bool:
+        """
+        This method waits until a device places a response on the bus, or until power is turned off.
+        It must be called while the bus is locked.  The lock is released while waiting and re-acquired before
+        returning.  In cooperative mode the pump is run until the response arrives.
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+        :return: True if a response is present (or power is off), False if the wait timed out.
+        """
+        if self.__cooperativePump is not None:
+            while not self.__Response and self.power_on:
+                self.__cooperativePump()
+            return True
+        return self.__busSignal.wait_for(lambda: self.__Response or not self.power_on, timeout)
 
     @property
     def read_request(self) -> bool:
@@ -79,19 +173,3 @@ class ControlBus:
         :param value: The response to set on the bus.
         """
         self.__Response = value
-
-    @property
-    def power_on(self) -> bool:
-        """
-        This method returns the power on status of the bus.
-        :return: The power on status of the bus.
-        """
-        return self.__PowerOn
-
-    @power_on.setter
-    def power_on(self, value: bool):
-        """
-        This method sets the power on status of the bus.
-        :param value: The power on status to set on the bus.
-        """
-        self.__PowerOn = value
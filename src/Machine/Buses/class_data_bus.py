@@ -8,6 +8,8 @@ class DataBus:
     It also maintains a reference to a ControlBus instance.
     """
 
+    __slots__ = ('__DataBus', '__ControlBus')
+
     def __init__(self, control_bus: ControlBus):
         """
         Constructor for the DataBus class.
@@ -1,29 +1,80 @@
+from threading import Condition, Lock
+
 from Constants.class_interrupts import Interrupts
 
+ALL_INTERRUPTS: int = -1
+"""
+An interrupt mask that accepts every interrupt.
+"""
+
+
 class InterruptBus:
     """
     The InterruptBus class represents the interrupt bus of a computer system.
     It provides methods to set, test, and clear interrupts on the bus.
+    The pending interrupts are held as a bitmask, with bit n set while interrupt n is pending, so that a processor
+    can check for a pending interrupt with a single integer test and without taking the bus lock.  The bitmask is
+    the plain pending attribute rather than a property, because processors read it on every step.  Interrupts are
+    only set and cleared with the bus locked.  A sleeping processor can wait for an interrupt to arrive instead of
+    polling for one.
     """
 
+    __slots__ = ('pending', '__arrival')
+
     def __init__(self) -> None:
         """
         Constructor for the InterruptBus class.
         Initializes the interrupts on the bus to 0.
         """
-        self.__activeInterrupts = {}
+        self.pending: int = 0  # bit n is set while interrupt n is pending; change it only through the methods
+        self.__arrival = Condition(Lock())
+
+    @property
+    def active_interrupts(self) -> list[int]:
+        """
+        This property returns the interrupts currently set on the bus.
+        :return: The interrupt numbers, lowest first.
+        """
+        return [interrupt_number for interrupt_number in range(self.pending.bit_length())
+                if self.pending >> interrupt_number & 1]
+
+    @active_interrupts.setter
+    def active_interrupts(self, interrupts: list[int]):
+        """
+        This property replaces the interrupts set on the bus, for example when a snapshot is restored.
+        :param interrupts: The interrupt numbers to set.
+        """
+        pending = 0
+        for interrupt_number in interrupts:
+            pending |= 1 << interrupt_number
+        self.pending = pending
 
-    def interrupt_awaiting(self) -> int:
+    def interrupt_awaiting(self, accepted: int = ALL_INTERRUPTS) -> int:
         """
         This method checks if any interrupts are set on the bus and, if so, returns the interrupt number to handle.
         Interrupts with lower numbers have priority.
+        :param accepted: The bitmask of interrupts the caller handles.  Processors use it to route interrupts
+        between them and to mask the interrupts they have disabled.
         :return: The highest-priority interrupt number to handle, or none if no interrupts are set.
         """
-        if len(self.__activeInterrupts) == 0:
+        deliverable = self.pending & accepted
+        if deliverable == 0:
             return Interrupts.none
-        
-        highest_priority_interrupt = min(self.__activeInterrupts.keys())
-        return highest_priority_interrupt
+        return (deliverable & -deliverable).bit_length() - 1
+
+    @staticmethod
+    def check_interrupt_number(interrupt_number: int) -> int:
+        """
+        This method checks that a number can name an interrupt, which is a bit in the pending bitmask.  Devices and
+        processors check the interrupts they are configured with, and the INT, DI and EI instructions check their
+        operand, so that a bad number is reported where it was given rather than when it is raised.
+        :param interrupt_number: The interrupt number.
+        :return: The interrupt number.
+        :raises ValueError: If the number is negative.
+        """
+        if interrupt_number < 0:
+            raise ValueError(f"Interrupt {interrupt_number} is invalid; interrupt numbers can't be negative.")
+        return interrupt_number
 
     def set_interrupt(self, value: int):
         """
@@ -31,18 +82,30 @@ class InterruptBus:
         It uses bitwise OR to set the interrupt.
         :param value: The interrupt to set on the bus.
         """
-        self.__activeInterrupts[value] = True
+        self.pending |= 1 << value
+        with self.__arrival:
+            self.__arrival.notify_all()
 
+    def wait_for_interrupt(self, accepted: int, timeout: float | None = None) -> bool:
+        """
+        This method waits until one of the accepted interrupts is set on the bus.  It must be called with the bus
+        unlocked, since interrupts are set with the bus locked.
+        :param accepted: The bitmask of interrupts to wait for.  Include the halt interrupt to stop waiting when
+        the machine halts.
+        :param timeout: The maximum number of seconds to wait, or None to wait indefinitely.
+        :return: True if an accepted interrupt is pending, False if the wait timed out.
+        """
+        with self.__arrival:
+            return self.__arrival.wait_for(lambda: self.pending & accepted, timeout) != 0
 
     def test_interrupt(self, interrupt_number: int) -> bool:
         """
         This method tests if a specific interrupt is set on the bus.
-        It checks the presence of the interrupt in the set.
+        It checks the interrupt's bit in the bitmask.
         :param interrupt_number: The interrupt to test on the bus.
-        :return: True if the interrupt is present in the set, False otherwise.
+        :return: True if the interrupt is set, False otherwise.
         """
-        return interrupt_number in self.__activeInterrupts
-
+        return self.pending >> interrupt_number & 1 == 1
 
     def clear_interrupt(self, interrupt_number: int):
         """
@@ -52,5 +115,4 @@ class InterruptBus:
         In general, this should only be used by the processor when it has handled the interrupt.
         Devices should refrain from clearing interrupts.
         """
-        if interrupt_number in self.__activeInterrupts:
-            del self.__activeInterrupts[interrupt_number]
+        self.pending &= ~(1 << interrupt_number)
@@ -7,6 +7,12 @@ from Machine.Buses.class_interrupt_bus import InterruptBus
 from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_control_bus import ControlBus
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+
+BUS_IDLE_TIMEOUT = 0.1
+"""
+The number of seconds a device waits for bus activity before re-checking its own state (halt, timers, input).
+"""
 
 
 def _base36encode(number) -> str:
@@ -32,8 +38,13 @@ class BaseDevice(abc.ABC):
     The BaseDevice class is an abstract base class for all devices in the system.
     It provides a common interface for all devices, including a method to
     cycle the device and check if an address is valid.
+    The buses and the running and finished flags are plain slotted attributes rather than properties, because
+    processors read them on every step.
     """
 
+    __slots__ = ('__startingAddress', '__size', '__deviceId',
+                 'address_bus', 'data_bus', 'control_bus', 'interrupt_bus', 'running', 'finished')
+
     def __init__(self, starting_address: int, size: int, address_bus: AddressBus, data_bus: DataBus,
                  control_bus: ControlBus, interrupt_bus: InterruptBus):
         """
@@ -44,12 +55,12 @@ class BaseDevice(abc.ABC):
         """
         self.__startingAddress: int = starting_address
         self.__size: int = size
-        self.__addressBus: AddressBus = address_bus
-        self.__dataBus: DataBus = data_bus
-        self.__controlBus: ControlBus = control_bus
-        self.__interruptBus: InterruptBus = interrupt_bus
-        self.__running: bool = True
-        self.__finished: bool = False
+        self.address_bus: AddressBus = address_bus
+        self.data_bus: DataBus = data_bus
+        self.control_bus: ControlBus = control_bus
+        self.interrupt_bus: InterruptBus = interrupt_bus
+        self.running: bool = True  # cleared when the device sees the halt interrupt
+        self.finished: bool = False  # set once the device has stopped
         self.__deviceId: str = self.generate_device_id()
 
     @classmethod
@@ -69,22 +80,6 @@ class BaseDevice(abc.ABC):
         """
         return self.__deviceId
 
-    @property
-    def finished(self) -> bool:
-        """
-        This property returns whether the device has finished or not.
-        :return: True if the device has finished, False otherwise.
-        """
-        return self.__finished
-
-    @finished.setter
-    def finished(self, value: bool):
-        """
-        This property sets whether the device has finished or not.
-        :param value: True if the device has finished, False otherwise.
-        """
-        self.__finished = value
-
     @abc.abstractmethod
     def start(self) -> None:
         """
@@ -93,119 +88,142 @@ class BaseDevice(abc.ABC):
         pass
 
     @property
-    def running(self) -> bool:
+    def starting_address(self) -> int:
         """
-        This property returns whether the device is running or not.
-        :return: True if the device is running, False otherwise.
+        This property returns the starting address of the device.
+        :return: The starting address of the device.
         """
-        return self.__running
+        return self.__startingAddress
 
-    @running.setter
-    def running(self, value: bool):
+    @property
+    def size(self) -> int:
         """
-        This property sets whether the device is running or not.
-        :param value: True if the device is running, False otherwise.
+        This property returns the size of the device in the memory space.
+        :return: The size of the device.
         """
-        self.__running = value
+        return self.__size
 
     @property
-    def address_bus(self) -> AddressBus:
+    def supports_direct_access(self) -> bool:
         """
-        This property returns the address bus that the device is connected to.
-        Returns:
-        The address bus that the device is connected to.
+        This property returns whether the device can be read and written synchronously through read and write,
+        rather than through a handshake on the buses serviced by the device's own thread.  A device that returns
+        True must implement read(address) and write(address, value); the memory map checks this when it is built.
+        :return: True if the device supports direct access, False otherwise.
         """
-        return self.__addressBus
+        return False
 
-    @address_bus.setter
-    def address_bus(self, value: AddressBus):
+    @property
+    def cacheable(self) -> bool:
         """
-        This property sets the address bus that the device is connected to.
-        Args:
-            value: The address bus that the device is connected to.
-
+        This property returns whether values read from the device may be held in a processor's data cache.
+        Devices whose contents change on their own (such as I/O ports and clocks) must not be cached.
+        :return: True if the device's address space is cacheable, False otherwise.
         """
-        self.__addressBus = value
+        return False
 
-    @property
-    def data_bus(self) -> DataBus:
+    def read_block(self, address: int, length: int) -> list[int]:
         """
-        This property returns the data bus that the device is connected to.
-        Returns:
-        The data bus that the device is connected to.
-
+        This method reads consecutive values from the device without using the buses.
+        Only called on devices that support direct access.  The default reads one word at a time with read;
+        memory devices override it to copy the whole block at once.
+        :param address: The address of the first value.
+        :param length: The number of values to read.
+        :return: The values.
         """
-        return self.__dataBus
+        return [self.read(word_address) for word_address in range(address, address + length)]
 
-    @data_bus.setter
-    def data_bus(self, value: DataBus):
+    def write_block(self, address: int, values: list[int]) -> None:
         """
-        This property sets the data bus that the device is connected to.
-        Args:
-            value: The data bus that the device is connected to.
-
-        Returns:
-
+        This method writes consecutive values to the device without using the buses.
+        Only called on devices that support direct access.  The default writes one word at a time with write;
+        memory devices override it to copy the whole block at once.
+        :param address: The address of the first value.
+        :param values: The values to write.
         """
-        self.__dataBus = value
+        for word_address, value in enumerate(values, address):
+            self.write(word_address, value)
 
-    @property
-    def control_bus(self) -> ControlBus:
+    def service(self) -> None:
         """
-        This property returns the control bus that the device is connected to.
-        Returns:
-        The control bus that the device is connected to.
-
+        This method makes one non-blocking pass over the buses, servicing any request addressed to the device and
+        doing any periodic work (such as raising interrupts).  It is called with the bus locked, either from the
+        device's own thread or by the cooperative scheduler.
         """
-        return self.__controlBus
+        pass
 
-    @control_bus.setter
-    def control_bus(self, value: ControlBus):
+    def idle_timeout(self) -> float | None:
         """
-        This property sets the control bus that the device is connected to.
-        Args:
-            value: The control bus that the device is connected to.
-
-        Returns:
+        This method returns how long the device may wait for bus activity under the asyncio runtime before it
+        must be serviced anyway, for example to raise a timer interrupt.
+        :return: The number of seconds to wait, or None to wait until the bus is signalled.
+        """
+        return None
 
+    async def service_async(self, runtime) -> None:
+        """
+        This coroutine runs the device under the asyncio runtime.  It services the device, then awaits bus
+        activity or the device's idle timeout, until the machine halts.
+        :param runtime: The AsyncRuntime the device runs on.
         """
-        self.__controlBus = value
+        await self.serve_until_halted(runtime)
+        self.finished = True
 
-    @property
-    def interrupt_bus(self) -> InterruptBus:
+    async def serve_until_halted(self, runtime) -> None:
         """
-        This property returns the interrupt bus that the device is connected to.
-        Returns:
-        The interrupt bus that the device is connected to.
+        This coroutine services the device whenever the bus is signalled or its idle timeout expires, until the
+        machine halts.
+        :param runtime: The AsyncRuntime the device runs on.
+        """
+        while self.running:
+            self.control_bus.lock_bus()
+            try:
+                self.stop_running_if_halt_detected()
+                activity = runtime.bus_activity()
+                if self.control_bus.power_on:
+                    self.service()
+            finally:
+                # a device that fails must not leave the bus locked, or every other device waits for it forever
+                self.control_bus.unlock_bus()
+            if self.running:
+                await runtime.wait(activity, self.idle_timeout())
 
+    def start_cooperative(self) -> None:
+        """
+        This method prepares the device to be serviced by the cooperative scheduler instead of its own thread.
+        Devices that must keep a thread for real-time work, such as a display window, start it here.
         """
-        return self.__interruptBus
+        pass
 
-    @interrupt_bus.setter
-    def interrupt_bus(self, value: InterruptBus):
+    def finish_cooperative(self) -> None:
         """
-        This property sets the interrupt bus that the device is connected to.
-        Args:
-            value: The interrupt bus that the device is connected to.
+        This method stops a device that was serviced by the cooperative scheduler, once the machine has halted.
+        """
+        self.running = False
+        self.finished = True
 
+    def close(self) -> None:
+        """
+        This method releases anything the device holds outside the machine, such as an open file, once the machine
+        won't be run or inspected again.  Most devices hold nothing.
         """
-        self.__interruptBus = value
+        pass
 
-    @property
-    def starting_address(self) -> int:
+    def save_state(self, writer: StateWriter) -> None:
         """
-        This property returns the starting address of the device.
-        :return: The starting address of the device.
+        This method writes the device's state to a machine snapshot.
+        Devices with no state that survives a restart (such as ROM and the sound card) write nothing.
+        :param writer: The writer to pack the state into.
         """
-        return self.__startingAddress
+        pass
 
-    @property
-    def size(self) -> int:
+    def restore_state(self, reader: StateReader) -> None:
         """
-        This property returns the size of the device in the memory space.
-        :return: The size of the device.
+        This method restores the device's state from a machine snapshot, before the machine is run.
+        It must read back exactly what save_state wrote.
+        :param reader: The reader to unpack the state from.
         """
-        return self.__size
+        pass
 
     def address_is_valid(self, address_bus: AddressBus) -> bool:
         """
@@ -226,7 +244,7 @@ class BaseDevice(abc.ABC):
         If so, it stops the device from running.
         """
         if self.interrupt_bus.test_interrupt(Interrupts.halt):
-            self.__running = False
+            self.running = False
 
 def log_message(message: str):
     """
@@ -1,5 +1,10 @@
 from abc import ABC
 
+from Machine.Backplane.class_memory_map import MemoryMap
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
 from Machine.Devices.Bases.class_base_device import BaseDevice
 
 
@@ -9,3 +14,14 @@ class BaseProcessor(BaseDevice, ABC):
     It inherits from the BaseDevice class and provides a common interface
     for all processors.
     """
+
+    __slots__ = ('memory_map',)
+
+    def __init__(self, starting_address: int, size: int, address_bus: AddressBus, data_bus: DataBus,
+                 control_bus: ControlBus, interrupt_bus: InterruptBus):
+        """
+        Constructor for the BaseProcessor class.
+        The memory map is assigned by the backplane when the machine is built.
+        """
+        super().__init__(starting_address, size, address_bus, data_bus, control_bus, interrupt_bus)
+        self.memory_map: MemoryMap | None = None  # used to reach the devices on the backplane
@@ -0,0 +1,151 @@
+import struct
+import sys
+from array import array
+from typing import List
+
+_INT = struct.Struct("<q")
+_COUNT = struct.Struct("<I")
+_SIGN_BIT = 1 << 63
+_WORD_MASK = (1 << 64) - 1
+
+
+def wrap_int(value: int) -> int:
+    """
+    Wraps an integer to a signed 64-bit value, keeping its low 64 bits as in two's complement.
+    :param value: The integer.
+    :return: The wrapped integer.
+    """
+    return ((value + _SIGN_BIT) & _WORD_MASK) - _SIGN_BIT
+
+
+class StateWriter:
+    """
+    The StateWriter class packs the state of a device into a compact little-endian binary form for a machine
+    snapshot.  Integers are stored as signed 64-bit values and lists of integers as packed arrays, so large
+    memories are written with a single copy.  Registers and list-storage RAM can hold wider integers; those are
+    wrapped to their low 64 bits, the width RAM with array storage holds.
+    """
+
+    def __init__(self) -> None:
+        """
+        Constructor for the StateWriter class.
+        """
+        self.__parts: List[bytes] = []
+
+    def write_int(self, value: int) -> None:
+        """
+        This method writes a single integer.
+        :param value: The integer to write.
+        """
+        try:
+            self.__parts.append(_INT.pack(value))
+        except struct.error:
+            self.__parts.append(_INT.pack(wrap_int(value)))
+
+    def write_ints(self, values: List[int]) -> None:
+        """
+        This method writes a list of integers, preceded by its length.
+        :param values: The integers to write.
+        """
+        try:
+            packed = array('q', values)
+        except OverflowError:
+            packed = array('q', [wrap_int(value) for value in values])
+        if sys.byteorder == 'big':
+            packed.byteswap()
+        self.__parts.append(_COUNT.pack(len(packed)))
+        self.__parts.append(packed.tobytes())
+
+    def write_string(self, value: str) -> None:
+        """
+        This method writes a string as UTF-8, preceded by its length in bytes.
+        :param value: The string to write.
+        """
+        encoded = value.encode("utf-8")
+        self.__parts.append(_COUNT.pack(len(encoded)))
+        self.__parts.append(encoded)
+
+    def write_bytes(self, value: bytes) -> None:
+        """
+        This method writes a block of bytes, preceded by its length.
+        :param value: The bytes to write.
+        """
+        self.__parts.append(_COUNT.pack(len(value)))
+        self.__parts.append(value)
+
+    def get_bytes(self) -> bytes:
+        """
+        This method returns everything written so far.
+        :return: The packed state.
+        """
+        return b"".join(self.__parts)
+
+
+class StateReader:
+    """
+    The StateReader class unpacks device state written by a StateWriter.  Values must be read back in the order
+    they were written.
+    """
+
+    def __init__(self, data: bytes) -> None:
+        """
+        Constructor for the StateReader class.
+        :param data: The packed state.
+        """
+        self.__data = memoryview(data)
+        self.__offset: int = 0
+
+    @property
+    def at_end(self) -> bool:
+        """
+        This property returns whether all the data has been read.
+        :return: True if there is nothing left to read, False otherwise.
+        """
+        return self.__offset >= len(self.__data)
+
+    def read_int(self) -> int:
+        """
+        This method reads a single integer.
+        :return: The integer read.
+        """
+        value, = _INT.unpack_from(self.__data, self.__offset)
+        self.__offset += _INT.size
+        return value
+
+    def read_ints(self) -> List[int]:
+        """
+        This method reads a list of integers.
+        :return: The integers read.
+        """
+        count, = _COUNT.unpack_from(self.__data, self.__offset)
+        self.__offset += _COUNT.size
+        end = self.__offset + count * _INT.size
+        if end > len(self.__data):
+            raise ValueError("Device state is truncated.")
+        values = array('q')
+        values.frombytes(self.__data[self.__offset:end])
+        if sys.byteorder == 'big':
+            values.byteswap()
+        self.__offset = end
+        return values.tolist()
+
+    def read_string(self) -> str:
+        """
+        This method reads a string.
+        :return: The string read.
+        """
+        return self.read_bytes().decode("utf-8")
+
+    def read_bytes(self) -> bytes:
+        """
+        This method reads a block of bytes.
+        :return: The bytes read.
+        """
+        length, = _COUNT.unpack_from(self.__data, self.__offset)
+        self.__offset += _COUNT.size
+        end = self.__offset + length
+        if end > len(self.__data):
+            raise ValueError("Device state is truncated.")
+        value = bytes(self.__data[self.__offset:end])
+        self.__offset = end
+        return value
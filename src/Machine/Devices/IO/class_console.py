@@ -3,6 +3,7 @@ import queue
 import threading
 import time
 from enum import IntFlag
+from typing import Callable
 
 import pygame
 
@@ -11,7 +12,8 @@ from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
-from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
 
 MAX_FRAMERATE = 90
 """
@@ -140,6 +142,29 @@ class DisplayElement(DisplayCommand):
         self.__redraw = redraw
 
 
+class InputQueue(queue.Queue):
+    """
+    A queue of keystrokes that can notify a listener whenever a keystroke is added, so that a console running on
+    the asyncio runtime can wait for input instead of polling for it.
+    """
+    def __init__(self):
+        super().__init__()
+        self.listener: Callable[[], None] | None = None
+
+    def put(self, item, block: bool = True, timeout: float | None = None) -> None:
+        """
+        Adds a keystroke to the queue and notifies the listener, if there is one.
+        Args:
+            item: The keystroke to add.
+            block: Whether to wait for a free slot.
+            timeout: How long to wait for a free slot.
+
+        """
+        super().put(item, block, timeout)
+        if self.listener is not None:
+            self.listener()
+
+
 class Console(BaseDevice):
     """
     A text display and input device.
@@ -387,19 +412,28 @@ class Console(BaseDevice):
                                             self.cursor_y * self.__character_height))
 
     def __init__(self, starting_address: int, width: int, height: int, interrupt_number: int, address_bus: AddressBus,
-                 data_bus: DataBus, control_bus: ControlBus, interrupt_bus: InterruptBus):
+                 data_bus: DataBus, control_bus: ControlBus, interrupt_bus: InterruptBus, headless: bool = False):
+        """
+        Constructs the console device.
+        When headless is True, no display window is opened: output is kept only in the display buffer and input
+        is supplied through send_input.
+        """
         super().__init__(starting_address, 1, address_bus, data_bus, control_bus, interrupt_bus)
         self.__output_form = None
         self.__output_queue = queue.Queue()
-        self.__input_queue = queue.Queue()
-        self.__display = self.Display(console_device_id=self.device_id, output_q=self.__output_queue,
-                                      input_q=self.__input_queue, display_width=width, display_height=height,
-                                      character_width=12, character_height=22, font_size=20)
+        self.__input_queue = InputQueue()
+        self.__logged_input = queue.Queue()  # keystrokes taken through the input log but not yet read
+        self.input_log = None  # set by the backplane when time travel is enabled
+        self.__display = None
+        if not headless:
+            self.__display = self.Display(console_device_id=self.device_id, output_q=self.__output_queue,
+                                          input_q=self.__input_queue, display_width=width, display_height=height,
+                                          character_width=12, character_height=22, font_size=20)
         self.__cursor_x: int = 0
         self.__cursor_y: int = 0
         self.__width: int = width
         self.__height: int = height
-        self.__interrupt_number: int = interrupt_number
+        self.__interrupt_number: int = InterruptBus.check_interrupt_number(interrupt_number)
         self.__display_buffer = [[DisplayElement(x, y, ' ') for x in range(80)] for y in range(25)]
 
     @property
@@ -534,19 +568,127 @@ class Console(BaseDevice):
         Returns:
 
         """
-        self.output_form = threading.Thread(target=self.__display.run, name=self.device_id + "::display_run")
-        self.output_form.start()
-        self.write_buffer_to_queue()
+        self.start_display()
+        self.__input_queue.listener = self.signal_keystroke
         threading.Thread(target=self.process_buses, name=self.device_id + "::process_buses").start()
 
+    def start_cooperative(self) -> None:
+        """
+        Prepares the console to be serviced by the cooperative scheduler.  The display window keeps its own
+        thread, and exchanges characters with the console through queues.
+        Returns:
+
+        """
+        self.start_display()
+
+    def start_display(self) -> None:
+        """
+        Starts the display window thread, unless the console is headless, and sends it the display buffer.
+        Returns:
+
+        """
+        if self.__display is not None:
+            self.output_form = threading.Thread(target=self.__display.run, name=self.device_id + "::display_run")
+            self.output_form.start()
+        self.write_buffer_to_queue()
+
+    @property
+    def headless(self) -> bool:
+        """
+        Whether the console runs without a display window.
+        Returns:
+
+        """
+        return self.__display is None
+
+    def send_input(self, text: str) -> None:
+        """
+        Queues characters as if they had been typed on the keyboard.  A newline is queued as the carriage return
+        the Enter key sends.
+        Args:
+            text: The characters to queue.
+
+        """
+        for character in text:
+            self.__input_queue.put(13 if character == "\n" else ord(character))
+
+    def take_keystrokes(self) -> list[int]:
+        """
+        Takes every keystroke waiting in the input queue.
+        Returns:
+            list: The keystrokes, oldest first.
+        """
+        keystrokes = []
+        while not self.__input_queue.empty():
+            keystrokes.append(self.__input_queue.get_nowait())
+        return keystrokes
+
+    def screen_text(self) -> str:
+        """
+        Returns the text currently held in the display buffer, one line per row, without trailing spaces.
+        Returns:
+            str: The text on the screen.
+        """
+        rows = ["".join(element.character for element in row[:self.width]).rstrip()
+                for row in self.display_buffer[:self.height]]
+        while rows and not rows[-1]:
+            rows.pop()
+        return "\n".join(rows)
+
+    def send_to_display(self, command: DisplayCommand) -> None:
+        """
+        Sends a command or element to the display window.  Headless consoles have no window, so nothing is sent.
+        Args:
+            command: The display command or display element to send.
+
+        """
+        if self.__display is not None:
+            self.__output_queue.put(command)
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the cursor position, the characters in the display buffer and any keystrokes taken through the
+        input log but not yet read to a machine snapshot.
+        Args:
+            writer: The writer to pack the state into.
+
+        """
+        writer.write_int(self.cursor_x)
+        writer.write_int(self.cursor_y)
+        writer.write_ints([ord(element.character) for row in self.display_buffer for element in row])
+        writer.write_ints(list(self.__logged_input.queue))
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the cursor position, the display buffer and any keystrokes taken through the input log but not
+        yet read from a machine snapshot.  Every restored character is
+        marked for redrawing so that the display shows it when the console starts.
+        Args:
+            reader: The reader to unpack the state from.
+
+        """
+        self.cursor_x = reader.read_int()
+        self.cursor_y = reader.read_int()
+        characters = reader.read_ints()
+        if len(characters) != sum(len(row) for row in self.display_buffer):
+            raise ValueError(f"{self.device_id}: snapshot display buffer does not match the console.")
+        characters = iter(characters)
+        for row in self.display_buffer:
+            for element in row:
+                element.character = chr(next(characters))
+                element.redraw = True
+        self.__logged_input.queue.clear()
+        for keystroke in reader.read_ints():
+            self.__logged_input.put(keystroke)
+
     def send_cursor_location(self) -> None:
         """
         Sends the cursor location to the output queue. This is used to update the cursor on the display.
         Returns:
 
         """
-        self.__output_queue.put(DisplayControl(DisplayCommandList.cursor_x, str(self.cursor_x)))
-        self.__output_queue.put(DisplayControl(DisplayCommandList.cursor_y, str(self.cursor_y)))
+        self.send_to_display(DisplayControl(DisplayCommandList.cursor_x, str(self.cursor_x)))
+        self.send_to_display(DisplayControl(DisplayCommandList.cursor_y, str(self.cursor_y)))
 
     def scroll_up(self) -> None:
         """
@@ -560,7 +702,7 @@ class Console(BaseDevice):
             self.display_buffer[self.height - 1][x].character = ' '
             self.display_buffer[self.height - 1][x].redraw = True
         # add a clear command to the output queue
-        self.__output_queue.put(DisplayControl(DisplayCommandList.clear, ''))
+        self.send_to_display(DisplayControl(DisplayCommandList.clear, ''))
 
     def find_last_non_space_character_on_current_row(self) -> int:
         """
@@ -611,7 +753,7 @@ class Console(BaseDevice):
             return True
         elif data == 12:  # FF
             self.display_buffer = [[DisplayElement(x, y, ' ') for x in range(80)] for y in range(25)]
-            self.__output_queue.put(DisplayControl(DisplayCommandList.clear, ''))
+            self.send_to_display(DisplayControl(DisplayCommandList.clear, ''))
             self.cursor_x = 0
             self.cursor_y = 0
             self.send_cursor_location()
@@ -646,7 +788,7 @@ class Console(BaseDevice):
         self.write_to_display_buffer(self.cursor_y * self.width + self.cursor_x, chr(data))
 
         # add the DisplayElement object to the output queue
-        self.__output_queue.put(self.display_buffer[self.cursor_y][self.cursor_x])
+        self.send_to_display(self.display_buffer[self.cursor_y][self.cursor_x])
         self.cursor_x = self.cursor_x + 1
         if self.cursor_x >= self.width:
             self.cursor_x = 0
@@ -664,11 +806,13 @@ class Console(BaseDevice):
             for x in range(self.width):
                 if self.display_buffer[y][x].redraw:
                     self.display_buffer[y][x].redraw = False
-                    self.__output_queue.put(self.display_buffer[y][x])
+                    self.send_to_display(self.display_buffer[y][x])
 
     def process_buses(self) -> None:
         """
-        This method continuously processes the buses to read and write data to and from the console.
+        This method processes the buses to read and write data to and from the console.
+        Between requests it waits for bus activity.  A keystroke signals the bus, so the console raises its
+        interrupt as soon as a key is pressed.
         Returns:
 
         """
@@ -676,28 +820,81 @@ class Console(BaseDevice):
             self.control_bus.lock_bus()
             self.stop_running_if_halt_detected()
             if self.control_bus.power_on:
-                # if the display thread has ended, raise the halt interrupt
-                if not self.output_form.is_alive():
-                    self.interrupt_bus.set_interrupt(Interrupts.halt)
-
-                # if there is data in the input queue,
-                # raise the interrupt to signal that there is data available
-                if not self.__input_queue.empty():
-                    self.interrupt_bus.set_interrupt(self.__interrupt_number)
-
-                if self.address_is_valid(self.address_bus):
-                    if self.control_bus.read_request:
-                        if not self.__input_queue.empty():
-                            buffer_data = self.__input_queue.get()
-                            self.data_bus.data = buffer_data
-                            self.control_bus.read_request = False
-                            self.control_bus.response = True
-
-                    if self.control_bus.write_request:
-                        data = self.data_bus.data
-                        self.process_output(data)
-                        self.write_buffer_to_queue()
-                        self.control_bus.write_request = False
-                        self.control_bus.response = True
+                self.service()
+                self.control_bus.wait_for_bus_activity(BUS_IDLE_TIMEOUT)
             self.control_bus.unlock_bus()
-        self.finished = True
\ No newline at end of file
+        self.__input_queue.listener = None
+        self.finished = True
+
+    def signal_keystroke(self) -> None:
+        """
+        Wakes the console's bus thread when a keystroke is added to the input queue.
+        Returns:
+
+        """
+        self.control_bus.lock_bus()
+        self.control_bus.signal_bus()
+        self.control_bus.unlock_bus()
+
+    def idle_timeout(self) -> float | None:
+        """
+        Under the asyncio runtime, keystrokes wake the console, so a headless console only wakes for bus activity.
+        A console with a display window also wakes periodically to notice the window being closed.
+        Returns:
+
+        """
+        return None if self.__display is None else BUS_IDLE_TIMEOUT
+
+    async def service_async(self, runtime) -> None:
+        """
+        Runs the console under the asyncio runtime, waking it whenever a keystroke arrives.  The display window
+        keeps its own thread, as under the cooperative scheduler.
+        Args:
+            runtime: The AsyncRuntime the console runs on.
+
+        """
+        self.start_display()
+        self.__input_queue.listener = runtime.notify_bus_activity
+        await super().service_async(runtime)
+        self.__input_queue.listener = None
+
+    def service(self) -> None:
+        """
+        Raises the console's interrupt if a keystroke is waiting, and services a read or write request addressed
+        to the console.  The bus must be locked.
+        Returns:
+
+        """
+        # if the display thread has ended, raise the halt interrupt
+        if self.__display is not None and not self.output_form.is_alive():
+            self.interrupt_bus.set_interrupt(Interrupts.halt)
+
+        # when time travel is enabled, keystrokes are taken through the input log, so that a replay sees them at
+        # the same points
+        input_queue = self.__input_queue
+        if self.input_log is not None:
+            input_queue = self.__logged_input
+            for keystroke in self.input_log.sample(self.device_id, self.take_keystrokes):
+                input_queue.put(keystroke)
+
+        # if there is data in the input queue,
+        # raise the interrupt to signal that there is data available
+        if not input_queue.empty():
+            self.interrupt_bus.set_interrupt(self.__interrupt_number)
+
+        if self.address_is_valid(self.address_bus):
+            if self.control_bus.read_request:
+                if not input_queue.empty():
+                    buffer_data = input_queue.get()
+                    self.data_bus.data = buffer_data
+                    self.control_bus.read_request = False
+                    self.control_bus.response = True
+                    self.control_bus.signal_bus()
+
+            if self.control_bus.write_request:
+                data = self.data_bus.data
+                self.process_output(data)
+                self.write_buffer_to_queue()
+                self.control_bus.write_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
\ No newline at end of file
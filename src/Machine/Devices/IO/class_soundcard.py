@@ -1,3 +1,4 @@
+import asyncio
 import queue
 import threading
 import time
@@ -10,10 +11,12 @@ from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
-from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
 
 END_OF_FRAME = -1
 END_OF_TRANSACTION = -2
+TRANSACTION_POLL_SECONDS = 0.05
+PLAYBACK_POLL_SECONDS = 0.005
 
 
 def play_sounds(sounds: List[Sound]):
@@ -33,6 +36,20 @@ def play_sounds(sounds: List[Sound]):
         time.sleep(0)
 
 
+async def play_sounds_async(sounds: List[Sound]):
+    """
+    This coroutine plays a list of sounds, awaiting the end of playback instead of spinning.
+    """
+    pygame.mixer.init(channels=len(sounds))
+    channels = []
+    for i, sound in enumerate(sounds):
+        channel = pygame.mixer.Channel(i)
+        channel.play(sound)
+        channels.append(channel)
+    while any(channel.get_busy() for channel in channels):
+        await asyncio.sleep(PLAYBACK_POLL_SECONDS)
+
+
 def build_sound(duration_ms: int, frequency: float, volume: float) -> Sound:
     """
     This method builds a pygame sound to be played
@@ -74,6 +91,16 @@ def build_sounds_from_queue(command_queue: queue.Queue) -> List[Sound]:
     return sounds
 
 
+def build_frames_from_transaction(transaction_queue: queue.Queue) -> List[List[Sound]]:
+    """
+    This method builds the sounds for each frame of a transaction.
+    """
+    frames = []
+    while complete_frame_is_ready(transaction_queue):
+        frames.append(build_sounds_from_queue(transaction_queue))
+    return frames
+
+
 def complete_frame_is_ready(command_queue: queue.Queue) -> bool:
     """
     This method checks the command queue for a complete frame to play.
@@ -112,10 +139,34 @@ class SoundCard(BaseDevice):
         threading.Thread(target=self.process_buses, name=self.device_id + "::process_buses").start()
 
     def __init__(self, starting_address: int, address_bus: AddressBus, data_bus: DataBus, control_bus: ControlBus,
-                 interrupt_bus: InterruptBus):
+                 interrupt_bus: InterruptBus, headless: bool = False):
+        """
+        Constructs the sound card.
+        When headless is True, no audio is played: each completed transaction is recorded in transactions instead.
+        """
         super().__init__(starting_address, 1, address_bus, data_bus, control_bus, interrupt_bus)
         self.__command_queue = queue.Queue()
         self.__processing_queue: bool = False
+        self.__headless: bool = headless
+        self.__transactions: List[List[int]] = []
+        self.__eventLoop: asyncio.AbstractEventLoop | None = None
+        self.__queueTask: asyncio.Task | None = None
+
+    @property
+    def headless(self) -> bool:
+        """
+        This property returns whether the sound card is headless, recording its transactions instead of playing them.
+        :return: True if the sound card is headless, False otherwise.
+        """
+        return self.__headless
+
+    @property
+    def transactions(self) -> List[List[int]]:
+        """
+        The transactions received by a headless sound card, each as the list of values sent before the
+        end-of-transaction marker.
+        """
+        return self.__transactions
 
     @property
     def command_queue(self) -> queue.Queue:
@@ -139,34 +190,64 @@ class SoundCard(BaseDevice):
         Returns:
 
         """
-        pygame.mixer.init()
+        if not self.headless:
+            pygame.mixer.init()
         self.main_loop()
         self.wait_until_queue_is_empty()
         self.finished = True
 
     def main_loop(self) -> None:
         """
-        The main loop of the sound card.  This runs continuously to monitor for sound requests.
+        The main loop of the sound card.  This waits for bus activity and queues sound requests.
         The loop ends when the sound card is halted.
         Returns:
 
         """
         while self.running:
-            queue_changed: bool = False
             self.control_bus.lock_bus()
             self.stop_running_if_halt_detected()
             if self.control_bus.power_on:
-                if self.address_is_valid(self.address_bus):
-                    if self.control_bus.write_request:
-                        self.command_queue.put(self.data_bus.data)
-                        queue_changed = True
-                        self.control_bus.write_request = False
-                        self.control_bus.response = True
+                self.service()
+                self.control_bus.wait_for_bus_activity(BUS_IDLE_TIMEOUT)
             self.control_bus.unlock_bus()
-            if queue_changed:
-                # run process_queue on new thread if not already running
+
+    def service(self) -> None:
+        """
+        Queues a value written to the sound card, and starts the thread that plays completed transactions if it
+        isn't already running.  The bus must be locked.
+        Returns:
+
+        """
+        if self.address_is_valid(self.address_bus):
+            if self.control_bus.write_request:
+                self.command_queue.put(self.data_bus.data)
+                self.control_bus.write_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
+                # start processing the queue if it isn't already being processed
                 if not self.processing_queue:
-                    threading.Thread(target=self.process_queue, name=self.device_id + "::process_queue").start()
+                    self.processing_queue = True
+                    self.start_queue_processing()
+
+    def start_cooperative(self) -> None:
+        """
+        Prepares the sound card to be serviced by the cooperative scheduler.  Sounds are still played on their
+        own thread.
+        Returns:
+
+        """
+        if not self.headless:
+            pygame.mixer.init()
+
+    def finish_cooperative(self) -> None:
+        """
+        Stops the sound card once the machine has halted, after the queued sounds have played.
+        Returns:
+
+        """
+        self.running = False
+        self.wait_until_queue_is_empty()
+        self.finished = True
 
     def process_queue(self) -> None:
         """
@@ -175,26 +256,77 @@ class SoundCard(BaseDevice):
 
         """
         self.processing_queue = True
-
         while not self.command_queue.empty():
             while not self.complete_transaction_is_ready():
-                time.sleep(0.05)
-            transaction = []
-            # copy transaction to new queue
-            transaction_queue = queue.Queue()
-            queue_value = self.command_queue.get()
-            while queue_value != END_OF_TRANSACTION:
-                transaction_queue.put(queue_value)
-                queue_value = self.command_queue.get()
-            while complete_frame_is_ready(transaction_queue):
-                frame_sounds = build_sounds_from_queue(transaction_queue)
-                transaction.append(frame_sounds)
-
-            for frame_sounds in transaction:
+                time.sleep(TRANSACTION_POLL_SECONDS)
+            transaction_queue = self.take_transaction()
+            if self.headless:
+                self.transactions.append(list(transaction_queue.queue))
+                continue
+            for frame_sounds in build_frames_from_transaction(transaction_queue):
                 play_sounds(frame_sounds)
             time.sleep(0)
         self.processing_queue = False
 
+    async def process_queue_async(self) -> None:
+        """
+        This coroutine processes the command queue under the asyncio runtime, awaiting complete transactions and
+        the end of each sound instead of sleeping a thread.
+        Returns:
+
+        """
+        while not self.command_queue.empty():
+            while not self.complete_transaction_is_ready():
+                await asyncio.sleep(TRANSACTION_POLL_SECONDS)
+            transaction_queue = self.take_transaction()
+            if self.headless:
+                self.transactions.append(list(transaction_queue.queue))
+                continue
+            for frame_sounds in build_frames_from_transaction(transaction_queue):
+                await play_sounds_async(frame_sounds)
+        self.processing_queue = False
+
+    def take_transaction(self) -> queue.Queue:
+        """
+        This method removes the next complete transaction from the command queue.
+        Returns:
+            The values of the transaction, without the end-of-transaction marker.
+        """
+        transaction_queue = queue.Queue()
+        queue_value = self.command_queue.get()
+        while queue_value != END_OF_TRANSACTION:
+            transaction_queue.put(queue_value)
+            queue_value = self.command_queue.get()
+        return transaction_queue
+
+    def start_queue_processing(self) -> None:
+        """
+        This method starts playing the queued transactions: as a task on the event loop under the asyncio
+        runtime, otherwise on a new thread.
+        Returns:
+
+        """
+        if self.__eventLoop is not None:
+            self.__queueTask = self.__eventLoop.create_task(self.process_queue_async())
+        else:
+            threading.Thread(target=self.process_queue, name=self.device_id + "::process_queue").start()
+
+    async def service_async(self, runtime) -> None:
+        """
+        Runs the sound card under the asyncio runtime.  Sounds are played by a task on the same event loop, and
+        the sound card finishes once the queued sounds have played.
+        Args:
+            runtime: The AsyncRuntime the sound card runs on.
+
+        """
+        self.__eventLoop = runtime.loop
+        if not self.headless:
+            pygame.mixer.init()
+        await self.serve_until_halted(runtime)
+        if self.__queueTask is not None:
+            await self.__queueTask
+        self.finished = True
+
     def wait_until_queue_is_empty(self) -> None:
         """
         This method waits until the command queue is empty.
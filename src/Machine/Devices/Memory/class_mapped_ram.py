@@ -0,0 +1,225 @@
+import mmap
+import os
+import sys
+from array import array
+from typing import List
+
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+from Machine.Devices.Memory.class_ram import RAM, WORD_BITS
+
+WORD_BYTES = WORD_BITS // 8
+"""
+The number of bytes a word takes in an image file.
+"""
+
+
+class MappedRAM(RAM):
+    """
+    A RAM device whose memory is a host file mapped with mmap.  The file is an image of the memory: signed
+    little-endian 64-bit words, the first at the device's starting address.
+
+    Nothing is read when the device is built; the host loads each page of the image the first time it is touched,
+    so a large image is ready at once.  Writes go to the file, and so persist across runs.  The host writes changed
+    pages back on its own schedule; with sync_on_halt they are also flushed to disk when the machine halts.  A
+    read-only device ignores writes, like ROM, and leaves the file untouched.  The image stays mapped after the
+    machine halts, so that it can be saved to a snapshot or inspected, until the device is closed.
+    """
+
+    def __init__(self, starting_address: int, pathname: str, address_bus: AddressBus, data_bus: DataBus,
+                 control_bus: ControlBus, interrupt_bus: InterruptBus, size: int | None = None,
+                 read_only: bool = False, sync_on_halt: bool = False):
+        """
+        Constructs all the necessary attributes for the mapped RAM device, creating the image file if it doesn't
+        exist.
+
+        Parameters:
+            starting_address (int): The starting address of the mapped RAM device.
+            pathname (str): The pathname of the image file.
+            size (int): The size of the mapped RAM device, or None to map the whole image.  A writable image shorter
+                than this is extended with zeroes.
+            read_only (bool): True to ignore writes.
+            sync_on_halt (bool): True to flush changed pages to disk when the machine halts.
+
+        Raises:
+            ValueError: If the image can't be opened, or can't be mapped at the size given.
+        """
+        if sys.byteorder != "little":
+            raise ValueError("Mapped RAM images are little-endian and can't be mapped on a big-endian host.")
+        self.__pathname = pathname
+        self.__readOnly = read_only
+        self.__syncOnHalt = sync_on_halt
+        if read_only or os.path.exists(pathname):
+            mode = "rb" if read_only else "r+b"
+        elif size is None:
+            raise ValueError(f"{pathname} doesn't exist; give the size of the mapped RAM to create it.")
+        else:
+            mode = "w+b"
+        try:
+            self.__mapping = self.map_image(pathname, mode, size)
+        except OSError as error:
+            raise ValueError(f"Can't map {pathname}: {error.strerror}.") from error
+        size = len(self.__mapping) // WORD_BYTES
+        self.__words = memoryview(self.__mapping).cast('q')
+        super().__init__(starting_address, size, address_bus, data_bus, control_bus, interrupt_bus, storage="array")
+
+    def map_image(self, pathname: str, mode: str, size: int | None) -> mmap.mmap:
+        """
+        Opens and maps the image file, extending a writable image if it is shorter than the size given.
+        :param pathname: The pathname of the image file.
+        :param mode: The mode to open the file in.
+        :param size: The number of words to map, or None to map the whole image.
+        :return: The mapping.
+        """
+        with open(pathname, mode) as image:
+            image_bytes = os.fstat(image.fileno()).st_size
+            if image_bytes % WORD_BYTES:
+                raise ValueError(f"{pathname} is {image_bytes} bytes long, which isn't a whole number of words.")
+            if size is None:
+                size = image_bytes // WORD_BYTES
+            if size < 1:
+                raise ValueError(f"{pathname} is empty; give the size of the mapped RAM to create it.")
+            if size * WORD_BYTES > image_bytes:
+                if self.__readOnly:
+                    raise ValueError(f"{pathname} holds {image_bytes // WORD_BYTES} words, fewer than {size}.")
+                image.truncate(size * WORD_BYTES)  # the extension reads as zeroes and takes no disk until written
+            # the mapping keeps its own handle on the file, which can be closed
+            return mmap.mmap(image.fileno(), size * WORD_BYTES,
+                             access=mmap.ACCESS_READ if self.__readOnly else mmap.ACCESS_WRITE)
+
+    @property
+    def pathname(self) -> str:
+        """
+        This method returns the pathname of the image file.
+        :return: The pathname.
+        """
+        return self.__pathname
+
+    @property
+    def read_only(self) -> bool:
+        """
+        This method returns whether writes to the mapped RAM device are ignored.
+        :return: True if the device is read-only.
+        """
+        return self.__readOnly
+
+    @property
+    def writable(self) -> bool:
+        """
+        The memory of the mapped RAM device can only change if it isn't read-only.
+        """
+        return not self.__readOnly
+
+    def create_memory(self, size: int) -> memoryview:
+        """
+        The memory of the mapped RAM device is the mapped image, viewed as words.
+        :param size: The number of words, which the image has already been mapped at.
+        :return: The view of the image.
+        """
+        return self.__words
+
+    def copy_memory(self, start: int = 0, end: int | None = None) -> array:
+        """
+        Copies words of the mapped RAM device's memory into an array, so that the copy doesn't change with the
+        image.
+        :param start: The offset of the first word.
+        :param end: The offset just past the last word, or None for the end of memory.
+        :return: The copy.
+        """
+        copy = array('q')
+        copy.frombytes(self.__words[start:end].cast('B'))
+        return copy
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a value to the mapped RAM device without using the buses, unless it is read-only.
+        :param address: The address to write to.
+        :param value: The value to write, wrapped to a word if it is too wide.
+        """
+        if self.__readOnly:
+            return
+        try:
+            self.__words[address - self.starting_address] = value
+        except ValueError:
+            self.__words[address - self.starting_address] = self.wrap_word(value)
+
+    def write_block(self, address: int, values: List[int]) -> None:
+        """
+        Writes consecutive values to the mapped RAM device without using the buses, unless it is read-only.
+        :param address: The address of the first value.
+        :param values: The values to write.
+        """
+        if not self.__readOnly:
+            super().write_block(address, values)
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the contents of the mapped RAM device to a machine snapshot.  A read-only device writes nothing, as
+        its contents are in the image.
+        :param writer: The writer to pack the state into.
+        """
+        if not self.__readOnly:
+            super().save_state(writer)
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the contents of the mapped RAM device from a machine snapshot, writing them to the image.
+        :param reader: The reader to unpack the state from.
+        """
+        if not self.__readOnly:
+            super().restore_state(reader)
+
+    def sync(self) -> None:
+        """
+        Flushes the changed pages of the image to disk.
+        """
+        if not self.__readOnly:
+            self.__mapping.flush()
+
+    def halted(self) -> None:
+        """
+        Called once the machine has halted, before the device is marked finished, to flush the image if asked to.
+        """
+        if self.__syncOnHalt:
+            self.sync()
+
+    def process_buses(self) -> None:
+        """
+        This method runs the mapped RAM device on its own thread until the machine halts, then flushes the image if
+        asked to.
+        """
+        self.main_loop()
+        self.halted()
+        self.finished = True
+
+    async def service_async(self, runtime) -> None:
+        """
+        This coroutine runs the mapped RAM device under the asyncio runtime until the machine halts, then flushes
+        the image if asked to.
+        :param runtime: The AsyncRuntime the device runs on.
+        """
+        await self.serve_until_halted(runtime)
+        self.halted()
+        self.finished = True
+
+    def finish_cooperative(self) -> None:
+        """
+        This method stops the mapped RAM device once the machine has halted, flushing the image if asked to.
+        """
+        self.running = False
+        self.halted()
+        self.finished = True
+
+    def close(self) -> None:
+        """
+        This method unmaps and closes the image once the machine is done with, after a final flush if asked to.
+        The device can't be read or written afterwards.
+        """
+        if self.__mapping.closed:
+            return
+        self.halted()
+        self.__words.release()
+        self.__mapping.close()
@@ -1,11 +1,25 @@
 import threading
+from array import array
 from typing import List
 
 from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
-from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter, wrap_int
+
+WORD_BITS = 64
+"""
+The width of a word held by RAM with array storage.  Words are signed, so they hold -2**63 to 2**63 - 1, and a
+value outside that range is wrapped to those bits as in two's complement, the same width machine snapshots store.
+"""
+
+STORAGE_TYPES = ("list", "array")
+"""
+The ways RAM can hold its words: a list of Python integers, which holds any value but takes 8 bytes per word plus
+an integer object for every distinct value, or a packed array of 64-bit words, which takes 8 bytes per word.
+"""
 
 
 class RAM(BaseDevice):
@@ -22,19 +36,35 @@ class RAM(BaseDevice):
         threading.Thread(target=self.process_buses, name=self.device_id + "::process_buses").start()
 
     def __init__(self, starting_address: int, size: int, address_bus: AddressBus, data_bus: DataBus,
-                 control_bus: ControlBus, interrupt_bus: InterruptBus):
+                 control_bus: ControlBus, interrupt_bus: InterruptBus, storage: str = "list"):
         """
         Constructs all the necessary attributes for the RAM device.
 
         Parameters:
             starting_address (int): The starting address of the RAM device.
             size (int): The size of the RAM device.
+            storage (str): "list" to hold the words in a list, or "array" to hold them in a packed array of
+                WORD_BITS-bit words.
+
+        Raises:
+            ValueError: If the storage is not one of STORAGE_TYPES.
         """
         super().__init__(starting_address, size, address_bus, data_bus, control_bus, interrupt_bus)
-        self.__memory: List[int] = [0] * size
+        if storage not in STORAGE_TYPES:
+            raise ValueError(f"Unknown RAM storage '{storage}'.  Valid storage types are {', '.join(STORAGE_TYPES)}.")
+        self.__storage = storage
+        self.__memory: List[int] | array = self.create_memory(size)
+
+    @property
+    def storage(self) -> str:
+        """
+        This method returns how the RAM device holds its words.
+        :return: "list" or "array".
+        """
+        return self.__storage
 
     @property
-    def memory(self) -> List[int]:
+    def memory(self) -> List[int] | array:
         """
         This method returns the memory of the RAM device.
         :return: The memory of the RAM device.
@@ -42,13 +72,39 @@ class RAM(BaseDevice):
         return self.__memory
 
     @memory.setter
-    def memory(self, value: List[int]):
+    def memory(self, value: List[int] | array):
         """
         This method sets the memory of the RAM device.
         :param value: The memory to set for the RAM device.
         """
         self.__memory = value
 
+    @property
+    def writable(self) -> bool:
+        """
+        This method returns whether the memory of the RAM device can change.
+        :return: True, unless a subclass holds read-only memory.
+        """
+        return True
+
+    def create_memory(self, size: int) -> List[int] | array:
+        """
+        Creates the memory of the RAM device when it is constructed.  Subclasses that keep their words elsewhere
+        override this.
+        :param size: The number of words.
+        :return: The memory, zeroed.
+        """
+        return self.blank(size)
+
+    def copy_memory(self, start: int = 0, end: int | None = None) -> List[int] | array:
+        """
+        Copies words of the RAM device's memory, in its storage type.
+        :param start: The offset of the first word.
+        :param end: The offset just past the last word, or None for the end of memory.
+        :return: The copy.
+        """
+        return self.__memory[start:end]
+
     def load_data(self, data: List[int]) -> None:
         """
         Loads data into the RAM device.
@@ -59,12 +115,113 @@ class RAM(BaseDevice):
         Raises:
             ValueError: If the length of the data is greater than the memory size.
         """
-        if len(data) > len(self.memory):
+        if len(data) > len(self.__memory):
             raise ValueError("Data must be the same length or less as the memory size.")
-        memory_size = len(self.memory)
-        self.memory.clear()
-        self.memory += data
-        self.memory += [0] * (memory_size - len(self.memory))
+        self.__memory[:len(data)] = self.to_words(data)
+        self.__memory[len(data):] = self.blank(len(self.__memory) - len(data))
+
+    def blank(self, length: int) -> List[int] | array:
+        """
+        Creates zeroed words in the RAM device's storage type.
+        :param length: The number of words.
+        :return: The words.
+        """
+        if self.__storage == "array":
+            return array('q', [0]) * length
+        return [0] * length
+
+    def to_words(self, values: List[int]) -> List[int] | array:
+        """
+        Converts values to the RAM device's storage type, so that they can be assigned to a slice of its memory.
+        Values too wide for array storage are wrapped.
+        :param values: The values.
+        :return: The values in the storage type.
+        """
+        if self.__storage == "list":
+            return values
+        try:
+            return array('q', values)
+        except OverflowError:
+            return array('q', [self.wrap_word(value) for value in values])
+
+    @staticmethod
+    def wrap_word(value: int) -> int:
+        """
+        Wraps a value to a signed WORD_BITS-bit word.
+        :param value: The value.
+        :return: The value's low WORD_BITS bits as a signed integer.
+        """
+        return wrap_int(value)
+
+    @property
+    def supports_direct_access(self) -> bool:
+        """
+        The RAM device can be read and written directly through the backplane's memory map.
+        """
+        return True
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        The contents of the RAM device only change when written, so they may be cached by the processor.
+        """
+        return True
+
+    def read(self, address: int) -> int:
+        """
+        Reads a value from the RAM device without using the buses.
+        :param address: The address to read from.
+        :return: The value at the address.
+        """
+        return self.__memory[address - self.starting_address]
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a value to the RAM device without using the buses.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        try:
+            self.__memory[address - self.starting_address] = value
+        except OverflowError:
+            self.__memory[address - self.starting_address] = self.wrap_word(value)
+
+    def read_block(self, address: int, length: int) -> List[int]:
+        """
+        Reads consecutive values from the RAM device without using the buses.
+        :param address: The address of the first value.
+        :param length: The number of values to read.
+        :return: The values.
+        """
+        offset = address - self.starting_address
+        values = self.__memory[offset:offset + length]
+        return values if self.__storage == "list" else values.tolist()
+
+    def write_block(self, address: int, values: List[int]) -> None:
+        """
+        Writes consecutive values to the RAM device without using the buses.
+        :param address: The address of the first value.
+        :param values: The values to write.
+        """
+        offset = address - self.starting_address
+        self.__memory[offset:offset + len(values)] = self.to_words(values)
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the contents of the RAM device to a machine snapshot.
+        :param writer: The writer to pack the state into.
+        """
+        writer.write_ints(self.__memory)
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the contents of the RAM device from a machine snapshot.
+        :param reader: The reader to unpack the state from.
+        """
+        memory = reader.read_ints()
+        if len(memory) != self.size:
+            raise ValueError(f"{self.device_id}: snapshot holds {len(memory)} words, expected {self.size}.")
+        self.__memory[:] = self.to_words(memory)
 
     def process_buses(self) -> None:
         self.main_loop()
@@ -72,7 +229,7 @@ class RAM(BaseDevice):
 
     def main_loop(self) -> None:
         """
-        The main loop of the RAM device.  This runs continuously to monitor for read and write requests.
+        The main loop of the RAM device.  This waits for bus activity and services read and write requests.
         Returns:
 
         """
@@ -80,14 +237,22 @@ class RAM(BaseDevice):
             self.control_bus.lock_bus()
             self.stop_running_if_halt_detected()
             if self.control_bus.power_on:
-                if self.address_is_valid(self.address_bus):
-                    if self.control_bus.read_request:
-                        self.data_bus.data = self.__memory[self.address_bus.address - self.starting_address]
-                        self.control_bus.read_request = False
-                        self.control_bus.response = True
-                    if self.control_bus.write_request:
-                        self.__memory[self.address_bus.address - self.starting_address] = (
-                            self.data_bus.data)
-                        self.control_bus.write_request = False
-                        self.control_bus.response = True
+                self.service()
+                self.control_bus.wait_for_bus_activity(BUS_IDLE_TIMEOUT)
             self.control_bus.unlock_bus()
+
+    def service(self) -> None:
+        """
+        Services a read or write request addressed to the RAM device.  The bus must be locked.
+        """
+        if self.address_is_valid(self.address_bus):
+            if self.control_bus.read_request:
+                self.data_bus.data = self.__memory[self.address_bus.address - self.starting_address]
+                self.control_bus.read_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
+            if self.control_bus.write_request:
+                self.write(self.address_bus.address, self.data_bus.data)
+                self.control_bus.write_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
@@ -6,7 +6,7 @@ from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
-from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
 
 
 class ROM(BaseDevice):
@@ -60,6 +60,35 @@ class ROM(BaseDevice):
         """
         self.__memory = value
 
+    @property
+    def supports_direct_access(self) -> bool:
+        """
+        The ROM device can be read directly through the backplane's memory map.  Writes to it are ignored.
+        """
+        return True
+
+    @property
+    def cacheable(self) -> bool:
+        """
+        The contents of the ROM device never change, so they may be cached by the processor.
+        """
+        return True
+
+    def read(self, address: int) -> int:
+        """
+        Reads a value from the ROM device without using the buses.
+        :param address: The address to read from.
+        :return: The value at the address.
+        """
+        return self.memory[address - self.starting_address]
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes to the ROM device are ignored.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+
     def process_buses(self) -> None:
         """
         Initializes the ROM device and starts the main loop.
@@ -71,7 +100,7 @@ class ROM(BaseDevice):
 
     def main_loop(self) -> None:
         """
-        The main loop of the ROM device.  This runs continuously to monitor for read requests.
+        The main loop of the ROM device.  This waits for bus activity and services read requests.
         Returns:
 
         """
@@ -79,9 +108,17 @@ class ROM(BaseDevice):
             self.control_bus.lock_bus()
             self.stop_running_if_halt_detected()
             if self.control_bus.power_on:
-                if self.address_is_valid(self.address_bus):
-                    if self.control_bus.read_request:
-                        self.data_bus.data = self.memory[self.address_bus.address - super().starting_address]
-                        self.control_bus.read_request = False
-                        self.control_bus.response = True
+                self.service()
+                self.control_bus.wait_for_bus_activity(BUS_IDLE_TIMEOUT)
             self.control_bus.unlock_bus()
+
+    def service(self) -> None:
+        """
+        Services a read request addressed to the ROM device.  The bus must be locked.
+        """
+        if self.address_is_valid(self.address_bus):
+            if self.control_bus.read_request:
+                self.data_bus.data = self.memory[self.address_bus.address - self.starting_address]
+                self.control_bus.read_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
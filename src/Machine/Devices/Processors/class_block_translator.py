@@ -0,0 +1,240 @@
+from typing import Callable, Dict, List, Tuple
+
+from Constants.class_compare_results import CompareResults
+from Constants.class_instruction_set import InstructionSet
+
+MAXIMUM_BLOCK_INSTRUCTIONS = 256
+"""
+The maximum number of instructions translated into a single block.
+"""
+
+BLOCK_TERMINATORS = {InstructionSet.JMP, InstructionSet.JE, InstructionSet.JNE, InstructionSet.JL, InstructionSet.JG,
+                     InstructionSet.CALL, InstructionSet.RTN, InstructionSet.HALT, InstructionSet.RST,
+                     InstructionSet.SLEEP, InstructionSet.WAKE, InstructionSet.INT,
+                     InstructionSet.TAS, InstructionSet.CAS, InstructionSet.ASSERT_EMPTY_USER_STACK,
+                     InstructionSet.DI, InstructionSet.EI,
+                     InstructionSet.BMOV, InstructionSet.BFILL, InstructionSet.OUTS}
+"""
+Instructions that end a basic block.  Besides branches, these include instructions that change the processor's
+run state, raise an interrupt or enable one, since interrupts are only serviced between blocks, and the atomic
+instructions, so that a processor spinning on a lock sees the writes of the other processors between blocks.  The
+block instructions that write memory end a block too, in case they overwrite translated code.
+"""
+
+CONDITIONAL_JUMPS = {InstructionSet.JE: "p.compare_result == Equal",
+                     InstructionSet.JNE: "p.compare_result != Equal",
+                     InstructionSet.JL: "p.compare_result == LessThan",
+                     InstructionSet.JG: "p.compare_result == GreaterThan"}
+"""
+The condition tested by each conditional jump, as generated Python source.
+"""
+
+
+class BlockTranslator:
+    """
+    The BlockTranslator class is an optional translation tier on top of the processor's interpreter.
+    It finds basic blocks (straight-line runs of instructions ending in a branch, call, return, or halt) and
+    compiles each one into a single Python function that executes the whole block without re-entering the
+    processor's dispatch loop.  Each function returns the number of instructions it executed.  Only code held in
+    directly-accessible memory (such as the RAM loaded by the compiler) is translated; anything else is left to the
+    interpreter.
+    """
+
+    def __init__(self, processor) -> None:
+        """
+        Constructor for the BlockTranslator class.
+        :param processor: The processor whose code is translated.
+        """
+        self.processor = processor
+        self.blocks: Dict[int, Callable] = {}
+        self.block_ranges: Dict[int, Tuple[int, int]] = {}
+        self.block_coverage: Dict[int, List[int]] = {}
+        self.invalidated: bool = False
+        self.__namespace = {"translator": self,
+                            "Equal": CompareResults.Equal,
+                            "GreaterThan": CompareResults.GreaterThan,
+                            "LessThan": CompareResults.LessThan}
+
+    def translate(self, address: int) -> Callable | None:
+        """
+        Translates the basic block that starts at the given address.
+        :param address: The address of the first instruction in the block.
+        :return: The compiled block, or None if the address can't be translated and must be interpreted.
+        """
+        device = self.processor.memory_map.find_device(address)
+        if device is None or not device.supports_direct_access:
+            return None
+
+        lines = ["def block(p):", "    r = p.registers"]
+        instruction_address = address
+        instruction_count = 0
+        terminated = False
+        while instruction_count < MAXIMUM_BLOCK_INSTRUCTIONS:
+            if self.processor.memory_map.find_device(instruction_address) is not device:
+                break
+            if instruction_address in self.processor.breakpoints:
+                # a breakpoint is left to the interpreter, which decodes it to the breakpoint handler
+                break
+            try:
+                decoded_instruction = self.processor.decoded_instructions.get(instruction_address)
+                if decoded_instruction is None:
+                    decoded_instruction = self.processor.decode_instruction(instruction_address)
+            except ValueError:
+                # leave unknown instructions to the interpreter, which reports them
+                break
+            instruction_count += 1
+            next_address = instruction_address + decoded_instruction.length
+            lines.extend("    " + line for line in self.generate_instruction(decoded_instruction.opcode,
+                                                                           decoded_instruction.operands,
+                                                                           instruction_address, next_address,
+                                                                           instruction_count))
+            instruction_address = next_address
+            if decoded_instruction.opcode in BLOCK_TERMINATORS:
+                terminated = True
+                break
+
+        if instruction_count == 0:
+            return None
+        if not terminated:
+            lines.append(f"    p.instruction_pointer = {instruction_address}")
+        lines.append(f"    return {instruction_count}")
+
+        namespace = dict(self.__namespace)
+        exec(compile("\n".join(lines), f"<block {address}>", "exec"), namespace)
+        block = namespace["block"]
+        self.blocks[address] = block
+        self.block_ranges[address] = (address, instruction_address)
+        for covered_address in range(address, instruction_address):
+            self.block_coverage.setdefault(covered_address, []).append(address)
+        return block
+
+    def invalidate(self, address: int) -> None:
+        """
+        Discards every translated block that contains the given address.
+        This is called when the processor writes to memory, so that self-modifying code is re-translated.
+        :param address: The address that has been written to.
+        """
+        block_addresses = self.block_coverage.get(address)
+        if block_addresses is None:
+            return
+        for block_address in list(block_addresses):
+            self.discard_block(block_address)
+        self.invalidated = True
+
+    def invalidate_range(self, start: int, end: int) -> None:
+        """
+        Discards every translated block that overlaps a range of addresses, found from the blocks' own ranges so
+        that a long range costs no more than a short one.
+        :param start: The first address written to.
+        :param end: The address just past the last.
+        """
+        block_addresses = [block_address for block_address, (block_start, block_end) in self.block_ranges.items()
+                           if block_start < end and block_end > start]
+        if not block_addresses:
+            return
+        for block_address in block_addresses:
+            self.discard_block(block_address)
+        self.invalidated = True
+
+    def discard_block(self, block_address: int) -> None:
+        """
+        Discards a translated block and removes it from the coverage of the addresses it was translated from.
+        :param block_address: The address the block starts at.
+        """
+        self.blocks.pop(block_address, None)
+        start, end = self.block_ranges.pop(block_address)
+        for covered_address in range(start, end):
+            covering_blocks = self.block_coverage.get(covered_address)
+            if covering_blocks is not None:
+                covering_blocks.remove(block_address)
+                if not covering_blocks:
+                    del self.block_coverage[covered_address]
+
+    @staticmethod
+    def address_expression(address: int) -> str:
+        """
+        Returns the source for an address operand, resolving @register pointers at run time.
+        :param address: The raw address operand.
+        :return: Python source that evaluates to the address.
+        """
+        if address < 0:
+            return f"r[{abs(address)}]"
+        return str(address)
+
+    def generate_instruction(self, opcode: int, operands: Tuple[int, ...], address: int,
+                             next_address: int, instruction_count: int) -> List[str]:
+        """
+        Generates the Python source for a single instruction within a block.
+        Instructions that can fail record the instruction pointer first, so errors are reported at the right place.
+        :param opcode: The opcode of the instruction.
+        :param operands: The raw operands of the instruction.
+        :param address: The address of the instruction.
+        :param next_address: The address of the following instruction.
+        :param instruction_count: The number of instructions executed once this one completes.
+        :return: The lines of Python source for the instruction.
+        """
+        record_position = [f"p.instruction_pointer = {address}", f"p.last_instruction = {opcode}"]
+        # an @register pointer operand can name a register that doesn't exist
+        pointer_position = record_position if any(operand < 0 for operand in operands) else []
+        match opcode:
+            case InstructionSet.NOP:
+                return []
+            case InstructionSet.LR:
+                return record_position + [f"r[{operands[0]}] = {operands[1]}"]
+            case InstructionSet.LRR:
+                return record_position + [f"r[{operands[0]}] = r[{operands[1]}]"]
+            case InstructionSet.LRM:
+                return record_position + [
+                    f"r[{operands[0]}] = p.get_value_from_address({self.address_expression(operands[1])}, "
+                    f"cacheable=True)"]
+            case InstructionSet.MRM:
+                # the block ends early if the write changed translated code, or if it started a DMA transfer
+                # whose writes must be invalidated from the caches before the next instruction
+                return record_position + [
+                    "translator.invalidated = False",
+                    f"p.send_value_to_address({self.address_expression(operands[1])}, r[{operands[0]}], "
+                    f"cacheable=False)",
+                    "if translator.invalidated or p.pending_invalidations:",
+                    f"    p.instruction_pointer = {next_address}",
+                    f"    return {instruction_count}"]
+            case InstructionSet.ADD:
+                return ["r[3] = r[1] + r[2]"]
+            case InstructionSet.SUB:
+                return ["r[3] = r[1] - r[2]"]
+            case InstructionSet.MUL:
+                return ["r[3] = r[1] * r[2]"]
+            case InstructionSet.DIV:
+                return record_position + ["r[3] = r[1] // r[2]", "r[4] = r[1] % r[2]"]
+            case InstructionSet.NOT:
+                return ["r[3] = ~r[1]"]
+            case InstructionSet.OR:
+                return ["r[3] = r[1] | r[2]"]
+            case InstructionSet.AND:
+                return ["r[3] = r[1] & r[2]"]
+            case InstructionSet.XOR:
+                return ["r[3] = r[1] ^ r[2]"]
+            case InstructionSet.INC:
+                return record_position + [f"r[{operands[0]}] += 1"]
+            case InstructionSet.DEC:
+                return record_position + [f"r[{operands[0]}] -= 1"]
+            case InstructionSet.CMP:
+                return ["p.compare_result = LessThan if r[1] < r[2] else GreaterThan if r[1] > r[2] else Equal"]
+            case InstructionSet.PUSH:
+                return record_position + [f"p.user_stack.append(r[{operands[0]}])"]
+            case InstructionSet.POP:
+                return record_position + [f"r[{operands[0]}] = p.user_stack.pop()"]
+            case InstructionSet.PEEK:
+                return record_position + [f"r[{operands[0]}] = p.user_stack[-1]"]
+            case InstructionSet.JMP:
+                return pointer_position + [f"p.instruction_pointer = {self.address_expression(operands[0])}"]
+            case InstructionSet.JE | InstructionSet.JNE | InstructionSet.JL | InstructionSet.JG:
+                return pointer_position + [
+                    f"if {CONDITIONAL_JUMPS[opcode]}:",
+                    f"    p.instruction_pointer = {self.address_expression(operands[0])}",
+                    "else:",
+                    f"    p.instruction_pointer = {next_address}"]
+            case _:
+                # anything else is executed by the interpreter's handler for the instruction
+                handler_name = "handle_" + InstructionSet(opcode).name.lower()
+                arguments = ", ".join(str(operand) for operand in operands)
+                return record_position + [f"p.{handler_name}({arguments})"]
@@ -0,0 +1,156 @@
+from collections import OrderedDict
+from typing import List
+
+DEFAULT_CACHE_SIZE = 4096
+"""
+The default number of words held by the processor's data cache.
+"""
+DEFAULT_CACHE_ASSOCIATIVITY = 4
+"""
+The default number of ways in each set of the processor's data cache.
+"""
+
+
+class DataCache:
+    """
+    A bounded, set-associative cache of memory words with least-recently-used eviction.
+    An address always maps to the same set; when a set is full, the least-recently-used word in that set is
+    evicted to make room.  The cache is write-through: writes update a cached word but never allocate one.
+    """
+
+    __slots__ = ('__associativity', '__setCount', '__sets', '__hits', '__misses', '__evictions')
+
+    def __init__(self, size: int = DEFAULT_CACHE_SIZE, associativity: int = DEFAULT_CACHE_ASSOCIATIVITY) -> None:
+        """
+        Constructor for the DataCache class.
+        :param size: The total number of words the cache can hold.
+        :param associativity: The number of words each set can hold.
+        """
+        if size < 1 or associativity < 1:
+            raise ValueError("Cache size and associativity must be at least 1.")
+        self.__associativity: int = min(associativity, size)
+        self.__setCount: int = size // self.__associativity
+        self.__sets: List[OrderedDict[int, int]] = [OrderedDict() for _ in range(self.__setCount)]
+        self.__hits: int = 0
+        self.__misses: int = 0
+        self.__evictions: int = 0
+
+    @property
+    def size(self) -> int:
+        """
+        The total number of words the cache can hold.
+        """
+        return self.__setCount * self.__associativity
+
+    @property
+    def associativity(self) -> int:
+        """
+        The number of words each set can hold.
+        """
+        return self.__associativity
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of lookups that found the word in the cache.
+        """
+        return self.__hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of lookups that didn't find the word in the cache.
+        """
+        return self.__misses
+
+    @property
+    def evictions(self) -> int:
+        """
+        The number of words evicted to make room for others.
+        """
+        return self.__evictions
+
+    def lookup(self, address: int) -> int | None:
+        """
+        Looks up a word in the cache and marks it as most recently used.
+        :param address: The address of the word.
+        :return: The cached value, or None if the word isn't cached.
+        """
+        cache_set = self.__sets[address % self.__setCount]
+        value = cache_set.get(address)
+        if value is None:
+            self.__misses += 1
+            return None
+        cache_set.move_to_end(address)
+        self.__hits += 1
+        return value
+
+    def store(self, address: int, value: int) -> None:
+        """
+        Stores a word that has just been read from memory, evicting the least-recently-used word in its set if
+        the set is full.
+        :param address: The address of the word.
+        :param value: The value of the word.
+        """
+        cache_set = self.__sets[address % self.__setCount]
+        cache_set[address] = value
+        cache_set.move_to_end(address)
+        if len(cache_set) > self.__associativity:
+            cache_set.popitem(last=False)
+            self.__evictions += 1
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Updates a word that has just been written to memory, if it is cached.
+        :param address: The address of the word.
+        :param value: The new value of the word.
+        """
+        cache_set = self.__sets[address % self.__setCount]
+        if address in cache_set:
+            cache_set[address] = value
+
+    def write_block(self, address: int, values: List[int]) -> None:
+        """
+        Updates the cached words among consecutive words that have just been written to memory.  A block longer
+        than the number of sets is matched against the words in the cache rather than looked up word by word.
+        :param address: The address of the first word.
+        :param values: The new values of the words.
+        """
+        if len(values) <= self.__setCount:
+            for word_address, value in enumerate(values, address):
+                self.write(word_address, value)
+            return
+        end = address + len(values)
+        for cache_set in self.__sets:
+            for word_address in cache_set:
+                if address <= word_address < end:
+                    cache_set[word_address] = values[word_address - address]
+
+    def invalidate(self, address: int) -> None:
+        """
+        Removes a word from the cache, if it is cached.
+        :param address: The address of the word.
+        """
+        self.__sets[address % self.__setCount].pop(address, None)
+
+    def invalidate_range(self, start: int, end: int) -> None:
+        """
+        Removes the cached words in a range of addresses.  A range longer than the number of sets is matched
+        against the words in the cache rather than looked up word by word.
+        :param start: The first address.
+        :param end: The address just past the last.
+        """
+        if end - start <= self.__setCount:
+            for address in range(start, end):
+                self.__sets[address % self.__setCount].pop(address, None)
+            return
+        for cache_set in self.__sets:
+            for address in [address for address in cache_set if start <= address < end]:
+                del cache_set[address]
+
+    def clear(self) -> None:
+        """
+        Removes every word from the cache.  The counters are not reset.
+        """
+        for cache_set in self.__sets:
+            cache_set.clear()
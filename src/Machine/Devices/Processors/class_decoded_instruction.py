@@ -0,0 +1,35 @@
+from typing import Callable, NamedTuple, Tuple
+
+from Constants.class_instruction_set import OPERAND_COUNTS
+
+MAXIMUM_INSTRUCTION_LENGTH = max(OPERAND_COUNTS.values()) + 1
+"""
+The length, in words, of the longest instruction (an opcode followed by its operands).
+"""
+
+
+class DecodedInstruction(NamedTuple):
+    """
+    An instruction that has been fetched from memory and decoded by the processor.
+    Decoded instructions are cached by address so that later executions skip the fetch and the opcode lookup.
+    """
+    handler: Callable[..., None]
+    """
+    The processor method that executes the instruction.
+    """
+    opcode: int
+    """
+    The opcode of the instruction.
+    """
+    operands: Tuple[int, ...]
+    """
+    The raw operands that follow the opcode in memory.
+    """
+    length: int
+    """
+    The number of words the instruction occupies, including the opcode.
+    """
+    registers: Tuple[int, ...]
+    """
+    The registers the instruction reads or writes.
+    """
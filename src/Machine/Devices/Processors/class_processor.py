@@ -1,28 +1,61 @@
 import threading
+from collections import deque
 from datetime import datetime
-from time import sleep
+from functools import partial
+from typing import Callable
 import traceback
 
 from Constants.class_compare_results import CompareResults
-from Constants.class_instruction_set import InstructionSet
+from Constants.class_instruction_set import InstructionSet, OPERAND_COUNTS, get_registers_used
 from Constants.class_interrupts import Interrupts
+from Machine.Backplane.class_bus_arbiter import BusArbiter
 from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
-from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Buses.class_interrupt_bus import InterruptBus, ALL_INTERRUPTS
+from Machine.Devices.Bases.class_base_device import BUS_IDLE_TIMEOUT
 from Machine.Devices.Bases.class_base_processor import BaseProcessor
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+from Machine.Devices.Processors.class_block_translator import BlockTranslator, MAXIMUM_BLOCK_INSTRUCTIONS
+from Machine.Devices.Processors.class_data_cache import DataCache, DEFAULT_CACHE_SIZE, DEFAULT_CACHE_ASSOCIATIVITY
+from Machine.Devices.Processors.class_decoded_instruction import DecodedInstruction, MAXIMUM_INSTRUCTION_LENGTH
+from Machine.Diagnostics.class_execution_tracer import ExecutionTracer
 
 
 class Processor(BaseProcessor):
 
+    __slots__ = ('last_instruction', 'reset_address', 'instruction_pointer', 'instruction_pointer_stack',
+                 'interrupt_vectors', 'handling_interrupt', 'interrupt_instruction_pointer_stack_depth',
+                 'processor_raised_interrupt', 'sleeping', 'sleep_mode', 'instructions_retired', 'instruction_budget',
+                 'budget_exhausted', 'halt_on_unhandled_stack_assertion', 'fault', 'state_restored',
+                 'interrupts_serviced', 'interrupt_routing', 'interrupt_routing_mask', 'interrupt_enable_mask',
+                 'vectored_interrupts', 'accepted_interrupts', 'registers', 'register_stack', 'register_stack_depth',
+                 'user_stack', 'data_cache', 'decoded_instructions', 'compare_result', 'cache_enabled', 'peers',
+                 'pending_invalidations', 'arbiter', 'instruction_handlers', 'engine', 'block_translator',
+                 'process_instructions', 'tracer', 'breakpoints', 'breakpoint_handler')
+
     def __init__(self, starting_address: int, size: int, address_bus: AddressBus, data_bus: DataBus,
-                 control_bus: ControlBus, interrupt_bus: InterruptBus):
+                 control_bus: ControlBus, interrupt_bus: InterruptBus, engine: str = "interp",
+                 cache_size: int = DEFAULT_CACHE_SIZE, cache_associativity: int = DEFAULT_CACHE_ASSOCIATIVITY,
+                 reset_address: int = 0, interrupt_routing: set[int] | None = None):
+        """
+        Constructs the processor.
 
+        Args:
+            engine: The execution engine to use: "interp" interprets one instruction at a time, "block" translates
+                basic blocks into Python functions and falls back to the interpreter where it can't translate.
+            cache_size: The number of words held by the data cache.
+            cache_associativity: The number of ways in each set of the data cache.
+            reset_address: The address the processor starts executing from after a reset.
+            interrupt_routing: The interrupts this processor services, or None to service any interrupt it has a
+                vector for.  Used to route interrupts between the processors of a multi-processor machine.
+        """
         super().__init__(starting_address, size, address_bus, data_bus,
                          control_bus, interrupt_bus)
         # flow control
         self.last_instruction = None
-        self.instruction_pointer: int = 0
+        self.reset_address: int = reset_address
+        self.instruction_pointer: int = reset_address
         self.instruction_pointer_stack: list[int] = []
         self.interrupt_vectors: dict[int, int] = {}
         self.handling_interrupt: bool = False
@@ -30,28 +63,189 @@ class Processor(BaseProcessor):
         self.processor_raised_interrupt: int = 0  # the interrupt number that the processor raised via INT instruction
         self.sleeping: bool = False
         self.sleep_mode: bool = False
+        self.instructions_retired: int = 0
+        self.instruction_budget: int = 0  # halt after this many instructions; 0 means no limit
+        self.budget_exhausted: bool = False
+        self.halt_on_unhandled_stack_assertion: bool = False
+        self.fault: str | None = None  # the error that stopped the processor, if any
+        self.state_restored: bool = False  # set when a snapshot is restored, so the processor isn't reset on start
+        self.interrupts_serviced: int = 0
+        self.interrupt_routing: set[int] | None = interrupt_routing
+        self.interrupt_routing_mask: int = ALL_INTERRUPTS
+        if interrupt_routing is not None:
+            self.interrupt_routing_mask = sum(1 << InterruptBus.check_interrupt_number(interrupt_number)
+                                              for interrupt_number in interrupt_routing)
+        self.interrupt_enable_mask: int = ALL_INTERRUPTS  # the enable register, changed by the DI and EI instructions
+        self.vectored_interrupts: int = 0  # a bit for every interrupt with a vector set by SIV
+        self.accepted_interrupts: int = 0
+        self.update_accepted_interrupts()
 
         # data
         self.registers: list[int] = []
+        # the registers saved by CALL and interrupt entry.  Frames are kept for reuse when they are popped, so
+        # only the first call to a new depth allocates one; register_stack_depth is the number in use
         self.register_stack: list[list[int]] = []
+        self.register_stack_depth: int = 0
         self.user_stack: list[int] = []
-        self.data_cache: dict[int, int] = {}
+        self.data_cache: DataCache = DataCache(cache_size, cache_associativity)
+        self.decoded_instructions: dict[int, DecodedInstruction] = {}
         self.compare_result: CompareResults = CompareResults.Inconclusive
         self.cache_enabled: bool = True
 
+        # multi-processor support, set up by the backplane when it has more than one processor
+        self.peers: list[Processor] = []
+        self.pending_invalidations: deque[tuple[int, int]] = deque()  # (start, end) ranges written by peers
+        self.arbiter: BusArbiter | None = None
+
+        # execution engine
+        self.instruction_handlers: list[tuple[Callable[..., None], int] | None] = self.build_instruction_handlers()
+        self.block_translator: BlockTranslator | None = None
+        self.tracer: ExecutionTracer | None = None
+        self.select_engine(engine)
+
+        # debugging: the addresses whose instructions decode to a breakpoint, and the function told when one is
+        # reached, which returns True to stop the machine before the instruction executes
+        self.breakpoints: set[int] = set()
+        self.breakpoint_handler: Callable[['Processor'], bool] | None = None
+
+    def select_engine(self, engine: str) -> None:
+        """
+        Selects the execution engine, and the method each step runs: traced if a tracer is attached, untraced
+        otherwise.  Time travel switches block-engine processors to the interpreter, so that every instruction
+        is a step.
+
+        Args:
+            engine: "interp" or "block".
+        """
+        self.engine = engine
+        if engine == "block":
+            if self.block_translator is None:
+                self.block_translator = BlockTranslator(self)
+            self.process_instructions = (self.perform_block_processing if self.tracer is None
+                                         else self.perform_traced_block_processing)
+        else:
+            self.block_translator = None
+            self.process_instructions = (self.perform_instruction_processing if self.tracer is None
+                                         else self.perform_traced_instruction_processing)
+
+    def attach_tracer(self, tracer: ExecutionTracer | None) -> None:
+        """
+        Attaches an execution tracer, which records each instruction (or, under the block engine, each translated
+        block) before it executes.  Passing None detaches the tracer.  Untraced processors run the untraced
+        execution methods, so tracing costs nothing unless it is enabled.
+
+        Args:
+            tracer: The tracer to attach, or None.
+        """
+        self.tracer = tracer
+        self.select_engine(self.engine)
+
+    def set_breakpoints(self, addresses: set[int], handler: Callable[['Processor'], bool] | None) -> None:
+        """
+        Sets the breakpoints.  Nothing is checked as instructions execute: the instruction at a breakpoint decodes
+        to one whose handler calls the breakpoint handler first, and the block translator ends blocks before it.
+        The decoded instructions and translated blocks at addresses whose breakpoints changed are discarded.
+
+        Args:
+            addresses: The addresses of the breakpoints.
+            handler: Called with the processor when it reaches a breakpoint.  It returns True to stop the machine
+                before the instruction executes.
+        """
+        changed_addresses = self.breakpoints ^ set(addresses)
+        self.breakpoints = set(addresses)
+        self.breakpoint_handler = handler
+        for address in changed_addresses:
+            self.decoded_instructions.pop(address, None)
+            if self.block_translator is not None:
+                self.block_translator.invalidate(address)
+
+    def build_instruction_handlers(self) -> list[tuple[Callable[..., None], int] | None]:
+        """
+        Builds the dispatch table used by the decoder.
+        The table is a dense list indexed by opcode, where each entry holds the bound handler method for the
+        instruction and its operand count.  Opcodes that aren't part of the instruction set have no entry.
+
+        Returns:
+            The dispatch table.
+        """
+        instruction_handlers: list[tuple[Callable[..., None], int] | None] = [None] * (max(OPERAND_COUNTS) + 1)
+        for instruction, operand_count in OPERAND_COUNTS.items():
+            handler = getattr(self, "handle_" + instruction.name.lower())
+            instruction_handlers[instruction] = (handler, operand_count)
+        return instruction_handlers
+
     def reset_processor(self):
         """
         Resets the state of the processor to its initial conditions.
 
-        Sets instruction pointer to 0, initializes registers to zero, clears stacks, and sets flags.
+        Sets instruction pointer to the reset address, initializes registers to zero, clears stacks, and sets flags.
         """
-        self.instruction_pointer = 0
+        self.instruction_pointer = self.reset_address
         self.registers = [0] * 16
-        self.register_stack = []
+        self.register_stack_depth = 0
         self.sleeping = False
         self.sleep_mode = False
         self.compare_result = CompareResults.Inconclusive
         self.user_stack = []
+        self.interrupt_enable_mask = ALL_INTERRUPTS
+        self.update_accepted_interrupts()
+
+    def update_accepted_interrupts(self) -> None:
+        """
+        Recalculates the bitmask of interrupts the processor accepts from its routing, its enable register and its
+        interrupt vectors.  An interrupt without a vector isn't accepted, so it stays pending without waking the
+        processor from SLEEP, until a vector is set for it or another processor services it.
+        """
+        self.vectored_interrupts = sum(1 << interrupt_number for interrupt_number in self.interrupt_vectors)
+        self.accepted_interrupts = self.interrupt_routing_mask & self.interrupt_enable_mask & self.vectored_interrupts
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the registers, stacks, interrupt vectors and flags of the processor to a machine snapshot.
+        Caches are not saved; they refill from memory when the machine runs again.
+
+        Args:
+            writer: The writer to pack the state into.
+        """
+        writer.write_int(self.instruction_pointer)
+        writer.write_ints(self.registers)
+        writer.write_int(int(self.compare_result))
+        writer.write_ints(self.user_stack)
+        writer.write_ints(self.instruction_pointer_stack)
+        writer.write_int(self.register_stack_depth)
+        for registers in self.register_stack[:self.register_stack_depth]:
+            writer.write_ints(registers)
+        writer.write_ints([value for vector in self.interrupt_vectors.items() for value in vector])
+        writer.write_ints([int(self.handling_interrupt), self.interrupt_instruction_pointer_stack_depth,
+                           self.processor_raised_interrupt, int(self.sleeping), int(self.sleep_mode),
+                           self.interrupt_enable_mask])
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the processor from a machine snapshot.  The processor resumes from the restored instruction
+        pointer instead of resetting when it starts.
+
+        Args:
+            reader: The reader to unpack the state from.
+        """
+        self.instruction_pointer = reader.read_int()
+        self.registers = reader.read_ints()
+        self.compare_result = CompareResults(reader.read_int())
+        self.user_stack = reader.read_ints()
+        self.instruction_pointer_stack = reader.read_ints()
+        self.register_stack = [reader.read_ints() for _ in range(reader.read_int())]
+        self.register_stack_depth = len(self.register_stack)
+        vectors = reader.read_ints()
+        self.interrupt_vectors = dict(zip(vectors[0::2], vectors[1::2]))
+        (handling_interrupt, self.interrupt_instruction_pointer_stack_depth, self.processor_raised_interrupt,
+         sleeping, sleep_mode, self.interrupt_enable_mask) = reader.read_ints()
+        self.update_accepted_interrupts()
+        self.handling_interrupt = bool(handling_interrupt)
+        self.sleeping = bool(sleeping)
+        self.sleep_mode = bool(sleep_mode)
+        self.decoded_instructions.clear()
+        self.data_cache.clear()
+        self.state_restored = True
 
     def start(self) -> None:
 
@@ -65,292 +259,738 @@ class Processor(BaseProcessor):
     def main_loop(self) -> None:
         """
         Handles the main execution loop of the processor, managing power state, interrupt processing, and exception handling.
+        While the processor sleeps, the thread waits for an interrupt it accepts (or the halt interrupt) to be raised
+        instead of spinning.
         """
-        self.reset_processor()
+        if not self.state_restored:
+            self.reset_processor()
+        halt_interrupt = 1 << Interrupts.halt
+        interrupt_bus = self.interrupt_bus
+        control_bus = self.control_bus
         while self.running:
-            self.control_bus.lock_bus()
-            self.stop_running_if_halt_detected()
-            power_is_on: bool = self.control_bus.power_on
-            self.control_bus.unlock_bus()
-            if power_is_on:
-                self.process_interrupts()
-                if not self.sleeping:
-                    try:
-                        self.perform_instruction_processing()
-                    except Exception as e:
-                        print(f"Exception caught: {e}")
-                        traceback.print_exc()
-                        print(f"Instruction Pointer: {self.instruction_pointer}")
-                        print(f"Instruction Opcode: {self.last_instruction}")
-                        try:
-                            instruction_name = InstructionSet(self.last_instruction).name
-                        except (ValueError, AttributeError):
-                            instruction_name = "UNKNOWN"
-                        print(f"Instruction: {instruction_name}")
-                        print(f"Registers: {self.registers}")
-                        self.control_bus.lock_bus()
-                        self.interrupt_bus.set_interrupt(Interrupts.halt)
-                        self.control_bus.unlock_bus()
-            self.finished = True
+            # the bus is only locked once the halt interrupt is seen
+            if interrupt_bus.pending & halt_interrupt:
+                control_bus.lock_bus()
+                self.stop_running_if_halt_detected()
+                control_bus.unlock_bus()
+            if control_bus.power_on and self.running:
+                self.step()
+                if self.sleeping:
+                    interrupt_bus.wait_for_interrupt(self.accepted_interrupts | halt_interrupt, BUS_IDLE_TIMEOUT)
+        self.finished = True
+
+    def start_cooperative(self) -> None:
+        """
+        Prepares the processor to be stepped by the cooperative scheduler instead of its own thread.
+        """
+        if not self.state_restored:
+            self.reset_processor()
+
+    def step(self) -> None:
+        """
+        Performs one step of the processor: services a pending interrupt, then executes the next instruction (or
+        translated block) unless the processor is asleep.  Errors and an exhausted instruction budget halt the
+        machine.
+        """
+        if self.pending_invalidations:
+            self.apply_pending_invalidations()
+        if self.interrupt_bus.pending & self.accepted_interrupts and not self.handling_interrupt:
+            self.process_interrupts()
+        if not self.sleeping:
+            try:
+                self.process_instructions()
+            except Exception as e:
+                self.fault = str(e)
+                print(f"Exception caught: {e}")
+                traceback.print_exc()
+                print(f"Instruction Pointer: {self.instruction_pointer}")
+                print(f"Instruction Opcode: {self.last_instruction}")
+                try:
+                    instruction_name = InstructionSet(self.last_instruction).name
+                except (ValueError, AttributeError):
+                    instruction_name = "UNKNOWN"
+                print(f"Instruction: {instruction_name}")
+                print(f"Registers: {self.registers}")
+                if self.tracer is not None:
+                    self.tracer.record_fault()
+                self.raise_halt_interrupt()
+            if self.instruction_budget and self.instructions_retired >= self.instruction_budget:
+                self.budget_exhausted = True
+                self.raise_halt_interrupt()
+
+    def apply_pending_invalidations(self) -> None:
+        """
+        Discards cached copies of the addresses that other processors and DMA have written to since the last step.
+        Writers only queue the ranges of addresses, so the caches are only ever changed by the thread that runs this
+        processor.
+        """
+        pending_invalidations = self.pending_invalidations
+        while pending_invalidations:
+            start, end = pending_invalidations.popleft()
+            if end - start == 1:
+                self.data_cache.invalidate(start)
+                self.invalidate_decoded_instructions(start)
+            else:
+                self.data_cache.invalidate_range(start, end)
+                self.invalidate_decoded_range(start, end)
+
+    def raise_halt_interrupt(self) -> None:
+        """
+        Raises the halt interrupt and wakes the devices waiting on the bus so that they notice it.
+        """
+        self.control_bus.lock_bus()
+        self.interrupt_bus.set_interrupt(Interrupts.halt)
+        self.control_bus.signal_bus()
+        self.control_bus.unlock_bus()
 
     def get_value_from_address(self, address: int, cacheable: bool):
         """
-        This function retrieves data from the specified address.
+        This function retrieves data from the specified address through the backplane's memory map.
         It can optionally cache the data for future use.
 
         Args:
             address (int): The memory address from which to retrieve the data.
-            cacheable (bool, optional): If True, the retrieved data will be cached for future use.
-            Defaults to False.
+            cacheable (bool): If True, the retrieved data may be served from, and kept in, the data cache.
 
         Returns:
             int: The retrieved data.
 
         Note:
-            - If `cacheable` is True and the requested address is already present in the cache,
-                the data will be retrieved from the cache.
-            - If `cacheable` is True and the requested address is not present in the cache,
-                the data will be retrieved from the memory and then cached for future use.
+            - Data is only cached if the device that owns the address declares itself cacheable.
+              I/O devices and clocks are never cached, so reads from them always reach the device.
+            - If the data cache is full, the least-recently-used word in the address's set is evicted.
             - If `cacheable` is False, the data will always be retrieved from the memory.
         """
         if self.cache_enabled and cacheable:
-            if address in self.data_cache:
-                return self.data_cache[address]
-        self.control_bus.lock_bus()
-        self.address_bus.address = address
-        self.control_bus.read_request = True
-        self.control_bus.unlock_bus()
-        while not self.control_bus.response and self.control_bus.power_on:
-            sleep(0)
-        self.control_bus.lock_bus()
-        value: int = self.data_bus.data
-        self.control_bus.response = False
-        self.control_bus.unlock_bus()
-        if self.cache_enabled and cacheable:
-            self.data_cache[address] = value
-        else:
-            self.data_cache.pop(address, None)
-        return value
+            value = self.data_cache.lookup(address)
+            if value is not None:
+                return value
+            value = self.memory_map.read(address)
+            if self.memory_map.is_cacheable(address):
+                self.data_cache.store(address, value)
+            return value
+        return self.memory_map.read(address)
 
     def send_value_to_address(self, address: int, value: int, cacheable: bool):
         """
         Sends a value to a given address.
+        The data cache is write-through: a cached copy of the address is always updated.
 
         Args:
             address: The address to send the value to.
             value: The value to send.
-            cacheable: Boolean indicating whether the value can be cached.
-            Default is False.
+            cacheable: If True, the value may also be added to the data cache when the address is cacheable.
         """
-        if self.cache_enabled and cacheable:
-            self.data_cache[address] = value
+        if self.cache_enabled and cacheable and self.memory_map.is_cacheable(address):
+            self.data_cache.store(address, value)
         else:
-            self.data_cache.pop(address, None)
-        while self.control_bus.read_request or self.control_bus.write_request:
-            sleep(0)
-        self.control_bus.lock_bus()
-        self.address_bus.address = address
-        self.data_bus.data = value
-        self.control_bus.write_request = True
-        self.control_bus.unlock_bus()
-        while not self.control_bus.response and self.control_bus.power_on:
-            sleep(0)
+            self.data_cache.write(address, value)
+        self.invalidate_decoded_instructions(address)
+        for peer in self.peers:
+            peer.pending_invalidations.append((address, address + 1))
+        if self.arbiter is not None:
+            with self.arbiter:
+                self.memory_map.write(address, value)
+        else:
+            self.memory_map.write(address, value)
+
+    def send_block_to_address(self, address: int, values: list[int]) -> None:
+        """
+        Sends consecutive values to memory, starting at a given address.
+        Cached copies of the addresses are updated and decoded instructions discarded, as for a single value.  The
+        caller holds the bus arbiter if there is one.
+
+        Args:
+            address: The address of the first value.
+            values: The values to send.
+        """
+        end_address = address + len(values)
+        self.data_cache.write_block(address, values)
+        self.invalidate_decoded_range(address, end_address)
+        for peer in self.peers:
+            peer.pending_invalidations.append((address, end_address))
+        self.memory_map.write_block(address, values)
+
+    def perform_instruction_processing(self) -> None:
+        """
+        Executes the instruction at the current instruction pointer.
+        The instruction is decoded on first execution and the decoded form is cached, so later executions skip
+        both the memory fetches and the handler lookup.
+        """
+        decoded_instruction = self.decoded_instructions.get(self.instruction_pointer)
+        if decoded_instruction is None:
+            decoded_instruction = self.decode_instruction(self.instruction_pointer)
+        self.last_instruction = decoded_instruction.opcode
+        decoded_instruction.handler(*decoded_instruction.operands)
+        self.instructions_retired += 1
+
+    def perform_block_processing(self) -> None:
+        """
+        Executes the translated basic block at the current instruction pointer, translating it first if necessary.
+        Falls back to interpreting a single instruction when the code at the instruction pointer can't be translated,
+        or when a whole block could run past the instruction budget, so that the budget is never overshot.
+        """
+        if self.instruction_budget and self.instruction_budget - self.instructions_retired < MAXIMUM_BLOCK_INSTRUCTIONS:
+            self.perform_instruction_processing()
+            return
+        block = self.block_translator.blocks.get(self.instruction_pointer)
+        if block is None:
+            block = self.block_translator.translate(self.instruction_pointer)
+            if block is None:
+                self.perform_instruction_processing()
+                return
+        self.instructions_retired += block(self)
+
+    def perform_traced_instruction_processing(self) -> None:
+        """
+        Executes the instruction at the current instruction pointer, recording it in the execution tracer first.
+        """
+        decoded_instruction = self.decoded_instructions.get(self.instruction_pointer)
+        if decoded_instruction is None:
+            decoded_instruction = self.decode_instruction(self.instruction_pointer)
+        self.last_instruction = decoded_instruction.opcode
+        self.tracer.record_instruction(self.instruction_pointer, decoded_instruction, self.registers)
+        decoded_instruction.handler(*decoded_instruction.operands)
+        self.instructions_retired += 1
+
+    def perform_traced_block_processing(self) -> None:
+        """
+        Executes the translated basic block at the current instruction pointer, recording the block in the
+        execution tracer first.  Code that can't be translated, or near the end of the instruction budget, is
+        interpreted and traced an instruction at a time.
+        """
+        if self.instruction_budget and self.instruction_budget - self.instructions_retired < MAXIMUM_BLOCK_INSTRUCTIONS:
+            self.perform_traced_instruction_processing()
+            return
+        block = self.block_translator.blocks.get(self.instruction_pointer)
+        if block is None:
+            block = self.block_translator.translate(self.instruction_pointer)
+            if block is None:
+                self.perform_traced_instruction_processing()
+                return
+        self.tracer.record_block(self.instruction_pointer,
+                                 self.block_translator.block_ranges[self.instruction_pointer][1])
+        self.instructions_retired += block(self)
+
+    def decode_instruction(self, address: int) -> DecodedInstruction:
+        """
+        Fetches and decodes the instruction at the given address and stores it in the decoded instruction cache.
+
+        Args:
+            address: The address of the instruction's opcode.
+
+        Returns:
+            DecodedInstruction: The handler, opcode, operands, and length of the instruction.
+
+        Raises:
+            ValueError: If the opcode is not a known instruction.
+        """
+        opcode = self.get_value_from_address(address, cacheable=True)
+        self.last_instruction = opcode
+        instruction_handler = None
+        if 0 <= opcode < len(self.instruction_handlers):
+            instruction_handler = self.instruction_handlers[opcode]
+        if instruction_handler is None:
+            # Raise an error for unknown instruction
+            raise ValueError(
+                f"Unknown instruction encountered at address {address}. Opcode is {opcode}")
+        handler, operand_count = instruction_handler
+
+        operands = tuple(self.get_value_from_address(address + offset, cacheable=True)
+                         for offset in range(1, operand_count + 1))
+        if address in self.breakpoints:
+            handler = partial(self.handle_breakpoint, handler)
+        decoded_instruction = DecodedInstruction(handler, opcode, operands, operand_count + 1,
+                                                 get_registers_used(opcode, operands))
+        self.decoded_instructions[address] = decoded_instruction
+        return decoded_instruction
+
+    def invalidate_decoded_instructions(self, address: int) -> None:
+        """
+        Discards any decoded instruction that was decoded from the given address.
+        This keeps self-modifying code correct when a value is written into a decoded region.
+
+        Args:
+            address: The address that has been written to.
+        """
+        decoded_instructions = self.decoded_instructions
+        for instruction_address in range(address - MAXIMUM_INSTRUCTION_LENGTH + 1, address + 1):
+            decoded_instruction = decoded_instructions.get(instruction_address)
+            if decoded_instruction is not None and instruction_address + decoded_instruction.length > address:
+                del decoded_instructions[instruction_address]
+        if self.block_translator is not None:
+            self.block_translator.invalidate(address)
+
+    def invalidate_decoded_range(self, start: int, end: int) -> None:
+        """
+        Discards any decoded instruction or translated block that was decoded from a range of addresses.  A range
+        longer than the decoded instructions could cover is matched against them rather than probed address by
+        address.
+
+        Args:
+            start: The first address written to.
+            end: The address just past the last.
+        """
+        decoded_instructions = self.decoded_instructions
+        if (end - start) * MAXIMUM_INSTRUCTION_LENGTH <= len(decoded_instructions):
+            for address in range(start, end):
+                for instruction_address in range(address - MAXIMUM_INSTRUCTION_LENGTH + 1, address + 1):
+                    decoded_instruction = decoded_instructions.get(instruction_address)
+                    if decoded_instruction is not None and instruction_address + decoded_instruction.length > address:
+                        del decoded_instructions[instruction_address]
+        else:
+            for instruction_address in [instruction_address
+                                        for instruction_address, decoded_instruction in decoded_instructions.items()
+                                        if instruction_address < end
+                                        and instruction_address + decoded_instruction.length > start]:
+                del decoded_instructions[instruction_address]
+        if self.block_translator is not None:
+            self.block_translator.invalidate_range(start, end)
+
+    def handle_breakpoint(self, handler: Callable[..., None], *operands: int) -> None:
+        """
+        Executes an instruction at a breakpoint, after telling the breakpoint handler.  If the handler asks for the
+        machine to stop, the halt interrupt is raised instead and the instruction is left unexecuted.  It is also
+        left unexecuted if the handler moved the instruction pointer, as a debugger attached to the machine may.
+
+        Args:
+            handler: The handler of the instruction at the breakpoint.
+            operands: The operands of the instruction.
+        """
+        address = self.instruction_pointer
+        stop = self.breakpoint_handler is not None and self.breakpoint_handler(self)
+        if stop or self.instruction_pointer != address:
+            self.instructions_retired -= 1  # the caller counts the instruction as retired
+            if stop:
+                self.raise_halt_interrupt()
+            return
+        handler(*operands)
+
+    def handle_nop(self) -> None:
+        """
+        NOP: does nothing.
+        """
+        self.instruction_pointer += 1
+
+    def handle_lr(self, destination_register: int, value: int) -> None:
+        """
+        LR: loads a register with a value.
+        """
+        self.registers[destination_register] = value
+        self.instruction_pointer += 3
+
+    def handle_lrm(self, destination_register: int, address: int) -> None:
+        """
+        LRM: loads a register with the value at a memory address.
+        """
+        self.registers[destination_register] = self.get_value_from_address(
+            self.convert_register_pointer_if_necessary(address), cacheable=True)
+        self.instruction_pointer += 3
+
+    def handle_lrr(self, destination_register: int, source_register: int) -> None:
+        """
+        LRR: loads a register with the value of another register.
+        """
+        self.registers[destination_register] = self.registers[source_register]
+        self.instruction_pointer += 3
+
+    def handle_mrm(self, source_register: int, address: int) -> None:
+        """
+        MRM: moves the value of a register to a memory address.
+        """
+        self.send_value_to_address(self.convert_register_pointer_if_necessary(address),
+                                   self.registers[source_register], cacheable=False)
+        self.instruction_pointer += 3
+
+    def handle_tas(self, destination_register: int, address: int) -> None:
+        """
+        TAS: atomically loads a register with the value at a memory address and sets the address to 1 if it was 0.
+        """
+        address = self.convert_register_pointer_if_necessary(address)
+        if self.arbiter is not None:
+            with self.arbiter:
+                self.test_and_set(destination_register, address)
+        else:
+            self.test_and_set(destination_register, address)
+        self.instruction_pointer += 3
+
+    def test_and_set(self, destination_register: int, address: int) -> None:
+        """
+        Performs the read-modify-write of TAS.  The caller holds the bus arbiter if there is one.
+
+        Args:
+            destination_register: The register that receives the value read.
+            address: The address to test and set.
+        """
+        value = self.memory_map.read(address)
+        self.registers[destination_register] = value
+        if value == 0:
+            self.send_value_to_address(address, 1, cacheable=False)
+
+    def handle_cas(self, address: int) -> None:
+        """
+        CAS: atomically compares the value at a memory address with register 1, and stores register 2 there if
+        they are equal.
+        """
+        address = self.convert_register_pointer_if_necessary(address)
+        if self.arbiter is not None:
+            with self.arbiter:
+                self.compare_and_swap(address)
+        else:
+            self.compare_and_swap(address)
+        self.instruction_pointer += 2
+
+    def compare_and_swap(self, address: int) -> None:
+        """
+        Performs the read-modify-write of CAS.  The caller holds the bus arbiter if there is one.
+        Sets the compare result to Equal if the swap was made; otherwise loads register 1 with the value found and
+        sets the compare result to LessThan or GreaterThan as that value compares with the expected one.
+
+        Args:
+            address: The address to compare and swap.
+        """
+        value = self.memory_map.read(address)
+        expected_value = self.registers[1]
+        if value == expected_value:
+            self.send_value_to_address(address, self.registers[2], cacheable=False)
+            self.compare_result = CompareResults.Equal
+        else:
+            self.registers[1] = value
+            self.compare_result = CompareResults.LessThan if value < expected_value else CompareResults.GreaterThan
+
+    def handle_bmov(self, source_register: int, destination_register: int, count_register: int) -> None:
+        """
+        BMOV: copies a block of words from the address in one register to the address in another.  The number of
+        words is taken from a third register.  The blocks may overlap.
+        """
+        count = self.registers[count_register]
+        if count > 0:
+            if self.arbiter is not None:
+                with self.arbiter:
+                    self.send_block_to_address(self.registers[destination_register],
+                                               self.memory_map.read_block(self.registers[source_register], count))
+            else:
+                self.send_block_to_address(self.registers[destination_register],
+                                           self.memory_map.read_block(self.registers[source_register], count))
+        self.instruction_pointer += 4
+
+    def handle_bfill(self, destination_register: int, count_register: int, value_register: int) -> None:
+        """
+        BFILL: fills a block of words, starting at the address in one register, with the value of another register.
+        The number of words is taken from a third register.
+        """
+        count = self.registers[count_register]
+        if count > 0:
+            values = [self.registers[value_register]] * count
+            if self.arbiter is not None:
+                with self.arbiter:
+                    self.send_block_to_address(self.registers[destination_register], values)
+            else:
+                self.send_block_to_address(self.registers[destination_register], values)
+        self.instruction_pointer += 4
+
+    def handle_bcmp(self, first_register: int, second_register: int, count_register: int) -> None:
+        """
+        BCMP: compares the blocks of words at the addresses in two registers.  The number of words is taken from a
+        third register.  The compare result is set to Equal if the blocks are the same; otherwise it is set to
+        LessThan or GreaterThan as the first differing word of the first block compares with the second's.
+        """
+        count = self.registers[count_register]
+        first_block = self.memory_map.read_block(self.registers[first_register], max(count, 0))
+        second_block = self.memory_map.read_block(self.registers[second_register], max(count, 0))
+        if first_block < second_block:
+            self.compare_result = CompareResults.LessThan
+        elif first_block > second_block:
+            self.compare_result = CompareResults.GreaterThan
+        else:
+            self.compare_result = CompareResults.Equal
+        self.instruction_pointer += 4
+
+    def handle_outs(self, pointer_register: int, address: int) -> None:
+        """
+        OUTS: moves each word of the zero-terminated string at the address in a register to a single memory
+        address, such as a console's output address.  The register is left pointing at the terminating zero.
+        """
+        address = self.convert_register_pointer_if_necessary(address)
+        if self.arbiter is not None:
+            with self.arbiter:
+                self.output_string(pointer_register, address)
+        else:
+            self.output_string(pointer_register, address)
+        self.instruction_pointer += 3
+
+    def output_string(self, pointer_register: int, address: int) -> None:
+        """
+        Performs the writes of OUTS.  The caller holds the bus arbiter if there is one, so that a string isn't
+        interleaved with the output of other processors.
+
+        Args:
+            pointer_register: The register holding the address of the string.
+            address: The address each word of the string is moved to.
+        """
+        pointer = self.registers[pointer_register]
+        value = self.get_value_from_address(pointer, cacheable=True)
+        while value != 0:
+            self.send_value_to_address(address, value, cacheable=False)
+            pointer += 1
+            value = self.get_value_from_address(pointer, cacheable=True)
+        self.registers[pointer_register] = pointer
+
+    def handle_add(self) -> None:
+        """
+        ADD: adds registers 1 and 2 into register 3.
+        """
+        self.registers[3] = self.registers[1] + self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_sub(self) -> None:
+        """
+        SUB: subtracts register 2 from register 1 into register 3.
+        """
+        self.registers[3] = self.registers[1] - self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_mul(self) -> None:
+        """
+        MUL: multiplies registers 1 and 2 into register 3.
+        """
+        self.registers[3] = self.registers[1] * self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_div(self) -> None:
+        """
+        DIV: divides register 1 by register 2, with the quotient in register 3 and the remainder in register 4.
+        """
+        self.registers[3] = self.registers[1] // self.registers[2]
+        self.registers[4] = self.registers[1] % self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_halt(self) -> None:
+        """
+        HALT: raises the halt interrupt.
+        """
+        self.raise_halt_interrupt()
+        self.instruction_pointer += 1
+
+    def handle_debug(self) -> None:
+        """
+        DEBUG: prints the registers.
+        """
+        print(f"Processor: Debug instruction encountered at {datetime.now().strftime('%H:%M:%S')}")
+        print("Current registers:")
+        print(self.registers)
+        self.instruction_pointer += 1
+
+    def handle_jmp(self, address: int) -> None:
+        """
+        JMP: jumps to an address.
+        """
+        self.instruction_pointer = self.convert_register_pointer_if_necessary(address)
+
+    def handle_rst(self) -> None:
+        """
+        RST: resets the processor.
+        """
+        self.reset_processor()
+
+    def handle_cmp(self) -> None:
+        """
+        CMP: compares registers 1 and 2.
+        """
+        self.perform_register_compare()
+        self.instruction_pointer += 1
+
+    def handle_je(self, address: int) -> None:
+        """
+        JE: jumps to an address if the last compare was equal.
+        """
+        if self.compare_result == CompareResults.Equal:
+            self.instruction_pointer = self.convert_register_pointer_if_necessary(address)
+        else:
+            self.instruction_pointer += 2
+
+    def handle_jne(self, address: int) -> None:
+        """
+        JNE: jumps to an address if the last compare was not equal.
+        """
+        if self.compare_result != CompareResults.Equal:
+            self.instruction_pointer = self.convert_register_pointer_if_necessary(address)
+        else:
+            self.instruction_pointer += 2
+
+    def handle_jl(self, address: int) -> None:
+        """
+        JL: jumps to an address if the last compare was less-than.
+        """
+        if self.compare_result == CompareResults.LessThan:
+            self.instruction_pointer = self.convert_register_pointer_if_necessary(address)
+        else:
+            self.instruction_pointer += 2
+
+    def handle_jg(self, address: int) -> None:
+        """
+        JG: jumps to an address if the last compare was greater-than.
+        """
+        if self.compare_result == CompareResults.GreaterThan:
+            self.instruction_pointer = self.convert_register_pointer_if_necessary(address)
+        else:
+            self.instruction_pointer += 2
+
+    def handle_push(self, source_register: int) -> None:
+        """
+        PUSH: pushes a register onto the user stack.
+        """
+        self.user_stack.append(self.registers[source_register])
+        self.instruction_pointer += 2
+
+    def handle_pop(self, destination_register: int) -> None:
+        """
+        POP: pops the user stack into a register.
+        """
+        self.registers[destination_register] = self.user_stack.pop()
+        self.instruction_pointer += 2
+
+    def handle_call(self, address: int) -> None:
+        """
+        CALL: saves the registers and return address, then jumps to an address.
+        """
+        if address < 0:
+            address = self.registers[-address]
+        self.instruction_pointer += 2  # address of next instruction after call
+        self.execute_call(address)
+
+    def handle_rtn(self) -> None:
+        """
+        RTN: restores the registers and returns to the saved return address.
+        """
+        self.instruction_pointer = self.instruction_pointer_stack.pop()
+        self.register_stack_depth -= 1
+        self.registers[:] = self.register_stack[self.register_stack_depth]
+        if not self.instruction_pointer_stack:
+            self.sleeping = self.sleep_mode
+        if self.handling_interrupt:
+            # we remembered how deep into the instruction pointer stack we were when the interrupt was raised.
+            # if we are back to that point, the interrupt has been handled. we can now handle another
+            # interrupt by clearing the handling_interrupt flag
+            if self.interrupt_instruction_pointer_stack_depth == len(self.instruction_pointer_stack):
+                self.handling_interrupt = False
+
+    def handle_not(self) -> None:
+        """
+        NOT: bitwise NOT of register 1 into register 3.
+        """
+        self.registers[3] = ~self.registers[1]
+        self.instruction_pointer += 1
+
+    def handle_or(self) -> None:
+        """
+        OR: bitwise OR of registers 1 and 2 into register 3.
+        """
+        self.registers[3] = self.registers[1] | self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_and(self) -> None:
+        """
+        AND: bitwise AND of registers 1 and 2 into register 3.
+        """
+        self.registers[3] = self.registers[1] & self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_xor(self) -> None:
+        """
+        XOR: bitwise XOR of registers 1 and 2 into register 3.
+        """
+        self.registers[3] = self.registers[1] ^ self.registers[2]
+        self.instruction_pointer += 1
+
+    def handle_siv(self, interrupt_number: int, address: int) -> None:
+        """
+        SIV: sets the vector address for an interrupt, so that the processor accepts it.
+        """
+        InterruptBus.check_interrupt_number(interrupt_number)
+        self.interrupt_vectors[interrupt_number] = self.convert_register_pointer_if_necessary(address)
+        self.update_accepted_interrupts()
+        self.instruction_pointer += 3
+
+    def handle_inc(self, destination_register: int) -> None:
+        """
+        INC: increments a register.
+        """
+        self.registers[destination_register] += 1
+        self.instruction_pointer += 2
+
+    def handle_dec(self, destination_register: int) -> None:
+        """
+        DEC: decrements a register.
+        """
+        self.registers[destination_register] -= 1
+        self.instruction_pointer += 2
+
+    def handle_sleep(self) -> None:
+        """
+        SLEEP: stops processing instructions until an interrupt is handled.
+        """
+        self.sleep_mode = True
+        self.sleeping = True
+        self.instruction_pointer += 1
+
+    def handle_wake(self) -> None:
+        """
+        WAKE: cancels a previous SLEEP.
+        """
+        self.sleep_mode = False
+        self.sleeping = False
+        self.instruction_pointer += 1
+
+    def handle_peek(self, destination_register: int) -> None:
+        """
+        PEEK: copies the top of the user stack into a register.
+        """
+        self.registers[destination_register] = self.user_stack[-1]
+        self.instruction_pointer += 2
+
+    def handle_int(self, interrupt_number: int) -> None:
+        """
+        INT: raises an interrupt.  A negative interrupt number stops the processor with an error before the bus is
+        locked.
+        """
+        InterruptBus.check_interrupt_number(interrupt_number)
+        self.processor_raised_interrupt = interrupt_number
         self.control_bus.lock_bus()
-        self.control_bus.response = False
+        self.interrupt_bus.set_interrupt(interrupt_number)
         self.control_bus.unlock_bus()
+        self.instruction_pointer += 2
 
-    def perform_instruction_processing(self) -> None:
+    def handle_di(self, interrupt_number: int) -> None:
         """
-        Processes instructions based on the current instruction pointer and modifies registers, memory, or control flow accordingly.
-        """
-        instruction = self.get_value_from_address(
-            self.instruction_pointer, cacheable=True)
-
-        self.last_instruction = instruction
-
-        match instruction:
-            case InstructionSet.NOP:
-                self.instruction_pointer += 1
-            case InstructionSet.LR:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                value: int = self.get_value_from_address(
-                    self.instruction_pointer + 2, cacheable=True)
-                self.registers[destination_register] = value
-                self.instruction_pointer += 3
-            case InstructionSet.LRM:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                value: int = self.get_value_from_address(
-                    self.convert_register_pointer_if_necessary(
-                        self.get_value_from_address(self.instruction_pointer + 2, cacheable=False)), cacheable=False)
-                self.registers[destination_register] = value
-                self.instruction_pointer += 3
-            case InstructionSet.LRR:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                source_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 2, cacheable=True)
-                self.registers[destination_register] = self.registers[source_register]
-                self.instruction_pointer += 3
-            case InstructionSet.MRM:
-                source_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                address = self.convert_register_pointer_if_necessary(
-                    self.get_value_from_address(
-                        self.instruction_pointer + 2, cacheable=True))
-                self.send_value_to_address(address, self.registers[source_register], cacheable=False)
-                self.instruction_pointer += 3
-            case InstructionSet.ADD:
-                self.registers[3] = self.registers[1] + self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.SUB:
-                self.registers[3] = self.registers[1] - self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.MUL:
-                self.registers[3] = self.registers[1] * self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.DIV:
-                self.registers[3] = self.registers[1] // self.registers[2]
-                self.registers[4] = self.registers[1] % self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.HALT:
-                self.control_bus.lock_bus()
-                self.interrupt_bus.set_interrupt(Interrupts.halt)
-                self.control_bus.unlock_bus()
-                self.instruction_pointer += 1
-            case InstructionSet.DEBUG:
-                print(f"Processor: Debug instruction encountered at {datetime.now().strftime('%H:%M:%S')}")
-                print("Current registers:")
-                print(self.registers)
-                self.instruction_pointer += 1
-            case InstructionSet.JMP:
-                destination_address: int = self.convert_register_pointer_if_necessary(
-                    self.get_value_from_address(self.instruction_pointer + 1, cacheable=True))
-                self.instruction_pointer = destination_address
-            case InstructionSet.RST:
-                self.reset_processor()
-            case InstructionSet.CMP:
-                self.perform_register_compare()
-                self.instruction_pointer += 1
-            case InstructionSet.JE:
-                if self.compare_result == CompareResults.Equal:
-                    destination_address: int = self.convert_register_pointer_if_necessary(
-                        self.get_value_from_address(
-                            self.instruction_pointer + 1, cacheable=True))
-                    self.instruction_pointer = destination_address
-                else:
-                    self.instruction_pointer += 2
-            case InstructionSet.JNE:
-                if self.compare_result != CompareResults.Equal:
-                    destination_address: int = self.convert_register_pointer_if_necessary(
-                        self.get_value_from_address(
-                            self.instruction_pointer + 1, cacheable=True))
-                    self.instruction_pointer = destination_address
-                else:
-                    self.instruction_pointer += 2
-            case InstructionSet.JL:
-                if self.compare_result == CompareResults.LessThan:
-                    destination_address: int = self.convert_register_pointer_if_necessary(
-                        self.get_value_from_address(
-                            self.instruction_pointer + 1, cacheable=True))
-                    self.instruction_pointer = destination_address
-                else:
-                    self.instruction_pointer += 2
-            case InstructionSet.JG:
-                if self.compare_result == CompareResults.GreaterThan:
-                    destination_address: int = self.convert_register_pointer_if_necessary(
-                        self.get_value_from_address(
-                            self.instruction_pointer + 1, cacheable=True))
-                    self.instruction_pointer = destination_address
-                else:
-                    self.instruction_pointer += 2
-            case InstructionSet.PUSH:
-                source_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.user_stack.append(self.registers[source_register])
-                self.instruction_pointer += 2
-            case InstructionSet.POP:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.registers[destination_register] = self.user_stack.pop()
-                self.instruction_pointer += 2
-            case InstructionSet.CALL:
-                destination_address: int = self.convert_register_pointer_if_necessary(
-                    self.get_value_from_address(self.instruction_pointer + 1, cacheable=True))
-                self.instruction_pointer += 2  # address of next instruction after call
-                self.execute_call(destination_address)
-            case InstructionSet.RTN:
-                self.registers = self.register_stack.pop()
-                self.instruction_pointer = self.instruction_pointer_stack.pop()
-                if len(self.instruction_pointer_stack) == 0:
-                    self.sleeping = self.sleep_mode
-                if self.handling_interrupt:
-                    # we remembered how deep into the instruction pointer stack we were when the interrupt was raised.
-                    # if we are back to that point, the interrupt has been handled. we can now handle another
-                    # interrupt by clearing the handling_interrupt flag
-                    if self.interrupt_instruction_pointer_stack_depth == len(self.instruction_pointer_stack):
-                        self.handling_interrupt = False
-            case InstructionSet.NOT:
-                self.registers[3] = ~self.registers[1]
-                self.instruction_pointer += 1
-            case InstructionSet.OR:
-                self.registers[3] = self.registers[1] | self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.AND:
-                self.registers[3] = self.registers[1] & self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.XOR:
-                self.registers[3] = self.registers[1] ^ self.registers[2]
-                self.instruction_pointer += 1
-            case InstructionSet.SIV:
-                interrupt_number: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                destination_address: int = self.convert_register_pointer_if_necessary(
-                    self.get_value_from_address(
-                        self.instruction_pointer + 2, cacheable=True))
-                self.interrupt_vectors[interrupt_number] = destination_address
-                self.instruction_pointer += 3
-            case InstructionSet.INC:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.registers[destination_register] += 1
-                self.instruction_pointer += 2
-            case InstructionSet.DEC:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.registers[destination_register] -= 1
-                self.instruction_pointer += 2
-            case InstructionSet.SLEEP:
-                self.sleep_mode = True
-                self.sleeping = True
-                self.instruction_pointer += 1
-            case InstructionSet.WAKE:
-                self.sleep_mode = False
-                self.sleeping = False
-                self.instruction_pointer += 1
-            case InstructionSet.PEEK:
-                destination_register: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.registers[destination_register] = self.user_stack[-1]
-                self.instruction_pointer += 2
-            case InstructionSet.INT:
-                interrupt_number: int = self.get_value_from_address(
-                    self.instruction_pointer + 1, cacheable=True)
-                self.processor_raised_interrupt = interrupt_number
-                self.interrupt_bus.set_interrupt(interrupt_number)
-                self.instruction_pointer += 2
-            case InstructionSet.ASSERT_EMPTY_USER_STACK:
-                self.instruction_pointer += 1
-                if len(self.user_stack) != 0:
-                    self.control_bus.lock_bus()
-                    self.interrupt_bus.set_interrupt(Interrupts.stack_assertion)
-                    self.control_bus.unlock_bus()
-
-            case _:
-                # Raise an error for unknown instruction
-                raise ValueError(
-                    f"Unknown instruction encountered at address {self.instruction_pointer}. Opcode is {instruction}")
+        DI: disables an interrupt.  It stays pending on the bus until the processor enables it again.
+        """
+        InterruptBus.check_interrupt_number(interrupt_number)
+        self.interrupt_enable_mask &= ~(1 << interrupt_number)
+        self.update_accepted_interrupts()
+        self.instruction_pointer += 2
+
+    def handle_ei(self, interrupt_number: int) -> None:
+        """
+        EI: enables an interrupt disabled by DI.
+        """
+        InterruptBus.check_interrupt_number(interrupt_number)
+        self.interrupt_enable_mask |= 1 << interrupt_number
+        self.update_accepted_interrupts()
+        self.instruction_pointer += 2
+
+    def handle_assert_empty_user_stack(self) -> None:
+        """
+        ASSERT_EMPTY_USER_STACK: raises the stack assertion interrupt if the user stack is not empty.
+        If halt_on_unhandled_stack_assertion is set and no vector handles the interrupt, the machine is halted too.
+        """
+        self.instruction_pointer += 1
+        if len(self.user_stack) != 0:
+            self.control_bus.lock_bus()
+            self.interrupt_bus.set_interrupt(Interrupts.stack_assertion)
+            self.control_bus.unlock_bus()
+            if self.halt_on_unhandled_stack_assertion and Interrupts.stack_assertion not in self.interrupt_vectors:
+                self.raise_halt_interrupt()
 
     def perform_register_compare(self):
         """
@@ -368,29 +1008,41 @@ class Processor(BaseProcessor):
     def execute_call(self, destination_address):
         """
         Executes a call by saving the current state and jumping to the destination address.
+        The registers are copied into the next frame of the register stack, which is only allocated the first time
+        the stack reaches that depth.
 
         Args:
             destination_address: The address to jump to for execution.
         """
-        self.register_stack.append(self.registers.copy())
+        depth = self.register_stack_depth
+        if depth < len(self.register_stack):
+            self.register_stack[depth][:] = self.registers
+        else:
+            self.register_stack.append(self.registers.copy())
+        self.register_stack_depth = depth + 1
         self.instruction_pointer_stack.append(self.instruction_pointer)
         self.instruction_pointer = destination_address
 
     def process_interrupts(self):
         """
         Handles pending interrupts by locking the control bus, checking for awaiting interrupts, and executing the appropriate service routine if a valid interrupt is found.
+        Only the interrupts the processor accepts (those routed to it, enabled and with a vector) are considered.
         """
         if not self.handling_interrupt:
             self.control_bus.lock_bus()
-            interrupt_number = self.interrupt_bus.interrupt_awaiting()
-            self.control_bus.unlock_bus()
-            if interrupt_number in self.interrupt_vectors:
+            interrupt_number = self.interrupt_bus.interrupt_awaiting(self.accepted_interrupts)
+            vectored = interrupt_number in self.interrupt_vectors
+            if vectored:
+                # claimed under the lock, so only one processor services the interrupt
                 self.interrupt_bus.clear_interrupt(interrupt_number)
+            self.control_bus.unlock_bus()
+            if vectored:
                 if interrupt_number == self.processor_raised_interrupt:
                     self.processor_raised_interrupt = 0
                 destination_address = self.interrupt_vectors[interrupt_number]
                 self.sleeping = False
                 self.handling_interrupt = True
+                self.interrupts_serviced += 1
                 self.interrupt_instruction_pointer_stack_depth = len(self.instruction_pointer_stack)
                 self.execute_call(destination_address)
 
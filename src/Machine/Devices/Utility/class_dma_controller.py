@@ -0,0 +1,170 @@
+import threading
+from typing import List
+
+from Constants.class_dma_modes import DMAModes
+from Machine.Buses.class_address_bus import AddressBus
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_data_bus import DataBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+
+
+class DMAController(BaseDevice):
+    """
+    A class used to represent a DMA (direct memory access) controller device.
+    The controller copies or fills blocks of memory through the backplane's memory map, a block at a time for
+    memory that supports direct access, instead of the processor moving each word with LRM and MRM.
+    Transfers run in burst mode: a transfer is complete by the time the write that started it returns, and the
+    completion interrupt is then pending.  Cached copies of the destination in every processor are invalidated.
+    """
+
+    # address map
+    # address = source address (the fill value in fill mode)
+    # address + 1 = destination address
+    # address + 2 = length in words
+    # address + 3 = mode (writing copy or fill starts the transfer; reads idle when it is complete)
+
+    SOURCE_REGISTER = 0
+    DESTINATION_REGISTER = 1
+    LENGTH_REGISTER = 2
+    MODE_REGISTER = 3
+
+    def start(self) -> None:
+        """
+        This method starts the DMA controller device.
+        Returns:
+
+        """
+        threading.Thread(target=self.process_buses, name=self.device_id + "::process_buses").start()
+
+    def __init__(self, starting_address: int, interrupt: int, address_bus: AddressBus, data_bus: DataBus,
+                 control_bus: ControlBus, interrupt_bus: InterruptBus):
+        """
+        Constructs all the necessary attributes for the DMA controller device.
+
+        Parameters:
+            starting_address (int): The starting address of the DMA controller's registers.
+            interrupt (int): The interrupt raised when a transfer completes, or 0 to raise none.
+        """
+        size = 4
+        super().__init__(starting_address, size, address_bus, data_bus, control_bus, interrupt_bus)
+        self.completion_interrupt = InterruptBus.check_interrupt_number(interrupt)
+        self.memory_map = None  # set by the backplane
+        self.processors = []  # set by the backplane, so that their caches can be invalidated
+        self.__registers: List[int] = [0] * size
+        self.__transfers: int = 0
+        self.__wordsTransferred: int = 0
+
+    @property
+    def registers(self) -> List[int]:
+        """
+        This method returns the registers of the DMA controller device.
+        :return: The source, destination, length and mode registers.
+        """
+        return self.__registers
+
+    @property
+    def transfers(self) -> int:
+        """
+        This method returns the number of transfers completed since the machine was built.
+        :return: The number of transfers.
+        """
+        return self.__transfers
+
+    @property
+    def words_transferred(self) -> int:
+        """
+        This method returns the number of words written by the transfers completed since the machine was built.
+        :return: The number of words.
+        """
+        return self.__wordsTransferred
+
+    @property
+    def supports_direct_access(self) -> bool:
+        """
+        The DMA controller's registers can be read and written directly through the backplane's memory map.
+        """
+        return True
+
+    def read(self, address: int) -> int:
+        """
+        Reads a register of the DMA controller device without using the buses.
+        :param address: The address to read from.
+        :return: The value of the register.
+        """
+        return self.__registers[address - self.starting_address]
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a register of the DMA controller device without using the buses.  Writing copy or fill to the mode
+        register performs the transfer.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        register = address - self.starting_address
+        if register != self.MODE_REGISTER:
+            self.__registers[register] = value
+        elif value in (DMAModes.copy, DMAModes.fill):
+            self.__registers[register] = value
+            self.transfer()
+            self.control_bus.lock_bus()
+            self.raise_completion_interrupt()
+            self.control_bus.unlock_bus()
+
+    def transfer(self) -> None:
+        """
+        Performs the transfer described by the registers, then sets the mode register back to idle.
+        """
+        source, destination, length, mode = self.__registers
+        if length > 0:
+            if mode == DMAModes.copy:
+                values = self.memory_map.read_block(source, length)
+            else:
+                values = [source] * length
+            self.memory_map.write_block(destination, values)
+            for processor in self.processors:
+                processor.pending_invalidations.append((destination, destination + length))
+            self.__wordsTransferred += length
+        self.__transfers += 1
+        self.__registers[self.MODE_REGISTER] = DMAModes.idle
+
+    def raise_completion_interrupt(self) -> None:
+        """
+        Raises the completion interrupt, if there is one.  The bus must be locked.
+        """
+        if self.completion_interrupt > 0:
+            self.interrupt_bus.set_interrupt(self.completion_interrupt)
+            self.control_bus.signal_bus()
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the registers of the DMA controller device to a machine snapshot.
+        :param writer: The writer to pack the state into.
+        """
+        writer.write_ints(self.__registers)
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the registers of the DMA controller device from a machine snapshot.
+        :param reader: The reader to unpack the state from.
+        """
+        self.__registers[:] = reader.read_ints()
+
+    def process_buses(self) -> None:
+        self.main_loop()
+        self.finished = True
+
+    def main_loop(self) -> None:
+        """
+        The main loop of the DMA controller device.  The registers are always reached directly through the memory
+        map, never by a handshake on the buses, so this only waits for the machine to halt.
+        Returns:
+
+        """
+        while self.running:
+            self.control_bus.lock_bus()
+            self.stop_running_if_halt_detected()
+            if self.control_bus.power_on:
+                self.control_bus.wait_for_bus_activity(BUS_IDLE_TIMEOUT)
+            self.control_bus.unlock_bus()
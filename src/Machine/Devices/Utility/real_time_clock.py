@@ -6,7 +6,8 @@ from Machine.Buses.class_address_bus import AddressBus
 from Machine.Buses.class_control_bus import ControlBus
 from Machine.Buses.class_data_bus import DataBus
 from Machine.Buses.class_interrupt_bus import InterruptBus
-from Machine.Devices.Bases.class_base_device import BaseDevice
+from Machine.Devices.Bases.class_base_device import BaseDevice, BUS_IDLE_TIMEOUT
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
 
 
 class RTC(BaseDevice):
@@ -45,8 +46,9 @@ class RTC(BaseDevice):
         import time
         self._last_checked_time = time.time() * 1000  # Initialize with the current time in milliseconds
         size = 8
-        self.interval_interrupt = interrupt
+        self.interval_interrupt = InterruptBus.check_interrupt_number(interrupt)
         self.interval_milliseconds = 1000
+        self.input_log = None  # set by the backplane when time travel is enabled
         super().__init__(starting_address, size, address_bus, data_bus, control_bus, interrupt_bus)
         self.__memory: List[int] = [0] * size
 
@@ -66,13 +68,54 @@ class RTC(BaseDevice):
         """
         self.__memory = value
 
+    @property
+    def supports_direct_access(self) -> bool:
+        """
+        The RTC device can be read and written directly through the backplane's memory map.
+        """
+        return True
+
+    def read(self, address: int) -> int:
+        """
+        Reads a value from the RTC device without using the buses.
+        :param address: The address to read from.
+        :return: The value at the address.
+        """
+        return self.__memory[address - self.starting_address]
+
+    def write(self, address: int, value: int) -> None:
+        """
+        Writes a value to the RTC device without using the buses.
+        :param address: The address to write to.
+        :param value: The value to write.
+        """
+        self.__memory[address - self.starting_address] = value
+
+    def save_state(self, writer: StateWriter) -> None:
+        """
+        Writes the registers and interval of the RTC device to a machine snapshot.
+        The date and time registers are refreshed from the host clock once the machine runs again.
+        :param writer: The writer to pack the state into.
+        """
+        writer.write_ints(self.__memory)
+        writer.write_int(self.interval_milliseconds)
+
+    def restore_state(self, reader: StateReader) -> None:
+        """
+        Restores the registers and interval of the RTC device from a machine snapshot.
+        :param reader: The reader to unpack the state from.
+        """
+        self.__memory[:] = reader.read_ints()
+        self.interval_milliseconds = reader.read_int()
+
     def process_buses(self) -> None:
         self.main_loop()
         self.finished = True
 
     def main_loop(self) -> None:
         """
-        The main loop of the RTC device.  This runs continuously to monitor for read and write requests.
+        The main loop of the RTC device.  This waits for bus activity and services read and write requests,
+        waking in time to raise the interval interrupt.
         Returns:
 
         """
@@ -80,21 +123,45 @@ class RTC(BaseDevice):
             self.control_bus.lock_bus()
             self.stop_running_if_halt_detected()
             if self.control_bus.power_on:
-                if self.address_is_valid(self.address_bus):
-                    if self.control_bus.read_request:
-                        self.data_bus.data = self.__memory[self.address_bus.address - self.starting_address]
-                        self.control_bus.read_request = False
-                        self.control_bus.response = True
-                    if self.control_bus.write_request:
-                        self.__memory[self.address_bus.address - self.starting_address] = (
-                            self.data_bus.data)
-                        self.control_bus.write_request = False
-                        self.control_bus.response = True
-
-            # Add call to check_interval
-            self.check_interval()
+                self.service()
+                self.control_bus.wait_for_bus_activity(self.seconds_until_next_interval())
             self.control_bus.unlock_bus()
 
+    def idle_timeout(self) -> float | None:
+        """
+        Under the asyncio runtime, the RTC device sleeps until its next interval is due.
+        """
+        return self.seconds_until_next_interval()
+
+    def service(self) -> None:
+        """
+        Services a read or write request addressed to the RTC device, and raises the interval interrupt when it
+        is due.  The bus must be locked.
+        """
+        if self.address_is_valid(self.address_bus):
+            if self.control_bus.read_request:
+                self.data_bus.data = self.__memory[self.address_bus.address - self.starting_address]
+                self.control_bus.read_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
+            if self.control_bus.write_request:
+                self.__memory[self.address_bus.address - self.starting_address] = (
+                    self.data_bus.data)
+                self.control_bus.write_request = False
+                self.control_bus.response = True
+                self.control_bus.signal_bus()
+
+        self.check_interval()
+
+    def seconds_until_next_interval(self) -> float:
+        """
+        This method returns how long the device may wait for bus activity before the next interval is due.
+        :return: The number of seconds until the next interval, capped at the bus idle timeout.
+        """
+        import time
+        remaining_milliseconds = self._last_checked_time + self.interval_milliseconds - time.time() * 1000
+        return min(max(remaining_milliseconds / 1000, 0), BUS_IDLE_TIMEOUT)
+
     @staticmethod
     def compute_current_datetime(utc_offset: float) -> dict:
         """
@@ -119,28 +186,39 @@ class RTC(BaseDevice):
         }
 
     def check_interval(self) -> None:
+        """
+        This method sets the date and time registers and raises the interval interrupt when the interval has
+        elapsed.  When time travel is enabled the host clock is read through the input log, so that a replay sees
+        the same readings at the same points.
+        """
+        if self.input_log is None:
+            reading = self.read_clock()
+        else:
+            reading = self.input_log.sample(self.device_id, self.read_clock)
+        if reading:
+            # Set memory values for the current Date & Time
+            self.memory[2:8] = reading
+            # Trigger the interrupt
+            self.interrupt_bus.set_interrupt(self.interval_interrupt)
+
+    def read_clock(self) -> List[int]:
         """
         This method checks if the specified interval in milliseconds has elapsed
-        and performs actions if required. 
+        and, if so, reads the date and time from the host clock.
+        :return: The year, month, day, hour, minute and second, or an empty list if the interval hasn't elapsed or
+        the device raises no interval interrupt.
         """
         import time
         current_time = time.time() * 1000  # Convert current time to milliseconds
         if not hasattr(self, "_last_checked_time"):
             self._last_checked_time = current_time  # Initialize last checked time
+        reading = []
         if current_time - self._last_checked_time >= self.interval_milliseconds:
-            # Perform the work here
             if self.interval_interrupt >= 0:
                 utc_offset = self.memory[0] + self.memory[1] / 100
                 current_datetime = self.compute_current_datetime(utc_offset)
-                # Set memory values for the current Date & Time
-                self.memory[2] = current_datetime["year"]
-                self.memory[3] = current_datetime["month"]
-                self.memory[4] = current_datetime["day"]
-                self.memory[5] = current_datetime["hour"]
-                self.memory[6] = current_datetime["minute"]
-                self.memory[7] = current_datetime["second"]
-
-                # Trigger the interrupt
-                self.interrupt_bus.set_interrupt(self.interval_interrupt)
+                reading = [current_datetime["year"], current_datetime["month"], current_datetime["day"],
+                           current_datetime["hour"], current_datetime["minute"], current_datetime["second"]]
 
             self._last_checked_time = current_time  # Update last checked time
+        return reading
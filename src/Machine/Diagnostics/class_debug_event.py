@@ -0,0 +1,32 @@
+from typing import NamedTuple
+
+
+class DebugEvent(NamedTuple):
+    """
+    A breakpoint or watchpoint hit, recorded by the debugger.
+    """
+    kind: str
+    """
+    "breakpoint", "read" or "write".
+    """
+    address: int
+    """
+    The address of the breakpoint, or the address read or written.
+    """
+    value: int
+    """
+    The value read or written, or 0 for a breakpoint.
+    """
+    device_id: str | None
+    """
+    The device ID of the processor that hit the breakpoint or made the access, or None if the access can't be
+    attributed to one processor because the machine has several.
+    """
+    instruction_pointer: int
+    """
+    The processor's instruction pointer when the hit happened, or -1 if device_id is None.
+    """
+    instructions: int
+    """
+    The number of instructions the processor had retired when the hit happened, or 0 if device_id is None.
+    """
@@ -0,0 +1,473 @@
+import json
+import os
+import socket
+import stat
+import threading
+import time
+from functools import partial
+from typing import Callable, Dict, List, Set
+
+from Compiler.class_symbol_table import SymbolTable
+from Constants.class_interrupts import Interrupts
+from Machine.Backplane.class_memory_map import MemoryMap
+from Machine.Buses.class_control_bus import ControlBus
+from Machine.Buses.class_interrupt_bus import InterruptBus
+from Machine.Devices.Processors.class_processor import Processor
+from Machine.Diagnostics.class_debug_event import DebugEvent
+from Machine.Diagnostics.class_debugger import Debugger
+
+STOP_WAIT_SECONDS = 1.0
+"""
+How long a command that pauses or steps the machine waits for a processor to stop before replying.
+"""
+
+POLL_SECONDS = 0.1
+"""
+How often a paused processor checks whether the machine has been halted, and the server whether it is closing.
+"""
+
+
+class DebugServer:
+    """
+    The DebugServer class lets a debugger attach to a running machine, over a localhost TCP port or a Unix domain
+    socket, to halt and resume it, step it an instruction at a time, read and write registers and memory, set
+    breakpoints and look up labels.  One client is served at a time.  Each request is a JSON object on a line of
+    its own, with a "command" member, and is answered by a JSON object on a line, with "ok" false and an "error"
+    if the request failed.
+
+    Nothing is added to the machine's execution path until it is halted.  Halting replaces each processor's
+    execution method with a stop point, where the thread running the processor waits until the machine is
+    resumed or stepped; resuming puts the method back.  A breakpoint reached while a client is attached halts the
+    machine with the processor waiting before the instruction at the breakpoint.  When the client disconnects,
+    the breakpoints it set are removed and the machine is resumed.
+
+    Memory is read and written straight from the memory of the devices that support direct access, a block at a
+    time, and never over the buses.  Registers and memory can be read at any time, but only written while the
+    machine is halted and a processor has stopped.
+    """
+
+    def __init__(self, address: str, debugger: Debugger, processors: List[Processor], memory_map: MemoryMap,
+                 symbol_table: SymbolTable, control_bus: ControlBus, interrupt_bus: InterruptBus) -> None:
+        """
+        Constructor for the DebugServer class.
+        :param address: A port number to listen on localhost, or the pathname of a Unix domain socket.
+        :param debugger: The debugger that holds the machine's breakpoints.
+        :param processors: The processors of the machine.
+        :param memory_map: The memory map of the machine.
+        :param symbol_table: The labels of the programs compiled into the machine's memory.
+        :param control_bus: The control bus of the machine.
+        :param interrupt_bus: The interrupt bus of the machine.
+        """
+        self.__address = address
+        self.__debugger = debugger
+        self.__processors = processors
+        self.__memoryMap = memory_map
+        self.__symbolTable = symbol_table
+        self.__controlBus = control_bus
+        self.__interruptBus = interrupt_bus
+        self.__condition = threading.Condition()
+        self.__paused: bool = False
+        self.__stopped: Set[Processor] = set()  # the processors waiting at a stop point
+        self.__steps: Dict[Processor, int] = {}  # the instructions each processor may execute while paused
+        self.__stepping: Set[Processor] = set()  # the processors executing an instruction from a stop point
+        self.__clientBreakpoints: Set[int] = set()
+        self.__lastEvent: DebugEvent | None = None
+        self.__listener: socket.socket | None = None
+        self.__client: socket.socket | None = None
+        self.__running: bool = False
+        self.__commands: Dict[str, Callable[[dict], dict]] = {
+            "status": self.command_status,
+            "halt": self.command_halt,
+            "resume": self.command_resume,
+            "step": self.command_step,
+            "registers": self.command_registers,
+            "write_register": self.command_write_register,
+            "read_memory": self.command_read_memory,
+            "write_memory": self.command_write_memory,
+            "break": self.command_break,
+            "clear_break": self.command_clear_break,
+            "symbol": self.command_symbol,
+        }
+
+    @property
+    def paused(self) -> bool:
+        """
+        This property returns whether the machine has been halted by the debugger.
+        :return: True if the machine is halted.
+        """
+        return self.__paused
+
+    def start(self) -> None:
+        """
+        Starts listening for a client, on a thread of the server's own.
+        """
+        if self.__address.isdigit():
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(("127.0.0.1", int(self.__address)))
+        else:
+            # a socket left behind by an earlier run is replaced, but nothing else is
+            if os.path.exists(self.__address) and stat.S_ISSOCK(os.stat(self.__address).st_mode):
+                os.unlink(self.__address)
+            listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            listener.bind(self.__address)
+        listener.listen(1)
+        listener.settimeout(POLL_SECONDS)
+        self.__listener = listener
+        self.__running = True
+        self.__debugger.on_hit = self.handle_hit
+        threading.Thread(target=self.serve, name="DebugServer", daemon=True).start()
+        print(f"Debug server listening on {self.__address}.")
+
+    def stop(self) -> None:
+        """
+        Stops the server once the machine has stopped, disconnecting any client.
+        """
+        self.__running = False
+        self.__debugger.on_hit = None
+        if self.__client is not None:
+            try:
+                self.__client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        if self.__listener is not None:
+            self.__listener.close()
+            if not self.__address.isdigit() and os.path.exists(self.__address):
+                os.unlink(self.__address)
+        self.resume()
+
+    def serve(self) -> None:
+        """
+        Accepts clients one at a time and answers their requests until the server is stopped.
+        """
+        while self.__running:
+            try:
+                client, _ = self.__listener.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                break
+            client.settimeout(None)
+            self.__client = client
+            try:
+                with client, client.makefile('r') as reader, client.makefile('w') as writer:
+                    for line in reader:
+                        if not line.strip():
+                            continue
+                        writer.write(json.dumps(self.handle_request(line)) + "\n")
+                        writer.flush()
+            except OSError:
+                pass
+            finally:
+                self.__client = None
+                self.detach()
+
+    def detach(self) -> None:
+        """
+        Removes the breakpoints set by the client that has disconnected and resumes the machine.
+        """
+        breakpoints = self.__clientBreakpoints
+        self.__clientBreakpoints = set()
+        if breakpoints:
+            self.while_stopped(partial(self.remove_breakpoints, breakpoints))
+        self.resume()
+
+    def remove_breakpoints(self, breakpoints: Set[int]) -> None:
+        """
+        Removes breakpoints from the debugger.
+        :param breakpoints: The addresses of the breakpoints.
+        """
+        for address in breakpoints:
+            self.__debugger.remove_breakpoint(address)
+
+    def handle_request(self, line: str) -> dict:
+        """
+        Carries out a request.
+        :param line: The request, a JSON object.
+        :return: The reply.
+        """
+        try:
+            request = json.loads(line)
+            command = self.__commands.get(request.get("command")) if isinstance(request, dict) else None
+            if command is None:
+                raise ValueError(f"Unknown command in {line.strip()}.")
+            reply = command(request)
+        except (ValueError, KeyError, TypeError, IndexError) as error:
+            return {"ok": False, "error": str(error) if not isinstance(error, KeyError) else f"Missing {error}."}
+        reply["ok"] = True
+        return reply
+
+    def is_machine_halted(self) -> bool:
+        """
+        Checks whether the machine is stopping, so that a paused processor must stop waiting.
+        :return: True if power is off or the halt interrupt is raised.
+        """
+        return not self.__controlBus.power_on or bool(self.__interruptBus.pending & (1 << Interrupts.halt))
+
+    def pause(self) -> None:
+        """
+        Halts the machine: each processor stops at its next instruction.
+        """
+        with self.__condition:
+            if self.__paused:
+                return
+            self.__paused = True
+            for processor in self.__processors:
+                processor.process_instructions = partial(self.stop_point, processor)
+
+    def resume(self) -> None:
+        """
+        Resumes the machine, putting back each processor's execution method.
+        """
+        with self.__condition:
+            if not self.__paused:
+                return
+            self.__paused = False
+            self.__steps.clear()
+            for processor in self.__processors:
+                processor.select_engine(processor.engine)
+            self.__condition.notify_all()
+
+    def wait_until_stopped(self, processor: Processor | None = None, timeout: float = STOP_WAIT_SECONDS) -> bool:
+        """
+        Waits for a processor to stop and use up the steps it was given, while the machine is halted.
+        :param processor: The processor, or None to wait for any processor to stop.
+        :param timeout: The longest time to wait, in seconds.
+        :return: True if the processor stopped.
+        """
+        deadline = time.monotonic() + timeout
+        with self.__condition:
+            while self.__paused:
+                if processor is None and self.__stopped:
+                    return True
+                if processor is not None and processor in self.__stopped and not self.__steps.get(processor):
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or self.is_machine_halted():
+                    return False
+                self.__condition.wait(min(remaining, POLL_SECONDS))
+        return False
+
+    def wait(self, processor: Processor) -> bool:
+        """
+        Makes a processor wait at a stop point while the machine is halted.  This runs on the thread that runs the
+        processor.
+        :param processor: The processor.
+        :return: True if the processor was given a step, False if the machine was resumed or is stopping.
+        """
+        with self.__condition:
+            self.__stopped.add(processor)
+            self.__condition.notify_all()
+            try:
+                while self.__paused and not self.__steps.get(processor) and not self.is_machine_halted():
+                    self.__condition.wait(POLL_SECONDS)
+                if self.__paused and self.__steps.get(processor):
+                    self.__steps[processor] -= 1
+                    return True
+                return False
+            finally:
+                self.__stopped.discard(processor)
+
+    def stop_point(self, processor: Processor) -> None:
+        """
+        Stands in for a processor's execution method while the machine is halted.  When the processor is given a
+        step it interprets one instruction and stops again at the next; when the machine is resumed it carries on
+        with its own execution method.  In either case a breakpoint at the instruction it stopped at is passed
+        over, so that it doesn't stop there again.
+        :param processor: The processor.
+        """
+        if self.wait(processor) or (not self.__paused and processor.instruction_pointer in processor.breakpoints):
+            self.__stepping.add(processor)
+            try:
+                if processor.tracer is not None:
+                    processor.perform_traced_instruction_processing()
+                else:
+                    processor.perform_instruction_processing()
+            finally:
+                self.__stepping.discard(processor)
+        elif not self.__paused:
+            processor.process_instructions()
+
+    def handle_hit(self, event: DebugEvent) -> bool:
+        """
+        Halts the machine when a breakpoint or watchpoint is hit while a client is attached.  A processor that
+        reached a breakpoint waits there, before the instruction executes.  Without a client, the debugger's own
+        setting decides whether the hit stops the machine.
+        :param event: The hit.
+        :return: True to stop the machine altogether.
+        """
+        self.__lastEvent = event
+        if self.__client is None:
+            return self.__debugger.stop_on_hit
+        self.pause()
+        if event.kind == "breakpoint":
+            processor = self.find_processor(event.device_id)
+            if processor not in self.__stepping:
+                return not self.wait(processor) and self.__paused
+        return False
+
+    def while_stopped(self, action: Callable[[], object]) -> None:
+        """
+        Carries out an action that changes how the processors execute, such as planting a breakpoint, while the
+        machine is halted, halting it briefly if it is running.
+        :param action: The action.
+        """
+        if self.__paused:
+            action()
+            return
+        self.pause()
+        try:
+            self.wait_until_stopped()
+            action()
+        finally:
+            self.resume()
+
+    def find_processor(self, device_id: str | None) -> Processor:
+        """
+        Finds a processor by its device ID.
+        :param device_id: The device ID, or None for the first processor.
+        :return: The processor.
+        """
+        for processor in self.__processors:
+            if device_id is None or processor.device_id == device_id:
+                return processor
+        raise ValueError(f"Unknown processor '{device_id}'.")
+
+    def require_stopped(self) -> None:
+        """
+        Checks that the machine is halted with a processor stopped, so that its state can be changed safely.
+        """
+        if not self.__paused or not self.__stopped:
+            raise ValueError("The machine must be halted first.")
+
+    def resolve_address(self, value: int | str) -> int:
+        """
+        Converts an address given as a number or a label to a number.
+        :param value: The address or label.
+        :return: The address.
+        """
+        return value if isinstance(value, int) else self.__debugger.resolve_address(value)
+
+    def command_status(self, request: dict) -> dict:
+        """
+        {"command": "status"}: whether the machine is halted, which processors have stopped, and the last hit.
+        """
+        return {"paused": self.__paused,
+                "stopped": [processor.device_id for processor in self.__processors if processor in self.__stopped],
+                "processors": [processor.device_id for processor in self.__processors],
+                "last_hit": self.__debugger.format_event(self.__lastEvent) if self.__lastEvent else None}
+
+    def command_halt(self, request: dict) -> dict:
+        """
+        {"command": "halt"}: halts the machine and waits briefly for a processor to stop.
+        """
+        self.pause()
+        self.wait_until_stopped()
+        return self.command_status(request)
+
+    def command_resume(self, request: dict) -> dict:
+        """
+        {"command": "resume"}: resumes the halted machine.
+        """
+        self.resume()
+        return self.command_status(request)
+
+    def command_step(self, request: dict) -> dict:
+        """
+        {"command": "step", "processor": device_id, "count": n}: executes n instructions (1 by default) on a
+        processor of the halted machine, and returns its registers.
+        """
+        processor = self.find_processor(request.get("processor"))
+        count = int(request.get("count", 1))
+        if count < 1:
+            raise ValueError("The step count must be at least 1.")
+        if not self.__paused:
+            raise ValueError("The machine must be halted first.")
+        with self.__condition:
+            self.__steps[processor] = self.__steps.get(processor, 0) + count
+            self.__condition.notify_all()
+        if not self.wait_until_stopped(processor):
+            raise ValueError(f"{processor.device_id} did not stop; it may be asleep or the machine has halted.")
+        return self.command_registers(request)
+
+    def command_registers(self, request: dict) -> dict:
+        """
+        {"command": "registers", "processor": device_id}: the registers of a processor.
+        """
+        processor = self.find_processor(request.get("processor"))
+        return {"processor": processor.device_id,
+                "instruction_pointer": processor.instruction_pointer,
+                "routine": self.__symbolTable.find_routine(processor.instruction_pointer),
+                "registers": list(processor.registers),
+                "compare_result": int(processor.compare_result),
+                "user_stack": list(processor.user_stack),
+                "instructions": processor.instructions_retired,
+                "sleeping": processor.sleeping}
+
+    def command_write_register(self, request: dict) -> dict:
+        """
+        {"command": "write_register", "processor": device_id, "register": n or "instruction_pointer",
+        "value": v}: changes a register of a processor of the halted machine.
+        """
+        self.require_stopped()
+        processor = self.find_processor(request.get("processor"))
+        register, value = request["register"], int(request["value"])
+        if register == "instruction_pointer":
+            processor.instruction_pointer = value
+        else:
+            processor.registers[int(register)] = value
+        return self.command_registers(request)
+
+    def command_read_memory(self, request: dict) -> dict:
+        """
+        {"command": "read_memory", "address": address or label, "length": n}: n words of memory, straight from
+        the devices that hold them.  Words of devices that are only reached over the buses read as null.
+        """
+        address = self.resolve_address(request["address"])
+        return {"address": address,
+                "values": self.__memoryMap.peek_block(address, int(request.get("length", 1)))}
+
+    def command_write_memory(self, request: dict) -> dict:
+        """
+        {"command": "write_memory", "address": address or label, "values": [...]}: writes words of memory of the
+        halted machine, and discards the processors' cached copies of them.
+        """
+        self.require_stopped()
+        address = self.resolve_address(request["address"])
+        values = [int(value) for value in request["values"]]
+        self.__memoryMap.poke_block(address, values)
+        for processor in self.__processors:
+            processor.data_cache.invalidate_range(address, address + len(values))
+            processor.invalidate_decoded_range(address, address + len(values))
+        return {"address": address, "length": len(values)}
+
+    def command_break(self, request: dict) -> dict:
+        """
+        {"command": "break", "address": address or label}: sets a breakpoint.  Without an address, lists the
+        breakpoints.
+        """
+        if "address" in request:
+            address = self.resolve_address(request["address"])
+            if address not in self.__debugger.breakpoints:
+                self.__clientBreakpoints.add(address)
+                self.while_stopped(lambda: self.__debugger.add_breakpoint(address))
+        return {"breakpoints": sorted(self.__debugger.breakpoints)}
+
+    def command_clear_break(self, request: dict) -> dict:
+        """
+        {"command": "clear_break", "address": address or label}: removes a breakpoint.
+        """
+        address = self.resolve_address(request["address"])
+        self.__clientBreakpoints.discard(address)
+        self.while_stopped(lambda: self.__debugger.remove_breakpoint(address))
+        return {"breakpoints": sorted(self.__debugger.breakpoints)}
+
+    def command_symbol(self, request: dict) -> dict:
+        """
+        {"command": "symbol", "name": label} or {"command": "symbol", "address": address}: the address of a
+        label, or the routine that contains an address.
+        """
+        if "name" in request:
+            return {"name": request["name"], "address": self.__debugger.resolve_address(request["name"])}
+        address = int(request["address"])
+        return {"address": address, "routine": self.__symbolTable.find_routine(address)}
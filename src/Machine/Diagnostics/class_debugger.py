@@ -0,0 +1,256 @@
+from collections import deque
+from typing import Callable, Deque, List, Set
+
+from Compiler.class_symbol_table import SymbolTable
+from Machine.Backplane.class_memory_map import MemoryMap
+from Machine.Devices.Processors.class_processor import Processor
+from Machine.Diagnostics.class_debug_event import DebugEvent
+from Machine.Diagnostics.class_watchpoint import Watchpoint
+
+DEFAULT_MAX_EVENTS = 100
+"""
+The default number of the most recent hits the debugger keeps.
+"""
+
+
+class Debugger:
+    """
+    The Debugger class stops the machine, or reports and carries on, when a processor reaches a breakpoint or
+    memory in a watched range is read or written.
+
+    Neither costs anything while none are set, and nothing is checked per instruction while they are.  A breakpoint
+    is planted in the processor's decoded instruction cache: the instruction at its address decodes to one that
+    calls the debugger before executing, and the block translator ends blocks before it.  A watchpoint gives the
+    watched range its own entry in the memory map's decoding table, whose reader or writer calls the debugger;
+    the rest of memory is decoded as before, and watched addresses are kept out of the data caches.  Instruction
+    fetches are reads too, but code is only fetched when it is decoded.
+
+    Breakpoints and watchpoints can be changed at any time while the machine is stopped, or from the thread that
+    runs it under the cooperative scheduler.
+    """
+
+    def __init__(self, symbol_table: SymbolTable | None = None, max_events: int = DEFAULT_MAX_EVENTS) -> None:
+        """
+        Constructor for the Debugger class.
+        :param symbol_table: The symbol table used to name the routines hits happen in, or None.
+        :param max_events: The number of the most recent hits kept.
+        """
+        self.__symbolTable = symbol_table
+        self.__breakpoints: Set[int] = set()
+        self.__watchpoints: List[Watchpoint] = []
+        self.__events: Deque[DebugEvent] = deque(maxlen=max_events)
+        self.__hits: int = 0
+        self.__stopEvent: DebugEvent | None = None
+        self.__processors: List[Processor] = []
+        self.__memoryMap: MemoryMap | None = None
+        self.stop_on_hit: bool = True  # stop the machine at the first hit, unless on_hit is set
+        self.on_hit: Callable[[DebugEvent], bool] | None = None  # told of each hit; returns True to stop the machine
+        self.suspended: bool = False  # set while the machine is replayed, so that hits aren't reported twice
+
+    @property
+    def breakpoints(self) -> Set[int]:
+        """
+        This property returns the addresses of the breakpoints.
+        :return: The breakpoints.
+        """
+        return set(self.__breakpoints)
+
+    @property
+    def watchpoints(self) -> List[Watchpoint]:
+        """
+        This property returns the watched address ranges.
+        :return: The watchpoints.
+        """
+        return list(self.__watchpoints)
+
+    @property
+    def events(self) -> List[DebugEvent]:
+        """
+        This property returns the most recent hits, oldest first.
+        :return: The hits.
+        """
+        return list(self.__events)
+
+    @property
+    def hits(self) -> int:
+        """
+        This property returns the number of hits, including those no longer kept.
+        :return: The number of hits.
+        """
+        return self.__hits
+
+    @property
+    def stop_event(self) -> DebugEvent | None:
+        """
+        This property returns the hit that stopped the machine.
+        :return: The hit, or None if no hit stopped the machine.
+        """
+        return self.__stopEvent
+
+    def add_breakpoint(self, address: int) -> None:
+        """
+        Adds a breakpoint, which is reached before the instruction at the address executes.
+        :param address: The address of the instruction.
+        """
+        self.__breakpoints.add(address)
+        self.install_breakpoints()
+
+    def remove_breakpoint(self, address: int) -> None:
+        """
+        Removes a breakpoint.
+        :param address: The address of the breakpoint.
+        """
+        self.__breakpoints.discard(address)
+        self.install_breakpoints()
+
+    def add_watchpoint(self, start: int, end: int, reads: bool = True, writes: bool = True) -> Watchpoint:
+        """
+        Watches a range of addresses.
+        :param start: The first address to watch.
+        :param end: The address just past the last address to watch.
+        :param reads: True to report reads from the range.
+        :param writes: True to report writes to the range.
+        :return: The watchpoint, which can be passed to remove_watchpoint.
+        """
+        if end <= start:
+            raise ValueError(f"The watched range {start} to {end} is empty.")
+        if not reads and not writes:
+            raise ValueError("A watchpoint must watch reads, writes or both.")
+        watchpoint = Watchpoint(start, end, reads, writes)
+        self.__watchpoints.append(watchpoint)
+        self.install_watchpoints()
+        return watchpoint
+
+    def remove_watchpoint(self, watchpoint: Watchpoint) -> None:
+        """
+        Stops watching a range of addresses.
+        :param watchpoint: The watchpoint returned by add_watchpoint.
+        """
+        self.__watchpoints.remove(watchpoint)
+        self.install_watchpoints()
+
+    def resolve_address(self, text: str) -> int:
+        """
+        Converts an address given as text, either a number or a label, to a number.
+        :param text: The address or label.
+        :return: The address.
+        """
+        if text.isdigit():
+            return int(text)
+        if self.__symbolTable is None or text not in self.__symbolTable.labels:
+            raise ValueError(f"Unknown label '{text}'.")
+        return self.__symbolTable.labels[text]
+
+    def add_watchpoint_text(self, text: str) -> Watchpoint:
+        """
+        Watches a range of addresses given as text: START[-END][:r|w|rw], where START and END are numbers or
+        labels, END is the last address watched, and the access watched is reads, writes, or both (the default).
+        :param text: The watchpoint.
+        :return: The watchpoint.
+        """
+        addresses, _, access = text.partition(":")
+        if access not in ("", "r", "w", "rw"):
+            raise ValueError(f"Unknown access '{access}' in watchpoint '{text}'; use r, w or rw.")
+        start, _, end = addresses.partition("-")
+        start_address = self.resolve_address(start)
+        end_address = self.resolve_address(end) if end else start_address
+        return self.add_watchpoint(start_address, end_address + 1, access != "w", access != "r")
+
+    def attach(self, processors: List[Processor], memory_map: MemoryMap) -> None:
+        """
+        Attaches the debugger to a machine before it runs, planting the breakpoints and watchpoints set so far.
+        The hits of any earlier run are forgotten.
+        :param processors: The processors of the machine.
+        :param memory_map: The memory map of the machine.
+        """
+        self.__processors = processors
+        self.__memoryMap = memory_map
+        self.__events.clear()
+        self.__hits = 0
+        self.__stopEvent = None
+        self.install_breakpoints()
+        self.install_watchpoints()
+
+    def install_breakpoints(self) -> None:
+        """
+        Plants the breakpoints in every processor.
+        """
+        handler = self.handle_breakpoint if self.__breakpoints else None
+        for processor in self.__processors:
+            if processor.breakpoints != self.__breakpoints or processor.breakpoint_handler != handler:
+                processor.set_breakpoints(self.__breakpoints, handler)
+
+    def install_watchpoints(self) -> None:
+        """
+        Plants the watchpoints in the memory map, and clears the data caches, which may hold newly watched
+        addresses.  The memory map is left alone if nothing is or was watched.
+        """
+        if self.__memoryMap is None or (not self.__watchpoints and not self.__memoryMap.watchpoints):
+            return
+        self.__memoryMap.set_watchpoints(self.__watchpoints, self.handle_access if self.__watchpoints else None)
+        for processor in self.__processors:
+            processor.data_cache.clear()
+
+    def handle_breakpoint(self, processor: Processor) -> bool:
+        """
+        Records a processor reaching a breakpoint.
+        :param processor: The processor.
+        :return: True to stop the machine before the instruction at the breakpoint executes.
+        """
+        if self.suspended:
+            return False
+        return self.record(DebugEvent("breakpoint", processor.instruction_pointer, 0, processor.device_id,
+                                      processor.instruction_pointer, processor.instructions_retired))
+
+    def handle_access(self, address: int, value: int, write: bool) -> None:
+        """
+        Records an access to a watched address, and stops the machine once the access has finished if asked to.
+        :param address: The address read or written.
+        :param value: The value read or written.
+        :param write: True for a write, False for a read.
+        """
+        if self.suspended:
+            return
+        kind = "write" if write else "read"
+        if len(self.__processors) == 1:
+            processor = self.__processors[0]
+            event = DebugEvent(kind, address, value, processor.device_id, processor.instruction_pointer,
+                               processor.instructions_retired)
+        else:
+            event = DebugEvent(kind, address, value, None, -1, 0)
+        if self.record(event) and self.__processors:
+            # the processors share the buses, so any of them can raise the halt interrupt
+            self.__processors[0].raise_halt_interrupt()
+
+    def record(self, event: DebugEvent) -> bool:
+        """
+        Records and prints a hit, and decides whether it stops the machine.
+        :param event: The hit.
+        :return: True to stop the machine.
+        """
+        self.__hits += 1
+        self.__events.append(event)
+        print(self.format_event(event))
+        stop = self.on_hit(event) if self.on_hit is not None else self.stop_on_hit
+        if stop and self.__stopEvent is None:
+            self.__stopEvent = event
+        return stop
+
+    def format_event(self, event: DebugEvent) -> str:
+        """
+        Formats a hit as text, naming the routine it happened in.
+        :param event: The hit.
+        :return: The formatted hit.
+        """
+        location = f"{event.instruction_pointer}"
+        if self.__symbolTable is not None:
+            location += f" ({self.__symbolTable.find_routine(event.instruction_pointer)})"
+        if event.kind == "breakpoint":
+            return f"Breakpoint at {location} reached by {event.device_id} after {event.instructions} instructions"
+        if event.kind == "write":
+            text = f"Write of {event.value} to {event.address}"
+        else:
+            text = f"Read of {event.value} from {event.address}"
+        if event.device_id is None:
+            return text
+        return f"{text} by {event.device_id} at {location} after {event.instructions} instructions"
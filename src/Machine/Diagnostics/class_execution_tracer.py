@@ -0,0 +1,275 @@
+import struct
+from typing import List
+
+from Compiler.class_symbol_table import SymbolTable
+from Constants.class_instruction_set import InstructionSet, ADDRESS_OPERANDS, OPERAND_COUNTS, get_registers_used
+from Machine.Devices.Bases.class_device_state import StateReader, StateWriter
+
+DEFAULT_TRACE_RECORDS = 4096
+"""
+The default number of records held in each processor's trace ring buffer.
+"""
+
+RECORD_WORDS = 9
+"""
+The number of words in a record in a trace file: the address, the opcode, three operands and four register values.
+"""
+
+RECORD_SLOTS = 6
+"""
+The number of slots a record takes in the ring buffer: the address, the decoded instruction and four register
+values.
+"""
+
+BLOCK_RECORD = -2
+"""
+The opcode recorded when a translated block starts.  Its first operand is the address the block ends at.
+"""
+
+TRACE_MAGIC = b"RBTRCE"
+TRACE_VERSION = 1
+
+_HEADER = struct.Struct("<6sHH")
+
+
+class ExecutionTracer:
+    """
+    The ExecutionTracer class records the most recent instructions executed by a processor in a fixed-size ring
+    buffer, so that the path that led to a crash can be examined afterwards.
+
+    Each record is a fixed run of slots in a list allocated up front: the address of the instruction, its decoded
+    form (which holds the opcode and operands), and the values of the registers it uses, taken just before it
+    executes.  Recording stores references to existing objects into the list and allocates nothing, so the tracer
+    is cheap enough to leave on.  Under the block engine one record is written per translated block instead of
+    per instruction.
+
+    The trace is written to a compact binary file when the processor faults and when the machine halts, and
+    format_trace turns that file back into text offline.
+    """
+
+    def __init__(self, processor, capacity: int = DEFAULT_TRACE_RECORDS, pathname: str | None = None,
+                 symbol_table: SymbolTable | None = None) -> None:
+        """
+        Constructor for the ExecutionTracer class.
+        :param processor: The processor whose instructions are recorded.
+        :param capacity: The number of records the ring buffer holds.
+        :param pathname: The pathname of the trace file to write if the processor faults, or None.
+        :param symbol_table: The symbol table written to the trace file to name addresses, or None.
+        """
+        if capacity < 1:
+            raise ValueError("The trace must hold at least one record.")
+        self.__processor = processor
+        self.__capacity = capacity
+        self.__pathname = pathname
+        self.__symbolTable = symbol_table
+        self.__records: list = [0] * (capacity * RECORD_SLOTS)
+        self.__end: int = capacity * RECORD_SLOTS
+        self.__position: int = 0  # the index of the first slot of the next record
+        self.__wraps: int = 0  # the number of times the ring buffer has filled
+
+    @property
+    def processor(self):
+        """
+        This property returns the processor being traced.
+        :return: The processor being traced.
+        """
+        return self.__processor
+
+    @property
+    def capacity(self) -> int:
+        """
+        This property returns the number of records the ring buffer holds.
+        :return: The capacity of the ring buffer.
+        """
+        return self.__capacity
+
+    @property
+    def recorded(self) -> int:
+        """
+        This property returns the number of records written since the tracer was attached, including those that
+        have since been overwritten.
+        :return: The number of records written.
+        """
+        return self.__wraps * self.__capacity + self.__position // RECORD_SLOTS
+
+    def record_instruction(self, address: int, decoded_instruction, registers: List[int]) -> None:
+        """
+        This method records an instruction that is about to execute.
+        :param address: The address of the instruction.
+        :param decoded_instruction: The decoded instruction.
+        :param registers: The processor's registers.
+        """
+        records = self.__records
+        position = self.__position
+        records[position] = address
+        records[position + 1] = decoded_instruction
+        value_position = position + 2
+        for register in decoded_instruction.registers:
+            records[value_position] = registers[register]
+            value_position += 1
+        position += RECORD_SLOTS
+        if position == self.__end:
+            position = 0
+            self.__wraps += 1
+        self.__position = position
+
+    def record_block(self, address: int, end_address: int) -> None:
+        """
+        This method records a translated block that is about to execute.
+        :param address: The address of the first instruction in the block.
+        :param end_address: The address just past the last instruction in the block.
+        """
+        records = self.__records
+        position = self.__position
+        records[position] = address
+        records[position + 1] = BLOCK_RECORD
+        records[position + 2] = end_address
+        position += RECORD_SLOTS
+        if position == self.__end:
+            position = 0
+            self.__wraps += 1
+        self.__position = position
+
+    def get_records(self) -> List[int]:
+        """
+        This method returns the records held in the ring buffer, oldest first, as one flat list of words in the
+        layout of a trace file.  It can be called while the processor runs, though the newest record may then be
+        incomplete.
+        :return: The words of the records.
+        """
+        slots = list(self.__records)
+        position = self.__position
+        if self.__wraps == 0:
+            slots = slots[:position]
+        else:
+            slots = slots[position:] + slots[:position]
+        words = []
+        for index in range(0, len(slots), RECORD_SLOTS):
+            address, decoded_instruction = slots[index], slots[index + 1]
+            if decoded_instruction == BLOCK_RECORD:
+                words += [address, BLOCK_RECORD, slots[index + 2], 0, 0, 0, 0, 0, 0]
+            else:
+                operands = decoded_instruction.operands
+                value_count = len(decoded_instruction.registers)
+                words += [address, decoded_instruction.opcode]
+                words += operands + (0,) * (3 - len(operands))
+                words += slots[index + 2:index + 2 + value_count] + [0] * (4 - value_count)
+        return words
+
+    def record_fault(self) -> None:
+        """
+        This method writes the trace file, if the tracer has one, when the processor faults.
+        """
+        if self.__pathname is not None:
+            ExecutionTracer.write_trace_file([self], self.__symbolTable, self.__pathname)
+
+    @staticmethod
+    def write_trace_file(tracers: List['ExecutionTracer'], symbol_table: SymbolTable | None, pathname: str) -> None:
+        """
+        This method writes the traces of one or more processors to a binary trace file.
+        :param tracers: The tracers to write.
+        :param symbol_table: The symbol table used to name addresses when the file is decoded, or None.
+        :param pathname: The pathname of the trace file.
+        """
+        writer = StateWriter()
+        routines = symbol_table.routines if symbol_table is not None else []
+        writer.write_ints([address for address, _ in routines])
+        for _, name in routines:
+            writer.write_string(name)
+        for tracer in tracers:
+            processor = tracer.processor
+            writer.write_string(processor.device_id)
+            writer.write_string(processor.fault or "")
+            writer.write_int(processor.instruction_pointer)
+            writer.write_ints(processor.registers)
+            writer.write_int(processor.instructions_retired)
+            writer.write_int(tracer.recorded)
+            writer.write_ints(tracer.get_records())
+        with open(pathname, 'wb') as file:
+            file.write(_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, len(tracers)))
+            file.write(writer.get_bytes())
+
+    @staticmethod
+    def read_trace_file(pathname: str) -> dict:
+        """
+        This method reads a trace file written by write_trace_file.
+        :param pathname: The pathname of the trace file.
+        :return: The routines (a list of address and name pairs) and the traces, one per processor, each a
+            dictionary with the processor's device ID, fault, instruction pointer, registers, instructions
+            retired, records written and records held.
+        """
+        with open(pathname, 'rb') as file:
+            data = file.read()
+        if len(data) < _HEADER.size:
+            raise ValueError(f"{pathname} is not a trace file.")
+        magic, version, processor_count = _HEADER.unpack_from(data)
+        if magic != TRACE_MAGIC:
+            raise ValueError(f"{pathname} is not a trace file.")
+        if version != TRACE_VERSION:
+            raise ValueError(f"{pathname} is trace version {version}; version {TRACE_VERSION} is required.")
+        reader = StateReader(data[_HEADER.size:])
+        addresses = reader.read_ints()
+        routines = [(address, reader.read_string()) for address in addresses]
+        traces = []
+        for _ in range(processor_count):
+            traces.append({"device_id": reader.read_string(),
+                           "fault": reader.read_string() or None,
+                           "instruction_pointer": reader.read_int(),
+                           "registers": reader.read_ints(),
+                           "instructions_retired": reader.read_int(),
+                           "recorded": reader.read_int(),
+                           "records": reader.read_ints()})
+        return {"routines": routines, "traces": traces}
+
+    @staticmethod
+    def format_trace(trace_file: dict) -> str:
+        """
+        This method formats the contents of a trace file as text, one line per record, oldest first.
+        :param trace_file: The trace file, as returned by read_trace_file.
+        :return: The formatted trace.
+        """
+        symbol_table = SymbolTable()
+        for address, name in trace_file["routines"]:
+            symbol_table.add_routine(name, address)
+        lines = []
+        for trace in trace_file["traces"]:
+            records = trace["records"]
+            held = len(records) // RECORD_WORDS
+            lines.append(f"Trace of {trace['device_id']}: the last {held} of {trace['recorded']} records "
+                         f"({trace['instructions_retired']} instructions retired)")
+            lines.append(f"{'record':>10} {'address':>8}  {'routine':<24} {'instruction':<28} registers")
+            first_record = trace["recorded"] - held
+            for index in range(held):
+                record = records[index * RECORD_WORDS:(index + 1) * RECORD_WORDS]
+                address = record[0]
+                instruction, registers = ExecutionTracer.format_record(record)
+                lines.append(f"{first_record + index:>10} {address:>8}  {symbol_table.find_routine(address):<24} "
+                             f"{instruction:<28} {registers}")
+            if trace["fault"] is not None:
+                lines.append(f"Fault: {trace['fault']}")
+            instruction_pointer = trace["instruction_pointer"]
+            lines.append(f"Stopped at {instruction_pointer} ({symbol_table.find_routine(instruction_pointer)}) "
+                         f"with registers {trace['registers']}")
+            lines.append("")
+        return "\n".join(lines)
+
+    @staticmethod
+    def format_record(record: List[int]) -> tuple[str, str]:
+        """
+        This method formats a single trace record.
+        :param record: The words of the record.
+        :return: The instruction, as Rubbish source, and the values of the registers it used.
+        """
+        opcode = record[1]
+        if opcode == BLOCK_RECORD:
+            return f"block to {record[2]}", ""
+        if opcode not in OPERAND_COUNTS:
+            return f"opcode {opcode}", ""
+        instruction = InstructionSet(opcode)
+        operands = tuple(record[2:2 + OPERAND_COUNTS[instruction]])
+        address_operands = ADDRESS_OPERANDS.get(instruction, ())
+        text = " ".join([instruction.name] + [f"@{-operand}" if position in address_operands and operand < 0
+                                              else str(operand) for position, operand in enumerate(operands)])
+        registers = get_registers_used(instruction, operands)
+        values = record[5:5 + len(registers)]
+        return text, " ".join(f"r{register}={value}" for register, value in zip(registers, values))
@@ -0,0 +1,144 @@
+import threading
+import time
+from collections import Counter
+from typing import List, TextIO, Tuple
+
+from Compiler.class_symbol_table import SymbolTable
+from Machine.Devices.Processors.class_processor import Processor
+
+DEFAULT_SAMPLE_INTERVAL = 0.001
+"""
+The number of seconds between profiler samples.
+"""
+
+
+class GuestProfiler:
+    """
+    The GuestProfiler class is a sampling profiler for the Rubbish program running on a processor.
+    A background thread periodically reads the processor's instruction pointer and its call stack of return
+    addresses, and attributes each sample to routines using the symbol table.  The processor is not paused or
+    instrumented, so the profiler costs the guest nothing beyond the thread switches it causes.
+    """
+
+    def __init__(self, processor: Processor, symbol_table: SymbolTable,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL) -> None:
+        """
+        Constructor for the GuestProfiler class.
+        :param processor: The processor to sample.
+        :param symbol_table: The symbol table used to name the sampled addresses.
+        :param sample_interval: The number of seconds between samples.
+        """
+        self.__processor = processor
+        self.__symbolTable = symbol_table
+        self.__sampleInterval = sample_interval
+        self.__stacks: Counter[Tuple[int, ...]] = Counter()
+        self.__sampling = threading.Event()
+        self.__thread: threading.Thread | None = None
+
+    @property
+    def processor(self) -> Processor:
+        """
+        This property returns the processor being sampled.
+        :return: The processor being sampled.
+        """
+        return self.__processor
+
+    @property
+    def sample_count(self) -> int:
+        """
+        This property returns the number of samples taken.
+        :return: The number of samples taken.
+        """
+        return sum(self.__stacks.values())
+
+    def start(self) -> None:
+        """
+        This method starts sampling on a background thread.
+        """
+        self.__sampling.set()
+        self.__thread = threading.Thread(target=self.sample_loop,
+                                         name=self.__processor.device_id + "::profiler", daemon=True)
+        self.__thread.start()
+
+    def stop(self) -> None:
+        """
+        This method stops sampling and waits for the sampling thread to finish.
+        """
+        self.__sampling.clear()
+        if self.__thread is not None:
+            self.__thread.join()
+            self.__thread = None
+
+    def sample_loop(self) -> None:
+        """
+        The main loop of the sampling thread.
+        """
+        while self.__sampling.is_set():
+            self.take_sample()
+            time.sleep(self.__sampleInterval)
+
+    def take_sample(self) -> None:
+        """
+        This method records the processor's current call stack, outermost caller first.
+        Samples taken while the processor is asleep are not recorded.
+        """
+        processor = self.__processor
+        if processor.sleeping or not processor.running:
+            return
+        # copy the stack first; the processor may push or pop while the sample is assembled
+        return_addresses = list(processor.instruction_pointer_stack)
+        self.__stacks[tuple(return_addresses) + (processor.instruction_pointer,)] += 1
+
+    def get_routine_stacks(self) -> Counter[Tuple[str, ...]]:
+        """
+        This method converts the sampled address stacks to routine names.
+        Each return address is attributed to the routine containing the CALL just before it.
+        :return: The number of samples for each stack of routine names, outermost caller first.
+        """
+        find_routine = self.__symbolTable.find_routine
+        routine_stacks: Counter[Tuple[str, ...]] = Counter()
+        for stack, count in self.__stacks.items():
+            callers = tuple(find_routine(return_address - 1) for return_address in stack[:-1])
+            routine_stacks[callers + (find_routine(stack[-1]),)] += count
+        return routine_stacks
+
+    def get_flat_profile(self) -> List[Tuple[str, int, int]]:
+        """
+        This method builds a flat profile from the samples.
+        :return: A list of (routine, self samples, total samples), busiest routine first.  Self samples are
+            taken in the routine itself; total samples include the routines it called.
+        """
+        self_counts: Counter[str] = Counter()
+        total_counts: Counter[str] = Counter()
+        for stack, count in self.get_routine_stacks().items():
+            self_counts[stack[-1]] += count
+            for routine in set(stack):
+                total_counts[routine] += count
+        return sorted(((routine, self_counts[routine], total) for routine, total in total_counts.items()),
+                      key=lambda entry: (-entry[1], -entry[2], entry[0]))
+
+    def format_flat_profile(self) -> str:
+        """
+        This method formats the flat profile as a table.
+        :return: The formatted flat profile.
+        """
+        sample_count = max(self.sample_count, 1)
+        lines = [f"Profile of {self.__processor.device_id}: {self.sample_count} samples",
+                 f"{'self %':>8} {'total %':>8} {'self':>8} {'total':>8}  routine"]
+        for routine, self_count, total_count in self.get_flat_profile():
+            lines.append(f"{self_count / sample_count:8.1%} {total_count / sample_count:8.1%} "
+                         f"{self_count:8} {total_count:8}  {routine}")
+        return "\n".join(lines)
+
+    def write_collapsed_stacks(self, file: TextIO, prefix: str = "") -> None:
+        """
+        This method writes the samples in the collapsed stack format read by flame graph tools, one stack per
+        line: the routine names from outermost caller to innermost callee separated by semicolons, then a space
+        and the number of samples.
+        :param file: The file to write to.
+        :param prefix: A frame to put at the root of every stack, such as the processor's device ID.
+        """
+        for stack, count in sorted(self.get_routine_stacks().items()):
+            if prefix:
+                stack = (prefix,) + stack
+            file.write(";".join(stack) + f" {count}\n")
@@ -0,0 +1,23 @@
+from typing import NamedTuple
+
+
+class Watchpoint(NamedTuple):
+    """
+    A range of addresses watched by the debugger, which is told when memory in the range is read or written.
+    """
+    start: int
+    """
+    The first address watched.
+    """
+    end: int
+    """
+    The address just past the last address watched.
+    """
+    reads: bool
+    """
+    True if reads from the range are reported.
+    """
+    writes: bool
+    """
+    True if writes to the range are reported.
+    """
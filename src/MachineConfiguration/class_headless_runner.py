@@ -0,0 +1,316 @@
+import json
+import time
+
+from Constants.class_exit_codes import ExitCodes
+from Constants.class_interrupts import Interrupts
+from Machine.Backplane.class_backplane import BackPlane
+from Machine.Backplane.class_time_travel import DEFAULT_MAX_CHECKPOINTS
+from Machine.Devices.IO.class_console import Console
+from Machine.Devices.IO.class_soundcard import SoundCard
+from Machine.Devices.Processors.class_processor import Processor
+from Machine.Diagnostics.class_execution_tracer import DEFAULT_TRACE_RECORDS
+from Machine.Diagnostics.class_guest_profiler import DEFAULT_SAMPLE_INTERVAL
+from MachineConfiguration.class_machine_builder import MachineBuilder
+
+
+class HeadlessRunner:
+    """
+    A class used to run a machine without a display or audio, for batch and regression runs.
+    The console and sound card are replaced with in-memory versions, the run can be limited by an instruction
+    budget and a timeout, and the outcome is reported as an exit code together with the final machine state.
+    """
+
+    def __init__(self, devices, max_instructions: int = 0, timeout: float | None = None,
+                 statistics_interval: float | None = None, profile_pathname: str | None = None,
+                 restore_snapshot: str | None = None, save_snapshot: str | None = None,
+                 scheduler: str = "threaded", trace_pathname: str | None = None,
+                 trace_records: int = DEFAULT_TRACE_RECORDS, checkpoint_interval: int | None = None,
+                 max_checkpoints: int = DEFAULT_MAX_CHECKPOINTS, step_back: int = 0,
+                 run_back_to: str | None = None, breakpoints: list[str] | None = None,
+                 watchpoints: list[str] | None = None, log_hits: bool = False,
+                 debug_server: str | None = None, input_text: str | None = None) -> None:
+        """
+        Constructs all the necessary attributes for the headless runner.
+
+        Parameters:
+        devices (list): The devices to be added to the machine, as produced by the command line parser.
+        max_instructions (int): The number of instructions after which the machine is halted, or 0 for no limit.
+        timeout (float): The number of seconds after which the machine is halted, or None for no limit.
+        statistics_interval (float): The number of seconds between statistics reports, or None for no statistics.
+        profile_pathname (str): Enables the guest profiler.  The collapsed stacks are written to this pathname
+            unless it is empty.  None disables profiling.
+        restore_snapshot (str): The pathname of a snapshot to restore before running, or None to start afresh.
+        save_snapshot (str): The pathname to save a snapshot to when the machine halts, or None.
+        scheduler (str): "threaded" to give each device its own thread, "cooperative" to run the whole machine
+            on one thread, or "async" to run the peripherals on an asyncio event loop.
+        trace_pathname (str): Enables the execution tracer, which writes its trace file to this pathname.  None
+            disables tracing.
+        trace_records (int): The number of records each processor's trace holds.
+        checkpoint_interval (int): Enables time travel, taking a checkpoint every this many steps.  None disables
+            time travel.  Time travel needs the cooperative scheduler.
+        max_checkpoints (int): The number of checkpoints kept.
+        step_back (int): The number of steps to take the machine back once it has stopped, or 0.
+        run_back_to (str): The address or label to run the machine back to once it has stopped, or None.
+        breakpoints (list): The addresses or labels of the breakpoints, or None.
+        watchpoints (list): The address ranges to watch, as START[-END][:r|w|rw], or None.
+        log_hits (bool): If True, breakpoint and watchpoint hits are reported and the machine carries on; otherwise
+            it stops at the first hit.
+        debug_server (str): The port number or Unix domain socket to listen on for a debugger, or None.
+        input_text (str): Text typed on the console before the machine runs, or None.
+        """
+        self.__device_group = devices
+        self.__max_instructions = max_instructions
+        self.__timeout = timeout
+        self.__statisticsInterval = statistics_interval
+        self.__profilePathname = profile_pathname
+        self.__restoreSnapshot = restore_snapshot
+        self.__saveSnapshot = save_snapshot
+        self.__scheduler = scheduler
+        self.__tracePathname = trace_pathname
+        self.__traceRecords = trace_records
+        self.__checkpointInterval = checkpoint_interval
+        self.__maxCheckpoints = max_checkpoints
+        self.__stepBack = step_back
+        self.__runBackTo = run_back_to
+        self.__breakpoints = breakpoints or []
+        self.__watchpoints = watchpoints or []
+        self.__logHits = log_hits
+        self.__debugServer = debug_server
+        self.__inputText = input_text
+
+    def run(self) -> dict:
+        """
+        Builds the machine, runs it until it halts, and reports the outcome.
+
+        Returns:
+        dict: The run report, including the exit code, the final processor state, and the console text.
+        """
+        backplane = MachineBuilder(self.__device_group, headless=True).build_machine()
+        try:
+            return self.run_machine(backplane)
+        finally:
+            backplane.close()
+
+    def run_machine(self, backplane: BackPlane) -> dict:
+        """
+        Runs a machine that has been built until it halts, and reports the outcome.
+
+        Parameters:
+        backplane (BackPlane): The backplane of the machine.
+
+        Returns:
+        dict: The run report.
+        """
+        if self.__scheduler == "cooperative":
+            backplane.use_cooperative_scheduler()
+        elif self.__scheduler == "async":
+            backplane.use_async_runtime()
+        if self.__restoreSnapshot is not None:
+            backplane.load_snapshot(self.__restoreSnapshot)
+        processors = [device for device in backplane.devices if isinstance(device, Processor)]
+        if self.__inputText is not None:
+            consoles = [device for device in backplane.devices if isinstance(device, Console)]
+            if not consoles:
+                raise ValueError("Input was given, but the machine has no console to type it on.")
+            for console in consoles:
+                console.send_input(self.__inputText)
+        for processor in processors:
+            processor.instruction_budget = self.__max_instructions
+            processor.halt_on_unhandled_stack_assertion = True
+        if self.__statisticsInterval is not None:
+            backplane.enable_statistics(self.__statisticsInterval)
+        if self.__profilePathname is not None:
+            backplane.enable_profiling(DEFAULT_SAMPLE_INTERVAL, self.__profilePathname or None)
+        if self.__tracePathname is not None:
+            backplane.enable_tracing(self.__traceRecords, self.__tracePathname)
+        if self.__checkpointInterval is not None:
+            backplane.enable_time_travel(self.__checkpointInterval, self.__maxCheckpoints)
+        debugger = backplane.debugger
+        for breakpoint in self.__breakpoints:
+            debugger.add_breakpoint(debugger.resolve_address(breakpoint))
+        for watchpoint in self.__watchpoints:
+            debugger.add_watchpoint_text(watchpoint)
+        debugger.stop_on_hit = not self.__logHits
+        if self.__debugServer is not None:
+            backplane.enable_debug_server(self.__debugServer)
+        started = time.perf_counter()
+        backplane.run(timeout=self.__timeout)
+        wall_time = time.perf_counter() - started
+        if self.__saveSnapshot is not None:
+            backplane.save_snapshot(self.__saveSnapshot)
+        exit_code = self.get_exit_code(backplane, processors)
+        report = {
+            "status": self.get_status_name(exit_code),
+            "exit_code": exit_code,
+            "instructions": sum(processor.instructions_retired for processor in processors),
+            "wall_time": wall_time,
+            "processors": [self.describe_processor(processor) for processor in processors],
+            "consoles": [device.screen_text() for device in backplane.devices if isinstance(device, Console)],
+            "sound_transactions": [device.transactions for device in backplane.devices
+                                   if isinstance(device, SoundCard)],
+        }
+        if self.__statisticsInterval is not None:
+            report["statistics"] = backplane.statistics.snapshot()
+        if backplane.profilers:
+            report["profiles"] = {profiler.processor.device_id: profiler.get_flat_profile()
+                                  for profiler in backplane.profilers}
+        if debugger.breakpoints or debugger.watchpoints:
+            report["debugger"] = {
+                "hits": debugger.hits,
+                "stopped_by": debugger.format_event(debugger.stop_event) if debugger.stop_event else None,
+                "events": [event._asdict() for event in debugger.events],
+            }
+        if backplane.time_travel is not None:
+            report["time_travel"] = self.rewind(backplane, processors)
+        return report
+
+    def rewind(self, backplane: BackPlane, processors: list[Processor]) -> dict:
+        """
+        Takes the stopped machine back a number of steps, or back to an address, if either was requested.
+
+        Parameters:
+        backplane (BackPlane): The backplane of the machine that has stopped.
+        processors (list): The processors attached to the backplane.
+
+        Returns:
+        dict: The steps taken, the checkpoints held and, if the machine was taken back, the step it was taken back
+            to and the state of the processors there.
+        """
+        time_travel = backplane.time_travel
+        if time_travel.unavailable is not None:
+            return {"unavailable": time_travel.unavailable}
+        result = {
+            "steps": time_travel.step,
+            "checkpoints": len(time_travel.checkpoints),
+            "oldest_step": time_travel.checkpoints[0].step,
+            "stored_words": time_travel.stored_words,
+        }
+        if self.__runBackTo is None and not self.__stepBack:
+            return result
+        try:
+            if self.__runBackTo is not None:
+                result["run_back_to"] = self.__runBackTo
+                result["rewound_to"] = backplane.run_back_to(self.resolve_address(backplane, self.__runBackTo))
+            else:
+                result["rewound_to"] = backplane.step_back(self.__stepBack)
+        except ValueError as error:
+            result["rewind_error"] = str(error)
+            return result
+        if result["rewound_to"] is not None:
+            result["processors"] = [self.describe_processor(processor) for processor in processors]
+        return result
+
+    @staticmethod
+    def resolve_address(backplane: BackPlane, address: str) -> int:
+        """
+        Converts an address given on the command line, either a number or a label, to a number.
+
+        Parameters:
+        backplane (BackPlane): The backplane, whose symbol table holds the labels.
+        address (str): The address or label.
+
+        Returns:
+        int: The address.
+        """
+        return backplane.debugger.resolve_address(address)
+
+    @staticmethod
+    def get_exit_code(backplane: BackPlane, processors: list[Processor]) -> int:
+        """
+        Determines why the machine stopped.
+
+        Parameters:
+        backplane (BackPlane): The backplane of the machine that has stopped.
+        processors (list): The processors attached to the backplane.
+
+        Returns:
+        int: One of the ExitCodes values.
+        """
+        if any(processor.fault is not None for processor in processors):
+            return ExitCodes.error
+        if backplane.debugger.stop_event is not None:
+            return ExitCodes.breakpoint
+        if any(processor.budget_exhausted for processor in processors):
+            return ExitCodes.instruction_budget_exceeded
+        if backplane.timed_out:
+            return ExitCodes.timeout
+        if backplane.interrupt_bus.test_interrupt(Interrupts.stack_assertion):
+            return ExitCodes.stack_assertion
+        return ExitCodes.halted
+
+    @staticmethod
+    def get_status_name(exit_code: int) -> str:
+        """
+        Returns the name of an exit code, such as "halted" or "timeout".
+        """
+        for name, value in vars(ExitCodes).items():
+            if value == exit_code and not name.startswith("_"):
+                return name
+        return "unknown"
+
+    @staticmethod
+    def describe_processor(processor: Processor) -> dict:
+        """
+        Returns the final state of a processor as a dictionary.
+        """
+        return {
+            "device_id": processor.device_id,
+            "instruction_pointer": processor.instruction_pointer,
+            "registers": list(processor.registers),
+            "user_stack": list(processor.user_stack),
+            "compare_result": int(processor.compare_result),
+            "instructions": processor.instructions_retired,
+            "fault": processor.fault,
+        }
+
+    @staticmethod
+    def format_report(report: dict) -> str:
+        """
+        Formats a run report as human-readable text.
+        """
+        lines = [f"Status: {report['status']} (exit code {report['exit_code']})",
+                 f"Instructions: {report['instructions']}",
+                 f"Wall time: {report['wall_time']:.3f} seconds"]
+        for processor in report["processors"]:
+            lines.append(f"Processor {processor['device_id']}:")
+            lines.append(f"   Instruction Pointer: {processor['instruction_pointer']}")
+            lines.append(f"   Registers: {processor['registers']}")
+            lines.append(f"   User Stack: {processor['user_stack']}")
+            if processor["fault"] is not None:
+                lines.append(f"   Fault: {processor['fault']}")
+        if "debugger" in report:
+            debugger = report["debugger"]
+            lines.append(f"Debugger: {debugger['hits']} hits")
+            if debugger["stopped_by"] is not None:
+                lines.append(f"   Stopped by: {debugger['stopped_by']}")
+        if "time_travel" in report:
+            time_travel = report["time_travel"]
+            if "unavailable" in time_travel:
+                lines.append(time_travel["unavailable"])
+            else:
+                lines.append(f"Time travel: {time_travel['steps']} steps, {time_travel['checkpoints']} checkpoints "
+                             f"from step {time_travel['oldest_step']}, {time_travel['stored_words']} words stored")
+            if "rewind_error" in time_travel:
+                lines.append(f"   {time_travel['rewind_error']}")
+            elif time_travel.get("run_back_to") is not None and time_travel["rewound_to"] is None:
+                lines.append(f"   {time_travel['run_back_to']} was not reached since step {time_travel['oldest_step']}.")
+            elif "rewound_to" in time_travel:
+                lines.append(f"   Rewound to step {time_travel['rewound_to']}:")
+                for processor in time_travel["processors"]:
+                    lines.append(f"   Processor {processor['device_id']}:")
+                    lines.append(f"      Instruction Pointer: {processor['instruction_pointer']}")
+                    lines.append(f"      Registers: {processor['registers']}")
+                    lines.append(f"      User Stack: {processor['user_stack']}")
+                    lines.append(f"      Instructions: {processor['instructions']}")
+        for console_text in report["consoles"]:
+            lines.append("Console:")
+            lines.extend("   " + line for line in console_text.split("\n"))
+        return "\n".join(lines)
+
+    @staticmethod
+    def write_json_report(report: dict, pathname: str) -> None:
+        """
+        Writes a run report to a file as JSON.
+        """
+        with open(pathname, 'w') as file:
+            json.dump(report, file, indent=2)
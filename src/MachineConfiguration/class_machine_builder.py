@@ -1,10 +1,15 @@
+import os
+
 from Compiler.class_rubbish_compiler import RubbishCompiler
 from Machine.Backplane.class_backplane import BackPlane
 from Machine.Devices.IO.class_console import Console
 from Machine.Devices.IO.class_soundcard import SoundCard
+from Machine.Devices.Memory.class_mapped_ram import MappedRAM
 from Machine.Devices.Memory.class_ram import RAM
 from Machine.Devices.Memory.class_rom import ROM
+from Machine.Devices.Processors.class_data_cache import DEFAULT_CACHE_SIZE, DEFAULT_CACHE_ASSOCIATIVITY
 from Machine.Devices.Processors.class_processor import Processor
+from Machine.Devices.Utility.class_dma_controller import DMAController
 from Machine.Devices.Utility.real_time_clock import RTC
 
 device_group = []
@@ -14,15 +19,17 @@ class MachineBuilder:
     A class used to build a machine.
     """
 
-    def __init__(self, devices=None) -> None:
+    def __init__(self, devices=None, headless: bool = False) -> None:
         """
         Constructs all the necessary attributes for the machine builder.
 
         Parameters:
         devices (list): The devices to be added to the machine.
+        headless (bool): If True, the console and sound card are built without a display window or audio output.
         """
         self.__backplane = BackPlane()
         self.__device_group = devices
+        self.__headless = headless
 
     def build_machine(self) -> BackPlane:
         """
@@ -34,6 +41,7 @@ class MachineBuilder:
         for device in self.__device_group:
             self.check_device_overlap(device)
             self.attach_device(device)
+        self.__backplane.build_memory_map()
         return self.__backplane
 
     def check_device_overlap(self, device: {}) -> bool:
@@ -81,6 +89,15 @@ class MachineBuilder:
         width: int = 0
         height: int = 0
         program_pathname: str = ""
+        engine: str = "interp"
+        cache_size: int = DEFAULT_CACHE_SIZE
+        cache_ways: int = DEFAULT_CACHE_ASSOCIATIVITY
+        reset_address: int = 0
+        interrupt_routing: set[int] | None = None
+        storage: str = "list"
+        image_pathname: str = ""
+        read_only: bool = False
+        sync_on_halt: bool = False
         device_to_add: str = device['device_name']
         if 'address' in device:
             address: int = int(device['address'])
@@ -94,6 +111,24 @@ class MachineBuilder:
             width: int = int(device['width'])
         if 'height' in device:
             height: int = int(device['height'])
+        if 'engine' in device:
+            engine: str = device['engine']
+        if 'cache_size' in device:
+            cache_size: int = int(device['cache_size'])
+        if 'cache_ways' in device:
+            cache_ways: int = int(device['cache_ways'])
+        if 'start' in device:
+            reset_address: int = int(device['start'])
+        if 'irqs' in device:
+            interrupt_routing = {int(interrupt) for interrupt in device['irqs'].split(',') if interrupt}
+        if 'storage' in device:
+            storage = device['storage']
+        if 'file' in device:
+            image_pathname = device['file']
+        if 'mode' in device:
+            read_only = device['mode'] == 'readonly'
+        if 'sync' in device:
+            sync_on_halt = device['sync'] == 'halt'
 
         # noinspection SpellCheckingInspection
         match device_to_add:
@@ -103,7 +138,18 @@ class MachineBuilder:
                                                 address_bus=self.__backplane.address_bus,
                                                 data_bus=self.__backplane.data_bus,
                                                 control_bus=self.__backplane.control_bus,
-                                                interrupt_bus=self.__backplane.interrupt_bus))
+                                                interrupt_bus=self.__backplane.interrupt_bus,
+                                                storage=storage))
+            case 'mapped_ram':
+                self.__backplane.add_device(MappedRAM(starting_address=address,
+                                                      pathname=image_pathname,
+                                                      address_bus=self.__backplane.address_bus,
+                                                      data_bus=self.__backplane.data_bus,
+                                                      control_bus=self.__backplane.control_bus,
+                                                      interrupt_bus=self.__backplane.interrupt_bus,
+                                                      size=size if 'size' in device else None,
+                                                      read_only=read_only,
+                                                      sync_on_halt=sync_on_halt))
             case "rtc":
                 self.__backplane.add_device(RTC(starting_address=address,interrupt=interrupt,
                                                           address_bus=self.__backplane.address_bus,
@@ -111,13 +157,24 @@ class MachineBuilder:
                                                           control_bus=self.__backplane.control_bus,
                                                           interrupt_bus=self.__backplane.interrupt_bus)
                 )
+            case 'dma':
+                self.__backplane.add_device(DMAController(starting_address=address, interrupt=interrupt,
+                                                          address_bus=self.__backplane.address_bus,
+                                                          data_bus=self.__backplane.data_bus,
+                                                          control_bus=self.__backplane.control_bus,
+                                                          interrupt_bus=self.__backplane.interrupt_bus))
             case 'processor':
                 self.__backplane.add_device(Processor(size=size,
                                                       starting_address=address,
                                                       address_bus=self.__backplane.address_bus,
                                                       data_bus=self.__backplane.data_bus,
                                                       control_bus=self.__backplane.control_bus,
-                                                      interrupt_bus=self.__backplane.interrupt_bus))
+                                                      interrupt_bus=self.__backplane.interrupt_bus,
+                                                      engine=engine,
+                                                      cache_size=cache_size,
+                                                      cache_associativity=cache_ways,
+                                                      reset_address=reset_address,
+                                                      interrupt_routing=interrupt_routing))
             case 'console':
                 self.__backplane.add_device(Console(starting_address=address,
                                                     width=width,
@@ -126,13 +183,15 @@ class MachineBuilder:
                                                     address_bus=self.__backplane.address_bus,
                                                     data_bus=self.__backplane.data_bus,
                                                     control_bus=self.__backplane.control_bus,
-                                                    interrupt_bus=self.__backplane.interrupt_bus))
+                                                    interrupt_bus=self.__backplane.interrupt_bus,
+                                                    headless=self.__headless))
             case 'soundcard':
                 self.__backplane.add_device(SoundCard(starting_address=address,
                                                       address_bus=self.__backplane.address_bus,
                                                       data_bus=self.__backplane.data_bus,
                                                       control_bus=self.__backplane.control_bus,
-                                                      interrupt_bus=self.__backplane.interrupt_bus))
+                                                      interrupt_bus=self.__backplane.interrupt_bus,
+                                                      headless=self.__headless))
             case 'rom':
                 self.__backplane.add_device(ROM(starting_address=address,
                                                 address_bus=self.__backplane.address_bus,
@@ -142,6 +201,8 @@ class MachineBuilder:
             case 'compiler':
                 compiler = RubbishCompiler(starting_address=address)
                 code = compiler.compile(program_pathname)
+                self.__backplane.symbol_table.add_program(os.path.splitext(os.path.basename(program_pathname))[0],
+                                                          address, compiler.labels, compiler.routines)
                 if len(code) > size:
                     print("Warning: The compiled program size exceeds the specified size.")
                 ram = RAM(starting_address=address,
@@ -149,7 +210,8 @@ class MachineBuilder:
                           address_bus=self.__backplane.address_bus,
                           data_bus=self.__backplane.data_bus,
                           control_bus=self.__backplane.control_bus,
-                          interrupt_bus=self.__backplane.interrupt_bus)
+                          interrupt_bus=self.__backplane.interrupt_bus,
+                          storage=storage)
                 ram.load_data(data=code)
                 self.__backplane.add_device(ram)
 
@@ -0,0 +1,161 @@
+import contextlib
+import io
+import json
+import os
+import shlex
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from MachineConfiguration.class_headless_runner import HeadlessRunner
+
+
+class TestFarm:
+    """
+    A class used to run many headless machines in parallel, one per worker process, for regression testing.
+    Each machine is still limited to a single core by the emulator, so the farm scales with the number of host
+    cores by running a separate machine in each process.
+
+    The manifest is a JSON file holding a list of jobs.  Each job has a name, the command line arguments that
+    describe the machine (exactly as they would be given to main.py), and optionally the expected status and
+    text that the console must show:
+
+        {"jobs": [{"name": "processor test",
+                   "arguments": "--compiler address=0 size=2048 program=processor_test.txt --processor
+                                 --console address=1024 interrupt=2 width=40 height=5 --timeout 10",
+                   "expect": "halted",
+                   "console": "E"}]}
+
+    Pathnames in the arguments are relative to the directory that holds the manifest.
+    """
+
+    def __init__(self, manifest_pathname: str, workers: int | None = None) -> None:
+        """
+        Constructs all the necessary attributes for the test farm.
+
+        Parameters:
+        manifest_pathname (str): The pathname of the JSON manifest that lists the jobs.
+        workers (int): The number of worker processes, or None to use one per host core.
+        """
+        self.__manifestPathname = manifest_pathname
+        self.__workers = workers or os.cpu_count() or 1
+
+    @property
+    def workers(self) -> int:
+        """
+        Returns the number of worker processes the farm runs.
+        """
+        return self.__workers
+
+    def load_jobs(self) -> list[dict]:
+        """
+        Reads the jobs from the manifest.
+
+        Returns:
+        list: The jobs, each a dictionary with name, arguments, expect and console keys.
+        """
+        with open(self.__manifestPathname, 'r') as file:
+            manifest = json.load(file)
+        jobs = []
+        for index, job in enumerate(manifest["jobs"]):
+            if "arguments" not in job:
+                raise ValueError(f"Job {index} in {self.__manifestPathname} has no arguments.")
+            jobs.append({"name": job.get("name", f"job {index}"),
+                         "arguments": job["arguments"],
+                         "expect": job.get("expect", "halted"),
+                         "console": job.get("console")})
+        return jobs
+
+    def run(self) -> dict:
+        """
+        Runs every job in the manifest across the worker processes and aggregates the results.
+
+        Returns:
+        dict: The farm report: the result of each job in manifest order, the number of jobs that passed and
+        failed, the total wall time of the jobs, and the wall time of the whole farm.
+        """
+        jobs = self.load_jobs()
+        manifest_directory = os.path.dirname(os.path.abspath(self.__manifestPathname))
+        results: list[dict | None] = [None] * len(jobs)
+        started = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=min(self.__workers, max(len(jobs), 1)),
+                                 initializer=os.chdir, initargs=(manifest_directory,)) as executor:
+            futures = {executor.submit(self.run_job, job): index for index, job in enumerate(jobs)}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        wall_time = time.perf_counter() - started
+        passed = sum(1 for result in results if result["passed"])
+        return {"jobs": results,
+                "passed": passed,
+                "failed": len(results) - passed,
+                "workers": self.__workers,
+                "job_time": sum(result["wall_time"] for result in results),
+                "wall_time": wall_time}
+
+    @staticmethod
+    def run_job(job: dict) -> dict:
+        """
+        Builds and runs the machine for one job in a worker process.  Everything the machine prints is captured,
+        so that the output of the machines running in parallel isn't interleaved.
+
+        Parameters:
+        job (dict): The job, as read from the manifest.
+
+        Returns:
+        dict: The job's result: its name, whether it passed, the status and exit code of the run, the number of
+        instructions executed, the wall time, and the captured output if it failed.
+        """
+        from main import parse_command_line
+        result = {"name": job["name"], "passed": False, "status": "error", "exit_code": None,
+                  "instructions": 0, "wall_time": 0.0}
+        output = io.StringIO()
+        started = time.perf_counter()
+        try:
+            with contextlib.redirect_stdout(output):
+                devices, run_options = parse_command_line(shlex.split(job["arguments"]))
+                report = HeadlessRunner(devices, run_options['max_instructions'], run_options['timeout'],
+                                        scheduler=run_options['scheduler'], trace_pathname=run_options['trace'],
+                                        trace_records=run_options['trace_records'],
+                                        checkpoint_interval=run_options['checkpoint_interval'],
+                                        max_checkpoints=run_options['max_checkpoints'],
+                                        breakpoints=run_options['breakpoints'],
+                                        watchpoints=run_options['watchpoints'],
+                                        log_hits=run_options['log_hits'],
+                                        input_text=run_options['input']).run()
+            result["status"] = report["status"]
+            result["exit_code"] = report["exit_code"]
+            result["instructions"] = report["instructions"]
+            result["passed"] = report["status"] == job["expect"]
+            if job["console"] is not None and not any(job["console"] in console_text
+                                                      for console_text in report["consoles"]):
+                result["passed"] = False
+                result["reason"] = f"console does not show {job['console']!r}"
+            elif not result["passed"]:
+                result["reason"] = f"expected {job['expect']}"
+        except SystemExit:
+            # the command line parser exits on invalid arguments, after printing why
+            result["reason"] = "invalid arguments"
+        except Exception as e:
+            result["reason"] = f"{type(e).__name__}: {e}"
+        result["wall_time"] = time.perf_counter() - started
+        if not result["passed"]:
+            result["output"] = output.getvalue()
+        return result
+
+    @staticmethod
+    def format_report(report: dict) -> str:
+        """
+        Formats a farm report as human-readable text, one line per job followed by a summary.
+        """
+        lines = []
+        for result in report["jobs"]:
+            outcome = "PASS" if result["passed"] else "FAIL"
+            line = (f"{outcome}  {result['name']:<40} {result['status']:<28} {result['instructions']:>12,} "
+                    f"instructions {result['wall_time']:8.3f}s")
+            if "reason" in result:
+                line += f"  ({result['reason']})"
+            lines.append(line)
+        speedup = report["job_time"] / report["wall_time"] if report["wall_time"] > 0 else 0.0
+        lines.append(f"{report['passed']} passed, {report['failed']} failed in {report['wall_time']:.3f} seconds "
+                     f"on {report['workers']} workers ({report['job_time']:.3f} seconds of machine time, "
+                     f"{speedup:.1f}x parallel speedup)")
+        return "\n".join(lines)
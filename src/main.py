@@ -27,14 +27,87 @@ def start_machine() -> None:
     if check_python_version():
         if len(sys.argv) > 1:
 
-            from MachineConfiguration.class_machine_builder import MachineBuilder
-            builder = MachineBuilder(parse_command_line())
-            builder.build_machine().run()
+            from Machine.Diagnostics.class_guest_profiler import DEFAULT_SAMPLE_INTERVAL
+            devices, run_options = parse_command_line()
+            if run_options['decode_trace'] is not None:
+                decode_trace(run_options['decode_trace'])
+            elif run_options['farm'] is not None:
+                run_farm(run_options)
+            elif run_options['headless']:
+                run_headless(devices, run_options)
+            else:
+                from MachineConfiguration.class_machine_builder import MachineBuilder
+                builder = MachineBuilder(devices)
+                backplane = builder.build_machine()
+                if run_options['scheduler'] == 'cooperative':
+                    backplane.use_cooperative_scheduler()
+                elif run_options['scheduler'] == 'async':
+                    backplane.use_async_runtime()
+                if run_options['restore_snapshot'] is not None:
+                    backplane.load_snapshot(run_options['restore_snapshot'])
+                if run_options['stats'] is not None:
+                    backplane.enable_statistics(run_options['stats'])
+                if run_options['profile'] is not None:
+                    backplane.enable_profiling(DEFAULT_SAMPLE_INTERVAL, run_options['profile'] or None)
+                if run_options['trace'] is not None:
+                    backplane.enable_tracing(run_options['trace_records'], run_options['trace'])
+                for breakpoint in run_options['breakpoints']:
+                    backplane.debugger.add_breakpoint(backplane.debugger.resolve_address(breakpoint))
+                for watchpoint in run_options['watchpoints']:
+                    backplane.debugger.add_watchpoint_text(watchpoint)
+                backplane.debugger.stop_on_hit = not run_options['log_hits']
+                if run_options['debug_server'] is not None:
+                    backplane.enable_debug_server(run_options['debug_server'])
+                backplane.run(timeout=run_options['timeout'])
+                if run_options['save_snapshot'] is not None:
+                    backplane.save_snapshot(run_options['save_snapshot'])
+                backplane.close()
         else:
             show_help()
     print("Session ended.")
 
 
+def run_headless(devices: [{}], run_options: {}) -> None:
+    """Runs the machine without a display or audio, reports the outcome and exits with the run's exit code."""
+    from MachineConfiguration.class_headless_runner import HeadlessRunner
+    runner = HeadlessRunner(devices, run_options['max_instructions'], run_options['timeout'], run_options['stats'],
+                            run_options['profile'], run_options['restore_snapshot'], run_options['save_snapshot'],
+                            run_options['scheduler'], run_options['trace'], run_options['trace_records'],
+                            run_options['checkpoint_interval'], run_options['max_checkpoints'],
+                            run_options['step_back'], run_options['run_back_to'], run_options['breakpoints'],
+                            run_options['watchpoints'], run_options['log_hits'], run_options['debug_server'],
+                            run_options['input'])
+    try:
+        report = runner.run()
+    except ValueError as error:
+        print(f"Error: {error}")
+        sys.exit(1)
+    print(HeadlessRunner.format_report(report))
+    if run_options['json'] is not None:
+        HeadlessRunner.write_json_report(report, run_options['json'])
+    print("Session ended.")
+    sys.exit(report['exit_code'])
+
+
+def run_farm(run_options: {}) -> None:
+    """Runs every machine in a test farm manifest in parallel, reports the results and exits with 1 if any failed."""
+    from MachineConfiguration.class_headless_runner import HeadlessRunner
+    from MachineConfiguration.class_test_farm import TestFarm
+    farm = TestFarm(run_options['farm'], run_options['workers'])
+    report = farm.run()
+    print(TestFarm.format_report(report))
+    if run_options['json'] is not None:
+        HeadlessRunner.write_json_report(report, run_options['json'])
+    print("Session ended.")
+    sys.exit(0 if report['failed'] == 0 else 1)
+
+
+def decode_trace(pathname: str) -> None:
+    """Prints an execution trace file written by --trace as text."""
+    from Machine.Diagnostics.class_execution_tracer import ExecutionTracer
+    print(ExecutionTracer.format_trace(ExecutionTracer.read_trace_file(pathname)))
+
+
 def check_required_parameters(device: str, parameters: {str}, keys: List[str]):
     """
     Checks if any of the specified keys are None in the "parameters" dictionary.
@@ -50,6 +123,23 @@ def check_required_parameters(device: str, parameters: {str}, keys: List[str]):
             exit(1)
 
 
+def check_interrupts(device: str, interrupts: str) -> None:
+    """Checks that the interrupts given for a device, separated by commas, are numbers of zero or more."""
+    for interrupt in interrupts.split(","):
+        if interrupt and not interrupt.isdigit():
+            print(f"Error: The {device} device's interrupt '{interrupt}' must be a number of zero or more.")
+            print("Use --help for help.")
+            exit(1)
+
+
+def check_storage(device: str, storage: str) -> None:
+    """Checks that the storage given for a RAM device is list or array."""
+    if storage not in ("list", "array"):
+        print(f"Error: Unknown {device} storage '{storage}'.  Valid storage types are list and array.")
+        print("Use --help for help.")
+        exit(1)
+
+
 # noinspection SpellCheckingInspection
 def add_sound_card(args, devices: {}) -> None:
     """
@@ -77,25 +167,78 @@ def add_rtc(args, devices):
         address = rtc_args.get("address")
         interrupt = rtc_args.get("interrupt")
         check_required_parameters("RTC", rtc_args, ["address", "interrupt"])
+        check_interrupts("RTC", interrupt)
         devices.append({'device_name': 'rtc', 'address': address, 'interrupt': interrupt})
 
-def parse_command_line() -> {}:
-    """Parses the command line arguments and returns a list of device groups.  Each device group is a dictionary"""
+def add_dma(args, devices: {}) -> None:
+    """
+    Adds a DMA controller device to the list of devices to add to the backplane.
+    Args:
+        args: The command line arguments.
+        devices: The list of devices that will be added to the machine.
+
+    Returns:
+
+    """
+    if args.dma:
+        dma_args = dict(args.dma)
+        check_required_parameters("DMA", dma_args, ["address"])
+        check_interrupts("DMA", dma_args.get("interrupt", ""))
+        devices.append({'device_name': 'dma', 'address': dma_args.get("address"),
+                        'interrupt': dma_args.get("interrupt", 0)})
+
+
+def parse_command_line(argv: List[str] | None = None) -> ([{}], {}):
+    """
+    Parses the command line arguments and returns a list of device groups and a dictionary of run options.
+    Each device group is a dictionary.
+    The arguments are taken from argv if given (as the test farm does for each job), otherwise from sys.argv.
+    """
     devices = []
     import argparse
+    from Machine.Backplane.class_machine_statistics import DEFAULT_STATISTICS_INTERVAL
+    from Machine.Backplane.class_time_travel import DEFAULT_CHECKPOINT_INTERVAL, DEFAULT_MAX_CHECKPOINTS
+    from Machine.Diagnostics.class_execution_tracer import DEFAULT_TRACE_RECORDS
 
     # Create an argument parser
     parser = argparse.ArgumentParser(add_help=False)
 
     parser.add_argument('--help', action='store_const', const=True)
     parser.add_argument('--ram', type=lambda x: x.split('='), nargs='+')
-    parser.add_argument('--processor', action='store_const', const=True)
+    parser.add_argument('--mapped-ram', type=lambda x: x.split('=', 1), nargs='+')
+    parser.add_argument('--processor', type=lambda x: x.split('='), nargs='*', action='append')
     parser.add_argument('--console', type=lambda x: x.split('='), nargs='+')
     parser.add_argument("--compiler", type=lambda x: x.split('='), nargs='+')
     parser.add_argument('--soundcard', type=lambda x: x.split('='), nargs='+')
     parser.add_argument("--rtc", type=lambda x: x.split('='), nargs='+')
-
-    args = parser.parse_args()
+    parser.add_argument("--dma", type=lambda x: x.split('='), nargs='+')
+    parser.add_argument('--headless', action='store_const', const=True, default=False)
+    parser.add_argument('--max-instructions', type=int, default=0)
+    parser.add_argument('--timeout', type=float)
+    parser.add_argument('--json')
+    parser.add_argument('--stats', type=float, nargs='?', const=DEFAULT_STATISTICS_INTERVAL)
+    parser.add_argument('--profile', nargs='?', const='')
+    parser.add_argument('--save-snapshot')
+    parser.add_argument('--restore-snapshot')
+    parser.add_argument('--scheduler', choices=['threaded', 'cooperative', 'async'], default='threaded')
+    parser.add_argument('--farm')
+    parser.add_argument('--workers', type=int)
+    parser.add_argument('--trace')
+    parser.add_argument('--trace-records', type=int, default=DEFAULT_TRACE_RECORDS)
+    parser.add_argument('--decode-trace')
+    parser.add_argument('--checkpoint-interval', type=int)
+    parser.add_argument('--max-checkpoints', type=int, default=DEFAULT_MAX_CHECKPOINTS)
+    parser.add_argument('--step-back', type=int, default=0)
+    parser.add_argument('--run-back-to')
+    parser.add_argument('--break', dest='breakpoints', nargs='+', default=[])
+    parser.add_argument('--watch', nargs='+', default=[])
+    parser.add_argument('--log-hits', action='store_const', const=True, default=False)
+    parser.add_argument('--debug-server')
+    parser.add_argument('--input')
+    parser.add_argument('--input-file')
+    parser.error = report_argument_error
+
+    args = parser.parse_args(argv)
     if args.help:
         show_help()
         exit()
@@ -103,11 +246,67 @@ def parse_command_line() -> {}:
     # build the devices list to pass to the machine builder
     add_processor(args, devices)
     add_ram(args, devices)
+    add_mapped_ram(args, devices)
     add_console(args, devices)
     add_compiler(args, devices)
     add_sound_card(args, devices)
     add_rtc(args, devices)
-    return devices
+    add_dma(args, devices)
+    checkpoint_interval = args.checkpoint_interval
+    if checkpoint_interval is None and (args.step_back or args.run_back_to is not None):
+        checkpoint_interval = DEFAULT_CHECKPOINT_INTERVAL
+    if checkpoint_interval is not None and args.scheduler != 'cooperative':
+        print("Error: Time travel needs --scheduler cooperative.")
+        print("Use --help for help.")
+        exit(1)
+    run_options = {
+        'headless': args.headless,
+        'max_instructions': args.max_instructions,
+        'timeout': args.timeout,
+        'json': args.json,
+        'stats': args.stats,
+        'profile': args.profile,
+        'save_snapshot': args.save_snapshot,
+        'restore_snapshot': args.restore_snapshot,
+        'scheduler': args.scheduler,
+        'farm': args.farm,
+        'workers': args.workers,
+        'trace': args.trace,
+        'trace_records': args.trace_records,
+        'decode_trace': args.decode_trace,
+        'checkpoint_interval': checkpoint_interval,
+        'max_checkpoints': args.max_checkpoints,
+        'step_back': args.step_back,
+        'run_back_to': args.run_back_to,
+        'breakpoints': args.breakpoints,
+        'watchpoints': args.watch,
+        'log_hits': args.log_hits,
+        'debug_server': args.debug_server,
+        'input': read_input(args),
+    }
+    return devices, run_options
+
+
+def read_input(args) -> str | None:
+    """Returns the text given by --input and --input-file to type into the console, or None if neither was given."""
+    if args.input is None and args.input_file is None:
+        return None
+    text = (args.input or "").replace("\\n", "\n")
+    if args.input_file is not None:
+        try:
+            with open(args.input_file, encoding="utf-8") as input_file:
+                text += input_file.read()
+        except OSError as error:
+            print(f"Error: Can't read {args.input_file}: {error.strerror}.")
+            exit(1)
+    return text
+
+
+def report_argument_error(message: str) -> None:
+    """Reports a command line the argument parser can't parse, and exits with 1 as for any other bad command line."""
+    print(f"Error: {message[0].upper() + message[1:]}.")
+    print("Use --help for help.")
+    exit(1)
 
 
 def add_compiler(args, devices: {}) -> None:
@@ -126,7 +325,10 @@ def add_compiler(args, devices: {}) -> None:
         program = compiler_args.get("program")
         size = compiler_args.get("size")
         check_required_parameters("Compiler", compiler_args, ["address", "program", "size"])
-        devices.append({'device_name': 'compiler', 'address': address, 'program': program, 'size': size})
+        storage = compiler_args.get("storage", "list")
+        check_storage("Compiler", storage)
+        devices.append({'device_name': 'compiler', 'address': address, 'program': program, 'size': size,
+                        'storage': storage})
 
 
 def add_console(args, devices: {}) -> None:
@@ -147,6 +349,7 @@ def add_console(args, devices: {}) -> None:
         height = console_args.get("height")
         # noinspection SpellCheckingInspection
         check_required_parameters("Console", console_args, ["address", "interrupt", "width", "height"])
+        check_interrupts("Console", interrupt)
         # noinspection SpellCheckingInspection
         devices.append(
             {'device_name': 'console', 'address': address, 'interrupt': interrupt, 'width': width, 'height': height})
@@ -167,12 +370,44 @@ def add_ram(args, devices: {}) -> None:
         address = ram_args.get("address")
         size = ram_args.get("size")
         check_required_parameters("RAM", ram_args, ["address", "size"])
-        devices.append({'device_name': 'ram', 'address': address, 'size': size})
+        storage = ram_args.get("storage", "list")
+        check_storage("RAM", storage)
+        devices.append({'device_name': 'ram', 'address': address, 'size': size, 'storage': storage})
+
+
+def add_mapped_ram(args, devices: {}) -> None:
+    """
+    Adds a RAM device backed by a memory-mapped image file to the list of devices to add to the backplane.
+    Args:
+        args: The command line arguments.
+        devices: The list of devices that will be added to the machine.
+
+    Returns:
+
+    """
+    if args.mapped_ram:
+        mapped_ram_args = dict(args.mapped_ram)
+        check_required_parameters("Mapped RAM", mapped_ram_args, ["address", "file"])
+        mode = mapped_ram_args.get("mode", "readwrite")
+        if mode not in ("readwrite", "readonly"):
+            print(f"Error: Unknown mapped RAM mode '{mode}'.  Valid modes are readwrite and readonly.")
+            print("Use --help for help.")
+            exit(1)
+        sync = mapped_ram_args.get("sync", "none")
+        if sync not in ("none", "halt"):
+            print(f"Error: Unknown mapped RAM sync '{sync}'.  Valid syncs are none and halt.")
+            print("Use --help for help.")
+            exit(1)
+        mapped_ram = {'device_name': 'mapped_ram', 'address': mapped_ram_args["address"],
+                      'file': mapped_ram_args["file"], 'mode': mode, 'sync': sync}
+        if "size" in mapped_ram_args:
+            mapped_ram['size'] = mapped_ram_args["size"]
+        devices.append(mapped_ram)
 
 
 def add_processor(args, devices: {}) -> None:
     """
-    Adds a processor device to the list of devices to add to the backplane.
+    Adds a processor device to the list of devices for each --processor option.
     Args:
         args: The command line arguments.
         devices: The list of devices that will be added to the machine.
@@ -180,8 +415,21 @@ def add_processor(args, devices: {}) -> None:
     Returns:
 
     """
-    if args.processor:
-        devices.append({'device_name': 'processor', 'options': ''})
+    if args.processor is None:
+        return
+    for processor_option in args.processor:
+        processor_args = dict(processor_option)
+        engine = processor_args.get("engine", "interp")
+        if engine not in ("interp", "block"):
+            print(f"Error: Unknown processor engine '{engine}'.  Valid engines are interp and block.")
+            print("Use --help for help.")
+            exit(1)
+        check_interrupts("Processor", processor_args.get("irqs", ""))
+        processor = {'device_name': 'processor', 'options': '', 'engine': engine}
+        for key in ("cache_size", "cache_ways", "start", "irqs"):
+            if key in processor_args:
+                processor[key] = processor_args[key]
+        devices.append(processor)
 
 def show_help() -> None:
     """Displays the help screen."""
@@ -191,10 +439,32 @@ def show_help() -> None:
     print("   Adds a RAM device to the backplane.")
     print()
     print("   Syntax:")
-    print("         --ram address={starting address} size={size of ram address space}")
+    print("         --ram address={starting address} size={size of ram address space} [storage={list|array}]")
     print()
     print("   Example:")
     print("         --ram address=0 size=1024")
+    print("         --ram address=4096 size=16000000 storage=array")
+    print()
+    print("   Note: storage=list (the default) holds each word as a Python integer of any size.  storage=array")
+    print("         packs the words into signed 64-bit integers, 8 bytes each, and wraps wider values to 64 bits.")
+    print("         Use it for large memories: 16M words take 128MB rather than several hundred MB once written.")
+    print()
+    print("--mapped-ram")
+    print("   Adds a RAM device to the backplane whose memory is an image file on the host, mapped with mmap.")
+    print()
+    print("   Syntax:")
+    print("         --mapped-ram address={starting address} file={pathname of image} [size={size of ram address space}]")
+    print("           [mode={readwrite|readonly}] [sync={none|halt}]")
+    print()
+    print("   Example:")
+    print("         --mapped-ram address=0 file=./boot.img mode=readonly")
+    print("         --mapped-ram address=4096 file=./disk.img size=1000000 sync=halt")
+    print()
+    print("   Note: The image holds the words as signed little-endian 64-bit integers, the first at the starting")
+    print("         address.  Its pages are read when first touched, so a large image is ready at once.")
+    print("   Note: size defaults to the size of the image.  A missing image is created, and a short one extended,")
+    print("         with zeroes.  In readwrite mode (the default) writes go to the image and persist across runs;")
+    print("         sync=halt also flushes them to disk when the machine halts.  In readonly mode writes are ignored.")
     print()
     print("--console")
     print("   Adds a console device to the backplane which accepts keystrokes and displays output.")
@@ -212,12 +482,23 @@ def show_help() -> None:
     print("   Adds a processor device to the backplane.")
     print()
     print("   Syntax:")
-    print("         --processor")
+    print("         --processor [engine={interp|block}] [cache_size={words}] [cache_ways={ways per set}]")
+    print("           [start={reset address}] [irqs={interrupt},{interrupt}...]")
     print()
     print("   Example:")
     print("         --processor")
+    print("         --processor engine=block")
+    print("         --processor cache_size=8192 cache_ways=8")
+    print("         --processor start=0 irqs=2 --processor start=512 irqs=7")
     print()
-    print("   Note: The processor always begins execution at address 0.")
+    print("   Note: The processor begins execution at the start address, 0 by default.")
+    print("   Note: Repeat --processor to build a multi-processor machine.  The processors share the buses through a")
+    print("         fair arbiter, and each processor only services the interrupts listed in irqs (all by default).")
+    print("         HALT on any processor halts the machine.  Use TAS or CAS to synchronise the processors.")
+    print("   Note: engine=interp (the default) interprets one instruction at a time.  engine=block translates")
+    print("         straight-line runs of instructions into Python functions and checks interrupts between them.")
+    print("   Note: The data cache holds cache_size words (default 4096) in sets of cache_ways (default 4), evicting")
+    print("         the least-recently-used word.  Only RAM and ROM are cached.")
     print()
     print("--compiler")
     print("   Adds a RAM device to the backplane and compiles a Rubbish assembly language program into the")
@@ -225,7 +506,7 @@ def show_help() -> None:
     print()
     print("   Syntax:")
     print("         --compiler address={starting address} size={size of ram address space} "
-          "           program={pathname to program}")
+          "           program={pathname to program} [storage={list|array}]")
     print()
     print("   Example:")
     print("         --compiler address=0 size=2048 program=./my_program.txt")
@@ -239,6 +520,155 @@ def show_help() -> None:
     print("   Example:")
     print("         --soundcard address=1025")
     print()
+    print("--dma")
+    print("   Adds a DMA controller device to the backplane, which copies or fills blocks of memory far faster than")
+    print("   moving them a word at a time with LRM and MRM.")
+    print()
+    print("   Syntax:")
+    print("         --dma address={address} [interrupt={interrupt raised when a transfer completes}]")
+    print()
+    print("   Example:")
+    print("         --dma address=1030 interrupt=5")
+    print()
+    print("   Note:  The DMA controller's memory size is always 4.  See ../Documentation/Devices/dma controller.md.")
+    print()
+    print("--headless")
+    print("   Runs the machine without a display window or audio output.  The final processor state and console")
+    print("   text are printed when the machine halts, and the emulator exits with one of these codes:")
+    print("         0 halted, 2 unhandled stack assertion, 3 instruction budget exceeded, 4 timeout,")
+    print("         5 stopped at a breakpoint or watchpoint, 6 error")
+    print("   A bad command line exits with 1 before the machine runs.")
+    print()
+    print("   Options:")
+    print("         --max-instructions {count}   halts the machine after this many instructions")
+    print("         --timeout {seconds}          halts the machine after this many seconds")
+    print("         --json {pathname}            also writes the report to a JSON file")
+    print("         --input {text}               types the text on the console; \\n is typed as Enter")
+    print("         --input-file {pathname}      types the contents of a file on the console, after any --input")
+    print()
+    print("   Example:")
+    print("         --headless --max-instructions 1000000 --timeout 10 --json ./report.json")
+    print("         --headless --input \"hello\\n\" --timeout 5")
+    print()
+    print("--stats")
+    print("   Reports instructions per second, data cache hits, interrupts serviced, bus reads and writes per")
+    print("   device, and time spent waiting for the bus lock.  The report is printed periodically and at HALT.")
+    print()
+    print("   Syntax:")
+    print("         --stats [{seconds between reports, default 5}]")
+    print()
+    print("   Example:")
+    print("         --stats 1")
+    print()
+    print("--profile")
+    print("   Samples the running program and prints a flat profile of its routines at HALT.  A routine is a label")
+    print("   that is CALLed or used as an interrupt vector.  If a pathname is given, the samples are also written")
+    print("   as collapsed stacks for flame graph tools such as flamegraph.pl or speedscope.")
+    print()
+    print("   Syntax:")
+    print("         --profile [{pathname of collapsed stack file}]")
+    print()
+    print("   Example:")
+    print("         --profile ./profile.folded")
+    print()
+    print("--trace, --decode-trace")
+    print("   Records the instructions each processor executes in a fixed-size ring buffer: the address, opcode and")
+    print("   operands of each instruction and the registers it uses, as they were before it executed.  Under the")
+    print("   block engine one record is kept per translated block.  The records are written to a binary trace")
+    print("   file when a processor faults and again at HALT.  --decode-trace prints a trace file as text.")
+    print()
+    print("   Syntax:")
+    print("         --trace {pathname of trace file} [--trace-records {records per processor, default 4096}]")
+    print("         --decode-trace {pathname of trace file}")
+    print()
+    print("   Example:")
+    print("         --trace ./crash.trace --trace-records 100000")
+    print("         --decode-trace ./crash.trace")
+    print()
+    print("--step-back, --run-back-to")
+    print("   Time travel: once a headless machine has stopped, takes it back a number of steps, or back to the last")
+    print("   step at which the first processor's instruction pointer held an address or label, and prints the")
+    print("   processor state there.  A checkpoint of the registers, stacks and changed pages of memory is taken")
+    print("   every --checkpoint-interval steps, and keystrokes and clock readings are logged, so an earlier step")
+    print("   is reached by restoring the nearest checkpoint and replaying.  Only the newest --max-checkpoints")
+    print("   checkpoints are kept.  Needs the cooperative scheduler; the processors run on the interpreter, so a")
+    print("   step is one instruction on each processor.")
+    print()
+    print("   Syntax:")
+    print("         --scheduler cooperative [--checkpoint-interval {steps, default 10000}]")
+    print("           [--max-checkpoints {count, default 64}] [--step-back {steps}] [--run-back-to {address|label}]")
+    print()
+    print("   Example:")
+    print("         --headless --scheduler cooperative --run-back-to divide")
+    print()
+    print("--break, --watch")
+    print("   Stops the machine before a processor executes the instruction at a breakpoint, or once memory in a")
+    print("   watched range has been read or written, and reports where.  Breakpoints are addresses or labels.  A")
+    print("   watched range is START[-END], where END is the last address watched, optionally followed by :r, :w or")
+    print("   :rw (the default) to watch reads, writes or both.  With --log-hits every hit is reported and the")
+    print("   machine carries on.  Headless runs stopped this way exit with status breakpoint (5), and can be")
+    print("   combined with --step-back or --run-back-to.  Nothing is checked per instruction, so a machine with no")
+    print("   breakpoints or watchpoints runs at full speed.")
+    print()
+    print("   Syntax:")
+    print("         --break {address|label} [...] --watch {start[-end][:r|w|rw]} [...] [--log-hits]")
+    print()
+    print("   Example:")
+    print("         --headless --break divide --watch 1200-1299:w")
+    print()
+    print("--debug-server")
+    print("   Listens on a localhost TCP port, or a Unix domain socket, for a debugger to attach to the running")
+    print("   machine.  Each request is a JSON object on one line and is answered by one; the commands are status,")
+    print("   halt, resume, step, registers, write_register, read_memory, write_memory, break, clear_break and")
+    print("   symbol.  Memory is read straight from the devices that hold it, a block at a time.  Breakpoints set")
+    print("   by a debugger halt the machine while it is attached, and are removed when it disconnects.")
+    print()
+    print("   Syntax:")
+    print("         --debug-server {port|pathname of socket}")
+    print()
+    print("   Example:")
+    print("         --debug-server 4444")
+    print('         echo \'{"command": "read_memory", "address": "buffer", "length": 64}\' | nc localhost 4444')
+    print()
+    print("--save-snapshot, --restore-snapshot")
+    print("   Saves the state of the machine to a snapshot file when it halts, or restores it from one before it")
+    print("   runs.  A snapshot holds the processor registers, stacks and interrupt vectors, pending interrupts,")
+    print("   memory, the clock and the console screen.  It can only be restored into a machine built with the")
+    print("   same devices at the same addresses.  Combine with --timeout or --max-instructions to checkpoint a")
+    print("   program part way through.  Values are stored as 64-bit words; a register or word of memory holding a")
+    print("   wider value is stored as its low 64 bits.")
+    print()
+    print("   Syntax:")
+    print("         --save-snapshot {pathname}")
+    print("         --restore-snapshot {pathname}")
+    print()
+    print("   Example:")
+    print("         --max-instructions 500000 --save-snapshot ./warm.snapshot")
+    print("         --restore-snapshot ./warm.snapshot")
+    print()
+    print("--scheduler")
+    print("   Chooses how the devices are run.  threaded (the default) gives each device its own thread.  cooperative")
+    print("   runs every device on one thread in a fixed order, so runs are reproducible and no bus locking is")
+    print("   needed.  async keeps each processor on its own thread and runs every other device as a task on one")
+    print("   asyncio event loop, where idle devices wait for bus activity, timers or keystrokes without a thread")
+    print("   each.  The console window and sound playback keep their own threads in threaded and cooperative mode.")
+    print()
+    print("   Syntax:")
+    print("         --scheduler {threaded|cooperative|async}")
+    print()
+    print("--farm")
+    print("   Runs every machine listed in a JSON manifest headless and in parallel, one machine per worker process,")
+    print("   and reports whether each passed along with its instruction count and wall time.  Each job gives the")
+    print("   machine's command line arguments, the expected status (halted by default) and optionally text that")
+    print("   the console must show.  Pathnames in the arguments are relative to the manifest.  The emulator exits")
+    print("   with 1 if any job failed.  See ../Programs/regression_manifest.json for an example.")
+    print()
+    print("   Syntax:")
+    print("         --farm {pathname of manifest} [--workers {count, default one per core}] [--json {pathname}]")
+    print()
+    print("   Example:")
+    print("         --farm ../Programs/regression_manifest.json --workers 4")
+    print()
 
 
 if __name__ == '__main__':